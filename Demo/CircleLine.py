@@ -10,13 +10,14 @@ Created on 2019年3月19日
 @description: 
 """
 
-from math import floor, pi, cos, sin
+from math import ceil, floor, pi, cos, sin
 from random import random, randint
 from time import time
 
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QColor, QPainter, QPainterPath, QPen
-from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import QTimer, Qt, QElapsedTimer, QLineF, QPointF, QRect
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QRegion
+from PyQt5.QtWidgets import QWidget, QApplication
+import numpy as np
 
 
 __Author__ = 'Irony'
@@ -101,10 +102,46 @@ class Circle:
         spacey = abs((self.y - (-1 if self.speedy < 0 else 1) *
                       (height / 2 + self.radius)) / self.speedy)
         self.ttl = min(spacex, spacey)
+        self.sprite = None
+
+    def spriteSize(self):
+        width = max(1, circleBorder * (radMin - self.radius) / (radMin - radMax))
+        return int(ceil(2 * self.radius + width)) + 2
+
+
+def circleSprite(circle):
+    """预先画好不透明的圆, 绘制时通过setOpacity设置透明度"""
+    width = max(1, circleBorder * (radMin - circle.radius) / (radMin - radMax))
+    size = circle.spriteSize()
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    center = QPointF(size / 2, size / 2)
+    if circle.filled == 'full':
+        # 设置背景刷
+        painter.setBrush(circle.borderColor)
+        painter.setPen(Qt.NoPen)
+    else:
+        # 设置画笔
+        painter.setPen(QPen(circle.borderColor, width))
+    # 画实心圆或者圆圈
+    painter.drawEllipse(center, circle.radius, circle.radius)
+    if circle.filled == 'concentric':
+        # 画圆圈
+        painter.setBrush(Qt.NoBrush)
+        painter.drawEllipse(center, circle.radius / 2, circle.radius / 2)
+    painter.end()
+    return pixmap
 
 
 class CircleLineWindow(QWidget):
 
+    # 画质: 2 全部抗锯齿; 1 连线不抗锯齿; 0 连线不抗锯齿且降到30帧
+    QualityIntervals = {2: 16, 1: 16, 0: 33}
+    # 脏区域按格子计算
+    TileSize = 64
+
     def __init__(self, *args, **kwargs):
         super(CircleLineWindow, self).__init__(*args, **kwargs)
         # 设置背景颜色
@@ -117,8 +154,16 @@ class CircleLineWindow(QWidget):
         self.screenWidth = geometry.width()
         self.screenHeight = geometry.height()
         self._canDraw = True
-        self._firstDraw = True
-        self._timer = QTimer(self, timeout=self.update)
+        # 每帧绘制耗时(毫秒)的滑动平均, 用来调整画质和帧率
+        self.quality = 2
+        self.frameTime = 0
+        self._fastFrames = 0
+        self._links = []
+        self._tiles = np.zeros((self.screenHeight // self.TileSize + 1,
+                                self.screenWidth // self.TileSize + 1), bool)
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self, timeout=self.tick)
+        self._timer.setTimerType(Qt.PreciseTimer)
         self.init()
 
     def init(self):
@@ -128,134 +173,179 @@ class CircleLineWindow(QWidget):
         # 初始化点
         for _ in range(maxCircles * 3):
             points.append(Circle('', self.screenWidth, self.screenHeight))
+        self.updateLinks()
         self.update()
 
     def showEvent(self, event):
         super(CircleLineWindow, self).showEvent(event)
         self._canDraw = True
+        self._clock.start()
+        self._timer.start(self.QualityIntervals[self.quality])
 
     def hideEvent(self, event):
         super(CircleLineWindow, self).hideEvent(event)
         # 窗口最小化要停止绘制, 减少cpu占用
         self._canDraw = False
+        self._timer.stop()
+
+    def tick(self):
+        global circleExp, circleExpSp
+        if circlePulse:
+            if circleExp < circleExpMin or circleExp > circleExpMax:
+                circleExpSp *= -1
+            circleExp += circleExpSp
+        # 按实际经过的时间移动, 以16毫秒为一步, 降低帧率时速度不变
+        step = min(self._clock.restart(), 100) / 16
+        self.moveCircles(step)
+        self.updateLinks()
+        # 只刷新上一帧和这一帧画过的格子
+        tiles = self.dirtyTiles()
+        self.update(self.tilesRegion(tiles | self._tiles))
+        self._tiles = tiles
+
+    def moveCircles(self, step):
+        for i, circle in enumerate(points):
+            if circle.ttl < -20:
+                # 重新初始化一个
+                circle = Circle('', self.screenWidth, self.screenHeight)
+                points[i] = circle
+            if circle.background:
+                circle.radius *= circleExp
+            else:
+                circle.radius /= circleExp
+            circle.x += circle.speedx * step
+            circle.y += circle.speedy * step
+            if (circle.opacity < maxOpacity):
+                circle.opacity = min(circle.opacity + 0.01 * step, maxOpacity)
+            circle.ttl -= step
+
+    def updateLinks(self):
+        """用距离矩阵一次算出所有需要连线的圆"""
+        xs = np.array([circle.x for circle in points])
+        ys = np.array([circle.y for circle in points])
+        radius = np.array([circle.radius for circle in points])
+        opacity = np.array([circle.opacity for circle in points])
+        i, j = np.triu_indices(len(points), 1)
+        dx = xs[j] - xs[i]
+        dy = ys[j] - ys[i]
+        dist = np.hypot(dx, dy)
+        # if the circles are overlapping, no laser connecting them
+        # otherwise we connect them only if the dist is < linkDist
+        keep = (dist > radius[i] + radius[j]) & (dist < self.linkDist)
+        i, j, dx, dy, dist = i[keep], j[keep], dx[keep], dy[keep], dist[keep]
+        ux = dx / dist
+        uy = dy / dist
+        ratio = (self.linkDist - dist) / self.linkDist
+        self._xs = xs
+        self._ys = ys
+        self._radius = radius
+        self._lines = np.stack([xs[i] + radius[i] * ux, ys[i] + radius[i] * uy,
+                                xs[j] - radius[j] * ux, ys[j] - radius[j] * uy], 1)
+        self._links = list(zip(
+            i.tolist(), *self._lines.T.tolist(),
+            (np.minimum(opacity[i], opacity[j]) * ratio).tolist(),
+            (lineBorder * ratio).tolist()))
+
+    def dirtyTiles(self):
+        """这一帧要画的圆和连线经过的格子"""
+        tiles = np.zeros_like(self._tiles)
+        rows, columns = tiles.shape
+        size = self.TileSize
+        ox = self.screenWidth / 2
+        oy = self.screenHeight / 2
+        half = self._radius + circleBorder
+        lefts = ((self._xs + ox - half) // size).clip(0, columns).astype(int).tolist()
+        tops = ((self._ys + oy - half) // size).clip(0, rows).astype(int).tolist()
+        rights = ((self._xs + ox + half) // size + 1).clip(0, columns).astype(int).tolist()
+        bottoms = ((self._ys + oy + half) // size + 1).clip(0, rows).astype(int).tolist()
+        for left, top, right, bottom in zip(lefts, tops, rights, bottoms):
+            tiles[top:bottom, left:right] = True
+        lines = self._lines
+        if len(lines):
+            # 每隔8个像素取一个点, 以及这个点上下左右线宽范围内的点
+            count = int(np.hypot(lines[:, 2] - lines[:, 0],
+                                 lines[:, 3] - lines[:, 1]).max() // 8) + 2
+            t = np.linspace(0, 1, count)[:, None]
+            px = (lines[:, 0] + (lines[:, 2] - lines[:, 0]) * t).ravel() + ox
+            py = (lines[:, 1] + (lines[:, 3] - lines[:, 1]) * t).ravel() + oy
+            px = np.floor(np.concatenate((px - lineBorder, px + lineBorder, px, px)) / size)
+            py = np.floor(np.concatenate((py, py, py - lineBorder, py + lineBorder)) / size)
+            valid = (px >= 0) & (px < columns) & (py >= 0) & (py < rows)
+            tiles.ravel()[(py[valid] * columns + px[valid]).astype(np.intp)] = True
+        return tiles
+
+    def tilesRegion(self, tiles):
+        # 每行相邻的格子合并成一个矩形, 按从上到下从左到右的顺序直接设置给QRegion
+        size = self.TileSize
+        padded = np.zeros((tiles.shape[0], tiles.shape[1] + 2), np.int8)
+        padded[:, 1:-1] = tiles
+        edges = np.diff(padded, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        region = QRegion()
+        region.setRects([QRect(start * size, row * size, (end - start) * size, size)
+                         for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist())])
+        return region
 
     def paintEvent(self, event):
         super(CircleLineWindow, self).paintEvent(event)
         if not self._canDraw:
             return
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.setRenderHint(QPainter.Antialiasing, self.quality >= 2)
         self.draw(painter)
 
     def draw(self, painter):
-        if circlePulse:
-            if circleExp < circleExpMin or circleExp > circleExpMax:
-                circleExpSp *= -1
-            circleExp += circleExpSp
-
+        t = time()
         painter.translate(self.screenWidth / 2, self.screenHeight / 2)
-
-        if self._firstDraw:
-            t = time()
         self.renderPoints(painter, points)
-        if self._firstDraw:
-            self._firstDraw = False
-            # 此处有个比例关系用于设置timer的时间，如果初始窗口很小，没有比例会导致动画很快
-            t = (time() - t) * 1000 * 2
-            # 比例最大不能超过1920/800
-            t = int(min(2.4, self.screenHeight / self.height()) * t) - 1
-            t = t if t > 15 else 15  # 不能小于15s
-            print('start timer(%d msec)' % t)
-            # 开启定时器
-            self._timer.start(t)
+        self.govern((time() - t) * 1000)
+
+    def govern(self, frameTime):
+        """根据绘制耗时调整画质和帧率: 超过帧间隔的一半就降低, 长时间很快再提高"""
+        self.frameTime = self.frameTime * 0.9 + frameTime * 0.1
+        interval = self.QualityIntervals[self.quality]
+        quality = self.quality
+        if self.frameTime > interval / 2 and quality > 0:
+            quality -= 1
+        elif self.frameTime < interval / 5 and quality < 2:
+            self._fastFrames += 1
+            if self._fastFrames > 120:
+                quality += 1
+        else:
+            self._fastFrames = 0
+        if quality != self.quality:
+            print('quality: %d -> %d (%.2f msec)' % (self.quality, quality, self.frameTime))
+            self.quality = quality
+            self._fastFrames = 0
+            self._timer.setInterval(self.QualityIntervals[quality])
 
     def drawCircle(self, painter, circle):
-        #         circle.radius *= circleExp
-        if circle.background:
-            circle.radius *= circleExp
-        else:
-            circle.radius /= circleExp
-        radius = circle.radius
-
-        r = radius * circleExp
-        # 边框颜色设置透明度
-        c = QColor(circle.borderColor)
-        c.setAlphaF(circle.opacity)
-
-        painter.save()
-        if circle.filled == 'full':
-            # 设置背景刷
-            painter.setBrush(c)
-            painter.setPen(Qt.NoPen)
-        else:
-            # 设置画笔
-            painter.setPen(
-                QPen(c, max(1, circleBorder * (radMin - circle.radius) / (radMin - radMax))))
-
-        # 画实心圆或者圆圈
-        painter.drawEllipse(circle.x - r, circle.y - r, 2 * r, 2 * r)
-        painter.restore()
-
-        if circle.filled == 'concentric':
-            r = radius / 2
-            # 画圆圈
-            painter.save()
-            painter.setBrush(Qt.NoBrush)
-            painter.setPen(
-                QPen(c, max(1, circleBorder * (radMin - circle.radius) / (radMin - radMax))))
-            painter.drawEllipse(circle.x - r, circle.y - r, 2 * r, 2 * r)
-            painter.restore()
-
-        circle.x += circle.speedx
-        circle.y += circle.speedy
-        if (circle.opacity < maxOpacity):
-            circle.opacity += 0.01
-        circle.ttl -= 1
+        # 半径变化(circlePulse)后重新生成
+        if circle.sprite is None or abs(circle.sprite.width() - circle.spriteSize()) > 1:
+            circle.sprite = circleSprite(circle)
+        half = circle.sprite.width() / 2
+        painter.setOpacity(circle.opacity)
+        painter.drawPixmap(QPointF(circle.x - half, circle.y - half), circle.sprite)
 
     def renderPoints(self, painter, circles):
-        for i, circle in enumerate(circles):
-            if circle.ttl < -20:
-                # 重新初始化一个
-                circle = Circle('', self.screenWidth, self.screenHeight)
-                circles[i] = circle
+        for circle in circles:
             self.drawCircle(painter, circle)
+        painter.setOpacity(1)
 
-        circles_len = len(circles)
-        for i in range(circles_len - 1):
-            for j in range(i + 1, circles_len):
-                deltax = circles[i].x - circles[j].x
-                deltay = circles[i].y - circles[j].y
-                dist = pow(pow(deltax, 2) + pow(deltay, 2), 0.5)
-                # if the circles are overlapping, no laser connecting them
-                if dist <= circles[i].radius + circles[j].radius:
-                    continue
-                # otherwise we connect them only if the dist is < linkDist
-                if dist < self.linkDist:
-                    xi = (1 if circles[i].x < circles[j].x else -
-                          1) * abs(circles[i].radius * deltax / dist)
-                    yi = (1 if circles[i].y < circles[j].y else -
-                          1) * abs(circles[i].radius * deltay / dist)
-                    xj = (-1 if circles[i].x < circles[j].x else 1) * \
-                        abs(circles[j].radius * deltax / dist)
-                    yj = (-1 if circles[i].y < circles[j].y else 1) * \
-                        abs(circles[j].radius * deltay / dist)
-                    path = QPainterPath()
-                    path.moveTo(circles[i].x + xi, circles[i].y + yi)
-                    path.lineTo(circles[j].x + xj, circles[j].y + yj)
-#                     samecolor = circles[i].color == circles[j].color
-                    c = QColor(circles[i].borderColor)
-                    c.setAlphaF(min(circles[i].opacity, circles[j].opacity)
-                                * ((self.linkDist - dist) / self.linkDist))
-                    painter.setPen(QPen(c, (
-                        lineBorder * backgroundMlt if circles[i].background else lineBorder) * (
-                        (self.linkDist - dist) / self.linkDist)))
-                    painter.drawPath(path)
+        color = QColor()
+        pen = QPen()
+        for i, x1, y1, x2, y2, alpha, width in self._links:
+            color.setRgb(circles[i].borderColor.rgb())
+            color.setAlphaF(alpha)
+            pen.setColor(color)
+            pen.setWidthF(width)
+            painter.setPen(pen)
+            painter.drawLine(QLineF(x1, y1, x2, y2))
 
 
 if __name__ == '__main__':
     import sys
-    from PyQt5.QtWidgets import QApplication
     app = QApplication(sys.argv)
     w = CircleLineWindow()
     w.resize(800, 600)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: FacePipelineBenchmark
+@description: 不需要dlib和特征点模型, 用生成的视频和固定耗时的处理函数测试FacePipeline
+    检测比帧间隔慢时应该丢弃旧帧而不是排队: 排队时间不会越来越长, 显示的帧数+丢弃的帧数=视频帧数
+    python FacePipelineBenchmark.py [帧数]
+"""
+from functools import partial
+import os
+import shutil
+import sys
+import tempfile
+from time import sleep, perf_counter
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from Lib.FacePipeline import FacePipeline, makeSyntheticVideo  # @UnresolvedImport
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+FPS = 24
+
+
+def slowProcess(image, delay):
+    """代替detectFaces, 固定耗时delay秒, 进程池中使用时需要能被pickle"""
+    t = perf_counter()
+    sleep(delay)
+    return image, 0, {'detect': (perf_counter() - t) * 1000}
+
+
+def run(path, delay, workers=1, processes=False):
+    """按视频帧率读取, 返回(显示的帧数, 流水线)"""
+    pipeline = FacePipeline(path, process=partial(slowProcess, delay=delay),
+                            workers=workers, processes=processes, realtime=True)
+    shown = []
+
+    def show():
+        frame = pipeline.takeFrame()
+        if frame is not None:
+            shown.append(frame.index)
+
+    loop = QEventLoop()
+    pipeline.frameReady.connect(show)
+    # 最后一帧的frameReady可能在finished之后才处理
+    pipeline.finished.connect(lambda: QTimer.singleShot(0, loop.quit))
+    pipeline.start()
+    loop.exec_()
+    show()
+    pipeline.stop()
+    # 显示的帧顺序不会倒退
+    assert shown == sorted(shown), 'frames shown out of order'
+    return len(shown), pipeline
+
+
+if __name__ == '__main__':
+    app = QCoreApplication(sys.argv)
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 96
+    folder = tempfile.mkdtemp()
+    try:
+        path = makeSyntheticVideo(os.path.join(folder, 'synthetic.avi'),
+                                  frames=frames, size=(320, 240), fps=FPS)
+        interval = 1000 / FPS
+        print('%d frames, %.1fms between frames' % (frames, interval))
+        for delay, workers, processes in ((0.01, 1, False), (0.1, 1, False),
+                                          (0.1, 4, False), (0.1, 4, True)):
+            shown, pipeline = run(path, delay, workers, processes)
+            queue = pipeline.stats['queue']
+            print('detect %3.0fms  %d %s  shown %3d  dropped %3d' % (
+                delay * 1000, workers, 'processes' if processes else 'threads  ',
+                shown, pipeline.dropped))
+            print('    ' + pipeline.summary())
+            assert shown + pipeline.dropped == frames, 'frames lost or duplicated'
+            # 排队的话后面的帧要等前面所有的帧, 排队时间会一直增长
+            assert queue.maximum < delay * 1000 + 2 * interval + 50, \
+                'frames are queued instead of dropped'
+            if delay * 1000 / workers > interval:
+                assert pipeline.dropped > 0, 'slow detection should drop frames'
+    finally:
+        shutil.rmtree(folder)
@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: FacePipeline
+@description: 人脸特征点流水线: 采集 -> 检测(线程池/进程池) -> 显示
+    每一级之间只保留最新的一帧, 处理不过来时丢弃旧帧, 界面不会卡住
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import os
+from threading import Thread, Condition, Semaphore, Lock, local
+from time import perf_counter, sleep
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+import cv2  # @UnresolvedImport
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+DOWNSCALE = 4
+CASCADE = 'Data/lbpcascades/lbpcascade_frontalface.xml'
+PREDICTOR = 'Data/shape_predictor_68_face_landmarks.dat'
+
+# 每个检测线程(进程)自己的检测器
+_detectors = local()
+
+
+class LatestQueue:
+    """有界队列, 满了以后新的替换最旧的(最新的一帧优先)"""
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._condition = Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """放入一项, 返回放入前是否为空"""
+        with self._condition:
+            empty = not self._items
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+            return empty
+
+    def get(self, timeout=None):
+        """取出最旧的一项, 关闭后返回None"""
+        with self._condition:
+            while not self._items and not self._closed:
+                if not self._condition.wait(timeout):
+                    return None
+            return self._items.popleft() if self._items else None
+
+    def takeLatest(self):
+        """取出最新的一项并丢弃其它的, 没有时返回None"""
+        with self._condition:
+            if not self._items:
+                return None
+            item = self._items.pop()
+            self.dropped += len(self._items)
+            self._items.clear()
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class Latency:
+    """某一级的耗时统计(毫秒)"""
+
+    __slots__ = ('count', 'last', 'average', 'maximum')
+
+    def __init__(self):
+        self.count = 0
+        self.last = self.average = self.maximum = 0.0
+
+    def add(self, ms):
+        self.count += 1
+        self.last = ms
+        # 滑动平均
+        self.average = ms if self.count == 1 else self.average * 0.9 + ms * 0.1
+        self.maximum = max(self.maximum, ms)
+
+    def __str__(self):
+        return '%.1f/%.1fms' % (self.average, self.maximum)
+
+
+class Frame:
+
+    __slots__ = ('index', 'time', 'image', 'faces', 'timings', 'qimage')
+
+    def __init__(self, index, time, image):
+        self.index = index
+        # 采集到的时间(perf_counter)
+        self.time = time
+        self.image = image
+        self.faces = 0
+        self.timings = {}
+        self.qimage = None
+
+
+def toQImage(image):
+    """BGR的numpy图像直接包装为QImage, 不复制数据
+    返回QImage和它使用的numpy数组, 显示期间需要保留数组的引用
+    """
+    height, width = image.shape[:2]
+    if hasattr(QImage, 'Format_BGR888'):
+        # Qt 5.14+
+        return QImage(image.data, width, height, image.strides[0],
+                      QImage.Format_BGR888), image
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return QImage(image.data, width, height, image.strides[0],
+                  QImage.Format_RGB888), image
+
+
+def detectorFor(cascade, predictor):
+    detectors = getattr(_detectors, 'value', None)
+    if detectors is None or detectors[0] != (cascade, predictor):
+        import dlib
+        detectors = _detectors.value = (
+            (cascade, predictor), cv2.CascadeClassifier(cascade),
+            dlib.get_frontal_face_detector(), dlib.shape_predictor(predictor))
+    return detectors[1:]
+
+
+def detectFaces(image, cascade=CASCADE, predictor=PREDICTOR, downscale=DOWNSCALE):
+    """检测人脸并画出特征点, 返回(图像, 人脸数量, 各步骤耗时)
+    在线程池或进程池中运行, 所以是模块级的函数
+    """
+    timings = {}
+    t = perf_counter()
+    cascade, detector, predictor = detectorFor(cascade, predictor)
+    minisize = (int(image.shape[1] / downscale), int(image.shape[0] / downscale))
+    tmpframe = cv2.resize(image, minisize)
+    tmpframe = cv2.cvtColor(tmpframe, cv2.COLOR_BGR2GRAY)  # 做灰度处理
+    tmpframe = cv2.equalizeHist(tmpframe)
+    # minNeighbors表示每一个目标至少要被检测到5次
+    faces = cascade.detectMultiScale(tmpframe, minNeighbors=5)
+    now = perf_counter()
+    timings['detect'] = (now - t) * 1000
+
+    t = now
+    points = []
+    for x, y, w, h in faces:
+        x, y, w, h = x * downscale, y * downscale, w * downscale, h * downscale
+        # 截取的人脸部分
+        tmpframe = image[y:y + h, x:x + w]
+        rects = detector(tmpframe, 1)
+        if len(rects) > 0:
+            points.extend((p.x + x, p.y + y)
+                          for p in predictor(tmpframe, rects[0]).parts())
+    now = perf_counter()
+    timings['landmarks'] = (now - t) * 1000
+
+    t = now
+    for x, y, w, h in faces:
+        x, y, w, h = x * downscale, y * downscale, w * downscale, h * downscale
+        # 画脸矩形
+        cv2.rectangle(image, (x, y), (x + w, y + h), (0, 255, 0))
+    for pos in points:
+        # 在原来画面上画点
+        cv2.circle(image, pos, 3, color=(0, 255, 0))
+    timings['annotate'] = (perf_counter() - t) * 1000
+    return image, len(faces), timings
+
+
+class FacePipeline(QObject):
+    """采集 -> 检测 -> 显示
+
+    - source: 摄像头编号、视频文件路径或有read()/release()方法的对象
+    - process: 处理一帧的函数, 返回(图像, 人脸数量, 耗时字典), 使用进程池时必须能被pickle
+    - workers: 同时处理的帧数
+    - processes: 使用进程池代替线程池
+    - realtime: 视频文件按自身的帧率读取, 模拟摄像头; False时尽快读取
+    - loop: 视频文件结束后从头开始
+
+    frameReady 信号只表示有新的一帧, 界面通过 takeFrame() 取最新的一帧
+    """
+
+    frameReady = pyqtSignal()
+    finished = pyqtSignal()
+    # 处理出错(只发送第一次的错误)
+    error = pyqtSignal(str)
+
+    def __init__(self, source=0, process=detectFaces, workers=None,
+                 processes=False, realtime=True, loop=False, *args, **kwargs):
+        super(FacePipeline, self).__init__(*args, **kwargs)
+        self.source = source
+        self.process = process
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.processes = processes
+        self.realtime = realtime
+        self.loop = loop
+        self.stats = {name: Latency() for name in (
+            'capture', 'queue', 'detect', 'landmarks', 'annotate', 'display')}
+        self.fps = 0
+        self._capture = None
+        self._executor = None
+        self._running = False
+        self._frames = LatestQueue(1)
+        self._results = LatestQueue(1)
+        self._slots = Semaphore(self.workers)
+        self._lock = Lock()
+        self._lastIndex = -1
+        self._stale = 0
+        self.errors = 0
+        self._lastShown = None
+        self._threads = []
+
+    def open(self):
+        """打开摄像头或视频文件, 失败时抛出异常"""
+        if hasattr(self.source, 'read'):
+            self._capture = self.source
+        else:
+            self._capture = cv2.VideoCapture(self.source)
+            if not self._capture.isOpened():
+                raise IOError('无法打开 %s' % self.source)
+        return self
+
+    def start(self):
+        if self._capture is None:
+            self.open()
+        self._running = True
+        executor = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        self._executor = executor(self.workers)
+        self._threads = [Thread(target=self._captureLoop, daemon=True),
+                         Thread(target=self._dispatchLoop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._running = False
+        self._frames.close()
+        for thread in self._threads:
+            thread.join(2)
+        self._threads = []
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def isRunning(self):
+        return self._running
+
+    @property
+    def dropped(self):
+        """没来得及处理或显示而丢弃的帧数"""
+        return self._frames.dropped + self._results.dropped + self._stale
+
+    def _frameInterval(self):
+        if not self.realtime or isinstance(self.source, int):
+            return 0
+        fps = self._capture.get(cv2.CAP_PROP_FPS) if hasattr(
+            self._capture, 'get') else 0
+        return 1 / fps if fps and fps > 0 else 0
+
+    def _captureLoop(self):
+        interval = self._frameInterval()
+        index = 0
+        nextTime = perf_counter()
+        while self._running:
+            t = perf_counter()
+            ok, image = self._capture.read()
+            if not ok:
+                if self.loop and hasattr(self._capture, 'set') and index:
+                    self._capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    continue
+                break
+            now = perf_counter()
+            self.stats['capture'].add((now - t) * 1000)
+            self._frames.put(Frame(index, now, image))
+            index += 1
+            if interval:
+                nextTime += interval
+                delay = nextTime - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+                else:
+                    nextTime = perf_counter()
+        self._frames.close()
+
+    def _dispatchLoop(self):
+        while True:
+            # 先等空闲的检测线程再取帧, 等待期间新的帧会替换旧的
+            self._slots.acquire()
+            frame = self._frames.get()
+            if frame is None:
+                self._slots.release()
+                break
+            frame.timings['queue'] = (perf_counter() - frame.time) * 1000
+            try:
+                future = self._executor.submit(self.process, frame.image)
+            except RuntimeError:
+                # 已经停止
+                self._slots.release()
+                break
+            future.add_done_callback(lambda f, frame=frame: self._onDone(f, frame))
+        # 等待检测中的帧完成
+        for _ in range(self.workers):
+            self._slots.acquire()
+        for _ in range(self.workers):
+            self._slots.release()
+        self._running = False
+        self.finished.emit()
+
+    def _onDone(self, future, frame):
+        self._slots.release()
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.errors += 1
+            if self.errors == 1:
+                self.error.emit(str(future.exception()))
+            return
+        image, frame.faces, timings = future.result()
+        frame.timings.update(timings)
+        # 转换为QImage在这里完成, 界面线程只负责绘制
+        frame.qimage, frame.image = toQImage(image)
+        with self._lock:
+            # 多个线程同时检测时, 比已经显示的还旧的帧直接丢弃
+            if frame.index < self._lastIndex:
+                self._stale += 1
+                return
+            self._lastIndex = frame.index
+            for name, ms in frame.timings.items():
+                self.stats.setdefault(name, Latency()).add(ms)
+        if self._results.put(frame):
+            self.frameReady.emit()
+
+    def takeFrame(self):
+        """取最新处理好的一帧(在界面线程调用), 没有时返回None"""
+        frame = self._results.takeLatest()
+        if frame is None:
+            return None
+        now = perf_counter()
+        self.stats['display'].add((now - frame.time) * 1000)
+        if self._lastShown is not None and now > self._lastShown:
+            fps = 1 / (now - self._lastShown)
+            self.fps = fps if not self.fps else self.fps * 0.9 + fps * 0.1
+        self._lastShown = now
+        return frame
+
+    def summary(self):
+        return 'fps %.1f  dropped %d  ' % (self.fps, self.dropped) + '  '.join(
+            '%s %s' % (name, latency) for name, latency in self.stats.items())
+
+
+def makeSyntheticVideo(path, frames=240, size=(640, 480), fps=24):
+    """生成一个测试用的视频文件, 画面中有移动的圆和帧号"""
+    import numpy
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
+    if not writer.isOpened():
+        raise IOError('无法写入 %s' % path)
+    width, height = size
+    for i in range(frames):
+        image = numpy.full((height, width, 3), 40, numpy.uint8)
+        x = int(width / 2 + width / 3 * numpy.cos(i / 20))
+        y = int(height / 2 + height / 3 * numpy.sin(i / 15))
+        cv2.circle(image, (x, y), 60, (200, 180, 160), -1)
+        cv2.putText(image, str(i), (20, 40), cv2.FONT_HERSHEY_SIMPLEX,
+                    1, (255, 255, 255), 2)
+        writer.write(image)
+    writer.release()
+    return path
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ModelDownloader
+@description: 下载.bz2压缩的数据文件, 边下载边在线程中解压
+    - 内存有界: 网络数据分块放入有限长度的队列, 队列满时暂停读取
+    - 断点续传: 未下载完的压缩包保存为.bz2.part, 下次用Range请求剩余部分
+    - 校验: 可选的sha256(或其它hashlib算法)和bz2流完整性
+"""
+from bz2 import BZ2Decompressor
+import hashlib
+import os
+from queue import Queue, Full
+from threading import Thread
+
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest,\
+    QNetworkReply
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+# 每次读取/解压输出的最大字节数
+ChunkSize = 256 * 1024
+# 等待解压的块数量, 最多占用 ChunkSize * QueueSize 内存
+QueueSize = 8
+
+# 队列中的结束标记
+_Finished = object()
+_Aborted = object()
+
+
+class DecompressWorker(QObject):
+    """在线程中把压缩数据追加到.bz2.part, 同时计算校验值并解压到输出文件"""
+
+    consumed = pyqtSignal()
+    # 解压后的文件大小
+    decompressed = pyqtSignal(int)
+    done = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, archive, output, resume, algorithm='sha256',
+                 checksum=None, *args, **kwargs):
+        super(DecompressWorker, self).__init__(*args, **kwargs)
+        self.archive = archive
+        self.output = output
+        # True时先解压已经下载的部分, False时重新下载
+        self.resume = resume
+        self.algorithm = algorithm
+        self.checksum = checksum
+        self.queue = Queue(QueueSize)
+        self._hash = hashlib.new(algorithm)
+        self._decompressor = BZ2Decompressor()
+        self._written = 0
+        self._thread = Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def put(self, data):
+        """阻塞放入队列, 解压线程已经结束(出错)时直接返回"""
+        while self._thread.is_alive():
+            try:
+                return self.queue.put(data, timeout=0.1)
+            except Full:
+                pass
+
+    def _decompress(self, data, out):
+        self._hash.update(data)
+        while True:
+            if self._decompressor.eof:
+                # 多个bz2流连接在一起
+                data = self._decompressor.unused_data + data
+                if not data:
+                    return
+                self._decompressor = BZ2Decompressor()
+            chunk = self._decompressor.decompress(data, ChunkSize)
+            data = b''
+            out.write(chunk)
+            self._written += len(chunk)
+            if self._decompressor.needs_input and not self._decompressor.eof:
+                return
+
+    def run(self):
+        try:
+            with open(self.output, 'wb') as out:
+                if self.resume and os.path.exists(self.archive):
+                    # 已下载的部分重新解压, 解压器的状态无法保存
+                    with open(self.archive, 'rb') as fp:
+                        for data in iter(lambda: fp.read(ChunkSize), b''):
+                            self._decompress(data, out)
+                    self.decompressed.emit(self._written)
+                with open(self.archive, 'ab' if self.resume else 'wb') as fp:
+                    while True:
+                        data = self.queue.get()
+                        if data is _Aborted:
+                            return
+                        if data is _Finished:
+                            break
+                        fp.write(data)
+                        self._decompress(data, out)
+                        self.consumed.emit()
+                        self.decompressed.emit(self._written)
+        except Exception as e:
+            self._removeAll()
+            return self.error.emit('解压失败：' + str(e))
+        if not self._decompressor.eof:
+            # 服务器已经发送完所有数据, 压缩包本身不完整, 下次重新下载
+            self._removeAll()
+            return self.error.emit('压缩数据不完整')
+        if self.checksum and self._hash.hexdigest().lower() != self.checksum.lower():
+            self._removeAll()
+            return self.error.emit('校验失败：%s' % self._hash.hexdigest())
+        self.done.emit(self.output)
+
+    def _removeAll(self):
+        for path in (self.archive, self.output):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+class ModelDownloader(QObject):
+    """下载并解压 url 指向的.bz2文件到 path
+
+    - checksum: 压缩包的校验值(十六进制), 为空时只检查bz2流是否完整
+    - progress(已下载, 总大小) 总大小来自Content-Length/Content-Range, 未知时为-1
+    """
+
+    progress = pyqtSignal(int, int)
+    decompressed = pyqtSignal(int)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, url, path, checksum=None, algorithm='sha256',
+                 *args, **kwargs):
+        super(ModelDownloader, self).__init__(*args, **kwargs)
+        self.url = url
+        self.path = path
+        self.checksum = checksum
+        self.algorithm = algorithm
+        self.archive = path + '.bz2'
+        self.partial = path + '.bz2.part'
+        self.received = 0
+        self.total = -1
+        self._offset = 0
+        self._reply = None
+        self._worker = None
+        self._aborted = False
+        self._sentEnd = False
+        self._manager = QNetworkAccessManager(self)
+
+    def start(self):
+        self._aborted = False
+        self._sentEnd = False
+        if os.path.exists(self.archive):
+            # 压缩包已经下载完成, 只需要解压
+            self.received = self.total = os.path.getsize(self.archive)
+            self._startWorker(self.archive, True)
+            self._sentEnd = True
+            self._worker.queue.put(_Finished)
+            return
+        self._offset = os.path.getsize(self.partial) if os.path.exists(
+            self.partial) else 0
+        request = QNetworkRequest(QUrl(self.url))
+        request.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
+        if self._offset:
+            request.setRawHeader(b'Range', b'bytes=%d-' % self._offset)
+        self._reply = self._manager.get(request)
+        # 读取缓冲区有限, 队列满时不再从网络读取
+        self._reply.setReadBufferSize(ChunkSize * 2)
+        self._reply.metaDataChanged.connect(self._onMetaData)
+        self._reply.readyRead.connect(self._pump)
+        self._reply.finished.connect(self._onReplyFinished)
+
+    def abort(self):
+        """停止下载, 已下载的部分保留, 下次继续"""
+        self._aborted = True
+        self._stopWorker(_Aborted)
+        if self._reply:
+            self._reply.abort()
+
+    def isRunning(self):
+        return self._worker is not None
+
+    def _startWorker(self, archive, resume):
+        self._worker = DecompressWorker(
+            archive, self.path + '.part', resume, self.algorithm, self.checksum)
+        self._worker.consumed.connect(self._pump)
+        self._worker.decompressed.connect(self.decompressed)
+        self._worker.done.connect(self._onDone)
+        self._worker.error.connect(self._onError)
+        self._worker.start()
+
+    def _stopWorker(self, end):
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        if not self._sentEnd:
+            # 已经收到的数据写入.part后再停止, 下次从这里继续
+            reply = self._reply
+            while reply is not None and reply.isOpen() and reply.bytesAvailable():
+                worker.put(reply.read(ChunkSize))
+            self._sentEnd = True
+            worker.put(end)
+        worker.join()
+
+    def _onMetaData(self):
+        if self._worker is not None or self._reply.error():
+            return
+        status = self._reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status not in (200, 206):
+            return
+        resume = status == 206
+        if not resume:
+            # 服务器不支持Range, 从头下载
+            self._offset = 0
+        length = self._reply.header(QNetworkRequest.ContentLengthHeader)
+        contentRange = bytes(self._reply.rawHeader(b'Content-Range')).decode()
+        if resume and '/' in contentRange and not contentRange.endswith('*'):
+            self.total = int(contentRange.rsplit('/', 1)[1])
+        elif length is not None:
+            self.total = self._offset + int(length)
+        else:
+            self.total = -1
+        self.received = self._offset
+        self._startWorker(self.partial, resume)
+        self.progress.emit(self.received, self.total)
+
+    def _pump(self):
+        """把网络数据放入解压队列, 队列满时等待解压线程的consumed信号"""
+        reply, worker = self._reply, self._worker
+        if reply is None or worker is None or self._sentEnd:
+            return
+        while not worker.queue.full() and reply.bytesAvailable():
+            data = reply.read(ChunkSize)
+            worker.queue.put_nowait(data)
+            self.received += len(data)
+        self.progress.emit(self.received, self.total)
+        if reply.isFinished() and not reply.bytesAvailable() and \
+                not worker.queue.full() and not reply.error():
+            self._sentEnd = True
+            worker.queue.put_nowait(_Finished)
+
+    def _onReplyFinished(self):
+        reply = self._reply
+        if self._aborted:
+            return
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status == 416 and self._offset:
+            # 已下载的部分已经是完整的文件(或者服务器上的文件变了), 交给解压线程检查
+            self._reply = None
+            reply.deleteLater()
+            self._startWorker(self.partial, True)
+            self._sentEnd = True
+            self._worker.queue.put(_Finished)
+            return
+        if reply.error() != QNetworkReply.NoError or status not in (200, 206):
+            self._stopWorker(_Aborted)
+            self._reply = None
+            reply.deleteLater()
+            return self.failed.emit('下载失败：%s' % (
+                reply.errorString() if reply.error() else status))
+        self._onMetaData()
+        self._pump()
+
+    def _onDone(self, output):
+        worker, self._worker = self._worker, None
+        if worker:
+            worker.join()
+        if self._reply:
+            self._reply.deleteLater()
+            self._reply = None
+        try:
+            if os.path.exists(self.partial):
+                os.replace(self.partial, self.archive)
+            os.replace(output, self.path)
+        except OSError as e:
+            return self.failed.emit(str(e))
+        self.finished.emit(self.path)
+
+    def _onError(self, message):
+        if self._aborted:
+            return
+        # 解压线程已经结束
+        worker, self._worker = self._worker, None
+        if worker:
+            worker.join()
+        if self._reply:
+            self._reply.abort()
+        self.failed.emit(message)
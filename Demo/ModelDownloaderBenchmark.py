@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ModelDownloaderBenchmark
+@description: 用本地HTTP服务器和生成的压缩包测试ModelDownloader
+    完整下载、断点续传、服务器不支持Range、校验失败, 以及和原来一次性解压的内存对比
+"""
+from bz2 import BZ2Decompressor, compress
+import hashlib
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import os
+import shutil
+import sys
+import tempfile
+from threading import Thread
+from time import perf_counter
+import tracemalloc
+
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from Lib.ModelDownloader import ModelDownloader
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class Handler(BaseHTTPRequestHandler):
+    """支持Range的静态文件, cutAt不为空时发送到这个位置就断开"""
+
+    archive = b''
+    supportRange = True
+    cutAt = None
+    ranges = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = self.archive
+        start = 0
+        header = self.headers.get('Range')
+        Handler.ranges.append(header)
+        if header and self.supportRange:
+            start = int(header.split('=')[1].split('-')[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', 'bytes */%d' % len(data))
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (
+                start, len(data) - 1, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        end = len(data) if self.cutAt is None else max(self.cutAt, start)
+        try:
+            for i in range(start, end, 65536):
+                self.wfile.write(data[i:min(i + 65536, end)])
+        except ConnectionError:
+            pass
+        if self.cutAt is not None:
+            # 模拟网络中断
+            self.close_connection = True
+
+
+def makeArchive(size=8 * 1024 * 1024):
+    """一半随机一半重复的数据, 压缩率和模型文件差不多"""
+    data = bytearray(os.urandom(size // 2))
+    data.extend(bytes(range(256)) * (size // 2 // 256))
+    return bytes(data), compress(bytes(data), 1)
+
+
+def download(url, path, checksum=None, abortAt=None):
+    """运行一次下载, 返回(结果, 进度记录, 耗时, python内存峰值)"""
+    app = QCoreApplication.instance()
+    downloader = ModelDownloader(url, path, checksum)
+    loop = QEventLoop()
+    result = []
+    progress = []
+    downloader.progress.connect(lambda r, t: progress.append((r, t)))
+    downloader.finished.connect(lambda p: (result.append(('ok', p)), loop.quit()))
+    downloader.failed.connect(lambda m: (result.append(('failed', m)), loop.quit()))
+    if abortAt is not None:
+        def check(r, t):
+            if r >= abortAt and not result:
+                downloader.abort()
+                result.append(('aborted', r))
+                loop.quit()
+        downloader.progress.connect(check)
+    QTimer.singleShot(60000, loop.quit)
+    tracemalloc.start()
+    t = perf_counter()
+    downloader.start()
+    loop.exec_()
+    elapsed = perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    app.processEvents()
+    return (result[0] if result else ('timeout', None)), progress, elapsed, peak
+
+
+def oldDecompress(archive, path):
+    """原来的做法: 读取整个压缩包一次解压"""
+    tracemalloc.start()
+    t = perf_counter()
+    data = BZ2Decompressor().decompress(open(archive, 'rb').read())
+    open(path, 'wb').write(data)
+    elapsed = perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def same(path, data):
+    return os.path.exists(path) and open(path, 'rb').read() == data
+
+
+if __name__ == '__main__':
+    app = QCoreApplication(sys.argv)
+    data, archive = makeArchive()
+    Handler.archive = archive
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://127.0.0.1:%d/model.dat.bz2' % server.server_port
+    checksum = hashlib.sha256(archive).hexdigest()
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'model.dat')
+    MB = 1024 * 1024
+    print('archive %.1fMB -> %.1fMB' % (len(archive) / MB, len(data) / MB))
+
+    try:
+        # 完整下载
+        state, progress, elapsed, peak = download(url, path, checksum)
+        print('download: %s, %.2fs, peak %.1fMB, total %s, ok %s' % (
+            state[0], elapsed, peak / MB, progress[-1][1] == len(archive),
+            same(path, data)))
+
+        # 原来的一次性解压
+        elapsed, peak = oldDecompress(path + '.bz2', path + '.old')
+        print('old decompress: %.2fs, peak %.1fMB' % (elapsed, peak / MB))
+        shutil.rmtree(folder)
+        os.mkdir(folder)
+
+        # 网络中断后继续
+        Handler.cutAt = len(archive) * 2 // 5
+        Handler.ranges = []
+        state, progress, _, _ = download(url, path, checksum)
+        partial = os.path.getsize(path + '.bz2.part')
+        Handler.cutAt = None
+        state2, progress2, _, _ = download(url, path, checksum)
+        print('interrupted: %s (%d bytes kept), resumed: %s, range %s, '
+              'progress from %d/%d, ok %s' % (
+                  state[0], partial, state2[0], Handler.ranges[-1],
+                  progress2[0][0], progress2[0][1], same(path, data)))
+        shutil.rmtree(folder)
+        os.mkdir(folder)
+
+        # 手动停止后继续
+        state, _, _, _ = download(url, path, checksum, abortAt=len(archive) // 2)
+        state2, _, _, _ = download(url, path, checksum)
+        print('aborted: %s, resumed: %s, ok %s' % (
+            state[0], state2[0], same(path, data)))
+        shutil.rmtree(folder)
+        os.mkdir(folder)
+
+        # 服务器不支持Range, 从头下载
+        Handler.cutAt = len(archive) // 3
+        download(url, path, checksum)
+        Handler.cutAt = None
+        Handler.supportRange = False
+        state, progress, _, _ = download(url, path, checksum)
+        Handler.supportRange = True
+        print('no range: %s, progress from %d, ok %s' % (
+            state[0], progress[0][0], same(path, data)))
+        shutil.rmtree(folder)
+        os.mkdir(folder)
+
+        # 校验失败
+        state, _, _, _ = download(url, path, '0' * 64)
+        print('bad checksum: %s (%s), files left %s' % (
+            state[0], state[1][:8], os.listdir(folder)))
+    finally:
+        server.shutdown()
+        shutil.rmtree(folder, ignore_errors=True)
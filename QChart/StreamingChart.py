@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: StreamingChart
+@description: 高频数据实时曲线, 固定容量的环形缓冲区+按像素宽度抽样, 每帧只调用一次replace
+"""
+import sys
+from math import pi
+from time import perf_counter
+
+from PyQt5.QtChart import QChartView, QChart, QLineSeries, QValueAxis
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QPainter, QPen, QPolygonF
+from PyQt5.QtWidgets import QApplication
+import numpy as np
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = "Copyright (c) 2019 Irony"
+__Version__ = "Version 1.0"
+
+
+class RingBuffer:
+    """固定容量的(x, y)环形缓冲区, 追加为O(1), 超出容量后覆盖最旧的数据
+    x需要递增
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._x = np.empty(capacity, np.float64)
+        self._y = np.empty(capacity, np.float64)
+        self._pos = 0   # 下一个写入位置
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, x, y):
+        self._x[self._pos] = x
+        self._y[self._pos] = y
+        self._pos = (self._pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, xs, ys):
+        xs = np.asarray(xs, np.float64)[-self.capacity:]
+        ys = np.asarray(ys, np.float64)[-self.capacity:]
+        n = len(xs)
+        first = min(n, self.capacity - self._pos)
+        self._x[self._pos:self._pos + first] = xs[:first]
+        self._y[self._pos:self._pos + first] = ys[:first]
+        # 回绕到开头
+        self._x[:n - first] = xs[first:]
+        self._y[:n - first] = ys[first:]
+        self._pos = (self._pos + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def segments(self):
+        # 按时间顺序的一段或两段视图
+        if self._size < self.capacity:
+            return [(self._x[:self._size], self._y[:self._size])]
+        return [(self._x[self._pos:], self._y[self._pos:]),
+                (self._x[:self._pos], self._y[:self._pos])]
+
+    def last(self):
+        index = (self._pos - 1) % self.capacity
+        return self._x[index], self._y[index]
+
+    def since(self, x0):
+        """返回x >= x0的数据(复制), 只和可见部分的长度有关
+        """
+        xs = []
+        ys = []
+        for x, y in self.segments():
+            start = np.searchsorted(x, x0)
+            xs.append(x[start:])
+            ys.append(y[start:])
+        return np.concatenate(xs), np.concatenate(ys)
+
+
+def minMaxDecimate(xs, ys, width):
+    """把数据分成width个桶, 每个桶只保留最小和最大两个点(按原顺序)
+    这样绘制出来和全部数据在每个像素列上的范围是一样的
+    """
+    n = len(xs)
+    if width <= 0 or n <= width * 2:
+        return xs, ys
+    size = n // width
+    start = n - size * width    # 丢掉最旧的不足一个桶的点
+    bx = xs[start:].reshape(width, size)
+    by = ys[start:].reshape(width, size)
+    imin = by.argmin(1)
+    imax = by.argmax(1)
+    first = np.minimum(imin, imax)
+    second = np.maximum(imin, imax)
+    rows = np.arange(width)
+    outx = np.empty(width * 2)
+    outy = np.empty(width * 2)
+    outx[0::2] = bx[rows, first]
+    outx[1::2] = bx[rows, second]
+    outy[0::2] = by[rows, first]
+    outy[1::2] = by[rows, second]
+    return outx, outy
+
+
+def toPolygonF(xs, ys):
+    # 直接写入QPolygonF的内存, 不逐个创建QPointF
+    polygon = QPolygonF(len(xs))
+    ptr = polygon.data()
+    ptr.setsize(len(xs) * 2 * 8)
+    buffer = np.frombuffer(ptr, np.float64)
+    buffer[0::2] = xs
+    buffer[1::2] = ys
+    return polygon
+
+
+class StreamingChart(QChart):
+
+    def __init__(self, capacity=1000000, window=10.0, fps=60, autoRange=True, *args, **kwargs):
+        super(StreamingChart, self).__init__(*args, **kwargs)
+        self.buffer = RingBuffer(capacity)
+        self.window = window    # 显示最近多少秒
+        self.autoRange = autoRange
+        self._dirty = False
+
+        self.series = QLineSeries(self)
+        pen = QPen(Qt.red)
+        pen.setWidth(1)
+        self.series.setPen(pen)
+        self.axisX = QValueAxis()
+        self.axisY = QValueAxis()
+        self.addSeries(self.series)
+        self.addAxis(self.axisX, Qt.AlignBottom)
+        self.addAxis(self.axisY, Qt.AlignLeft)
+        self.series.attachAxis(self.axisX)
+        self.series.attachAxis(self.axisY)
+        self.axisX.setTickCount(5)
+        self.axisX.setRange(0, window)
+        self.axisY.setRange(-5, 5)
+
+        # 数据到来时只写入缓冲区, 由帧定时器统一刷新
+        self.timer = QTimer(self, timeout=self.updateFrame)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(int(1000 / fps))
+        self.timer.start()
+
+    def append(self, x, y):
+        self.buffer.append(x, y)
+        self._dirty = True
+
+    def extend(self, xs, ys):
+        self.buffer.extend(xs, ys)
+        self._dirty = True
+
+    def updateFrame(self):
+        if not self._dirty or not len(self.buffer):
+            return
+        self._dirty = False
+        right, _ = self.buffer.last()
+        left = right - self.window
+        xs, ys = self.buffer.since(left)
+        xs, ys = minMaxDecimate(xs, ys, int(self.plotArea().width()) or 1)
+        self.series.replace(toPolygonF(xs, ys))
+        self.axisX.setRange(left, right)
+        if self.autoRange and len(ys):
+            low = ys.min()
+            high = ys.max()
+            margin = (high - low) * 0.05 or 1
+            self.axisY.setRange(low - margin, high + margin)
+
+
+class SensorFeed:
+    """模拟1kHz的传感器数据, 每次取出从上次到现在的所有采样
+    """
+
+    def __init__(self, rate=1000):
+        self.rate = rate
+        self.start = perf_counter()
+        self.count = 0
+
+    def read(self):
+        total = int((perf_counter() - self.start) * self.rate)
+        index = np.arange(self.count, total)
+        self.count = total
+        xs = index / self.rate
+        ys = np.sin(2 * pi * 0.5 * xs) * 3 + np.random.normal(0, 0.3, len(xs))
+        return xs, ys
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    chart = StreamingChart()
+    chart.setTitle("Streaming chart (1 kHz)")
+    chart.legend().hide()
+
+    feed = SensorFeed()
+    timer = QTimer(timeout=lambda: chart.extend(*feed.read()))
+    timer.start(10)
+
+    view = QChartView(chart)
+    view.setRenderHint(QPainter.Antialiasing)  # 抗锯齿
+    view.resize(800, 400)
+    view.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: StreamingChartBenchmark
+@description: StreamingChart在不同历史长度和采样率下每帧的耗时
+"""
+import sys
+from time import perf_counter
+
+from PyQt5.QtChart import QChartView
+from PyQt5.QtWidgets import QApplication
+import numpy as np
+
+from StreamingChart import StreamingChart
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = "Copyright (c) 2019 Irony"
+__Version__ = "Version 1.0"
+
+Fps = 60
+
+
+def frames(app, view, chart, rate, count=120, start=0):
+    """每帧追加rate/60个点, 刷新曲线并立即重绘, 返回平均帧耗时
+    """
+    batch = max(1, rate // Fps)
+    x = start
+    total = 0
+    for _ in range(count):
+        xs = (np.arange(batch) + x) / rate
+        x += batch
+        ys = np.sin(xs * 3) + np.random.normal(0, 0.3, batch)
+        t = perf_counter()
+        chart.extend(xs, ys)
+        chart.updateFrame()
+        view.viewport().repaint()
+        total += perf_counter() - t
+    return total / count
+
+
+def makeView(capacity, window):
+    chart = StreamingChart(capacity=capacity, window=window)
+    chart.timer.stop()  # 手动刷新
+    chart.legend().hide()
+    view = QChartView(chart)
+    view.resize(800, 400)
+    view.show()
+    return view, chart
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+
+    # 历史长度不影响帧耗时(1kHz, 显示最近10秒)
+    for history in (10000, 100000, 1000000):
+        view, chart = makeView(1000000, 10)
+        app.processEvents()
+        xs = np.arange(history) / 1000
+        chart.extend(xs, np.sin(xs * 3))
+        t = frames(app, view, chart, 1000, start=history)
+        print('history %8d  frame: %.2fms' % (history, t * 1000))
+        view.close()
+
+    # 持续60fps时的吞吐量
+    for rate in (1000, 10000, 100000, 1000000):
+        view, chart = makeView(2000000, 1)
+        app.processEvents()
+        t = frames(app, view, chart, rate)
+        print('rate %8d points/s  frame: %.2fms  %s' % (
+            rate, t * 1000, 'ok' if t < 1 / Fps else 'below 60fps'))
+        view.close()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: FlowLayoutBenchmark
+@description: 流式布局在100/1000/10000个控件时的布局耗时, 先检查增量布局和新布局结果相同
+"""
+import sys
+from random import randint, seed
+from time import perf_counter
+
+from PyQt5.QtWidgets import QApplication, QWidget, QPushButton
+
+from Lib.flowlayout import FlowLayout  # @UnresolvedImport
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = "Copyright (c) 2018 Irony"
+__Version__ = "Version 1.0"
+
+
+def benchmark(app, count):
+    seed(count)
+    widget = QWidget()
+    layout = FlowLayout(widget)
+    for _ in range(count):
+        layout.addWidget(QPushButton('x' * randint(1, 20)))
+
+    t = perf_counter()
+    widget.resize(800, 600)
+    widget.show()
+    app.processEvents()
+    first = perf_counter() - t
+
+    # 拖动窗口宽度
+    t = perf_counter()
+    for width in range(400, 1400, 20):
+        widget.resize(width, 600)
+        layout.heightForWidth(width)
+        app.processEvents()
+    resize = (perf_counter() - t) / 50
+
+    # 追加控件
+    t = perf_counter()
+    for i in range(20):
+        layout.addWidget(QPushButton('new %d' % i))
+        app.processEvents()
+    append = (perf_counter() - t) / 20
+
+    widget.close()
+    widget.deleteLater()
+    print('%6d items  first layout: %8.2fms  resize: %8.2fms  append: %8.2fms' % (
+        count, first * 1000, resize * 1000, append * 1000))
+
+
+def check(app):
+    """改变行首控件的大小和追加控件后, 增量布局和新布局的结果应该相同"""
+    def create(texts):
+        widget = QWidget()
+        layout = FlowLayout(widget)
+        buttons = [QPushButton(text) for text in texts]
+        for button in buttons:
+            layout.addWidget(button)
+        widget.resize(600, 600)
+        widget.show()
+        app.processEvents()
+        return widget, layout, buttons
+
+    texts = ['x' * 20] * 30
+    widget, layout, buttons = create(texts)
+    lineStarts = [start for start, _, _ in layout.lineList if start > 0]
+    for index in lineStarts[:3]:
+        buttons[index].setText('x')
+        texts[index] = 'x'
+        app.processEvents()
+    # 追加控件, 以及同一轮事件里追加控件并改变已有控件的大小
+    for i in range(5):
+        button = QPushButton('new %d' % i)
+        layout.addWidget(button)
+        buttons.append(button)
+        texts.append('new %d' % i)
+        app.processEvents()
+    button = QPushButton('last')
+    layout.addWidget(button)
+    buttons.append(button)
+    texts.append('last')
+    buttons[0].setText('x' * 5)
+    texts[0] = 'x' * 5
+    app.processEvents()
+    incremental = [button.geometry() for button in buttons]
+
+    fresh, _, freshButtons = create(texts)
+    full = [button.geometry() for button in freshButtons]
+    for w in (widget, fresh):
+        w.close()
+        w.deleteLater()
+    assert incremental == full, 'incremental layout differs from full layout'
+    print('incremental layout matches full layout')
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    check(app)
+    for count in (100, 1000, 10000):
+        benchmark(app, count)
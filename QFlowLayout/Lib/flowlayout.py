@@ -42,7 +42,9 @@
 #############################################################################
 
 
-from PyQt5.QtCore import QPoint, QRect, QSize, Qt
+from collections import OrderedDict
+
+from PyQt5.QtCore import QEvent, QRect, QSize, Qt
 from PyQt5.QtWidgets import (QApplication, QLayout, QPushButton, QSizePolicy,
                              QWidget)
 
@@ -64,6 +66,28 @@ class Window(QWidget):
 
 class FlowLayout(QLayout):
     def __init__(self, parent=None, margin=0, spacing=-1):
+        # set up before QLayout.__init__, which may already call invalidate()
+        self.itemList = []
+        # cached (width, height, spaceX, spaceY) for each item
+        self.hintList = []
+        # refetch every hint on the next layout, set when the changed item is unknown
+        self.hintDirty = False
+        # indices of single items whose hints are refetched on the next layout
+        self.dirtyItems = set()
+        # indices of added items that have not been shown yet, showing them
+        # changes their hints but nothing else
+        self.newItems = []
+        # QLayout.activate() calls invalidate() first, that call is not a change
+        self.activating = False
+        self.minSize = None
+        # number of items already expanded into minSize
+        self.minCount = 0
+        # small width -> height memo for heightForWidth
+        self.heightCache = OrderedDict()
+        # (first item index, y from the top, line height) of each line of the last layout
+        self.lineList = []
+        self.lineRect = None
+
         super(FlowLayout, self).__init__(parent)
 
         if parent is not None:
@@ -71,8 +95,6 @@ class FlowLayout(QLayout):
 
         self.setSpacing(spacing)
 
-        self.itemList = []
-
     def __del__(self):
         item = self.takeAt(0)
         while item:
@@ -80,6 +102,11 @@ class FlowLayout(QLayout):
 
     def addItem(self, item):
         self.itemList.append(item)
+        parent = self.parentWidget()
+        if parent is not None and parent.isVisible():
+            # shown later by Qt, the items of a hidden parent are shown with it
+            self.newItems.append(len(self.itemList) - 1)
+        self.heightCache.clear()
 
     def count(self):
         return len(self.itemList)
@@ -92,10 +119,67 @@ class FlowLayout(QLayout):
 
     def takeAt(self, index):
         if index >= 0 and index < len(self.itemList):
-            return self.itemList.pop(index)
+            self.hintList = []
+            self.dirtyItems.clear()
+            self.lineList = []
+            self.minSize = None
+            self.heightCache.clear()
+            item = self.itemList.pop(index)
+            parent = self.parentWidget()
+            if parent is not None and parent.isVisible():
+                self.newItems = [i for i, item in enumerate(self.itemList)
+                                 if item.widget() is not None and not item.widget().isVisible()]
+            else:
+                self.newItems = []
+            return item
 
         return None
 
+    def invalidate(self):
+        # the hints are refetched on the next layout, lines before the first
+        # changed item are kept
+        if self.activating:
+            self.activating = False
+        else:
+            showing = self.showingItems()
+            if showing:
+                self.dirtyItems.update(showing)
+            else:
+                self.hintDirty = True
+                self.minSize = None
+            self.heightCache.clear()
+        super(FlowLayout, self).invalidate()
+
+    def widgetEvent(self, event):
+        if event.type() == QEvent.LayoutRequest:
+            self.activating = True
+            try:
+                super(FlowLayout, self).widgetEvent(event)
+            finally:
+                self.activating = False
+        else:
+            super(FlowLayout, self).widgetEvent(event)
+
+    def showingItems(self):
+        """indices of added items being shown for the first time,
+        an invalidate() while showing them comes from their show
+        """
+        parent = self.parentWidget()
+        if parent is None or not parent.isVisible():
+            return []
+        showing = []
+        waiting = []
+        for index in self.newItems:
+            widget = self.itemList[index].widget()
+            if widget is None or widget.isVisible():
+                continue
+            waiting.append(index)
+            # show() has cleared the hidden flag but the widget is not visible yet
+            if not widget.isHidden():
+                showing.append(index)
+        self.newItems = waiting
+        return showing
+
     def expandingDirections(self):
         return Qt.Orientations(Qt.Orientation(0))
 
@@ -103,7 +187,12 @@ class FlowLayout(QLayout):
         return True
 
     def heightForWidth(self, width):
-        height = self.doLayout(QRect(0, 0, width, 0), True)
+        height = self.heightCache.get(width)
+        if height is None:
+            height = self.doLayout(QRect(0, 0, width, 0), True)
+            self.heightCache[width] = height
+            if len(self.heightCache) > 16:
+                self.heightCache.popitem(last=False)
         return height
 
     def setGeometry(self, rect):
@@ -114,39 +203,99 @@ class FlowLayout(QLayout):
         return self.minimumSize()
 
     def minimumSize(self):
-        size = QSize()
-
-        for item in self.itemList:
-            size = size.expandedTo(item.minimumSize())
+        if self.minSize is None:
+            self.minSize = QSize()
+            self.minCount = 0
+        for item in self.itemList[self.minCount:]:
+            self.minSize = self.minSize.expandedTo(item.minimumSize())
+        for index in self.dirtyItems:
+            self.minSize = self.minSize.expandedTo(self.itemList[index].minimumSize())
+        self.minCount = len(self.itemList)
 
         margin, _, _, _ = self.getContentsMargins()
 
-        size += QSize(2 * margin, 2 * margin)
-        return size
+        return self.minSize + QSize(2 * margin, 2 * margin)
+
+    def itemHint(self, item, spacings):
+        style = item.widget().style()
+        if style not in spacings:
+            spacings[style] = (
+                self.spacing() + style.layoutSpacing(QSizePolicy.PushButton,
+                                                     QSizePolicy.PushButton, Qt.Horizontal),
+                self.spacing() + style.layoutSpacing(QSizePolicy.PushButton,
+                                                     QSizePolicy.PushButton, Qt.Vertical))
+        size = item.sizeHint()
+        return (size.width(), size.height()) + spacings[style]
+
+    def itemHints(self):
+        spacings = {}
+        changed = len(self.hintList)
+        if self.hintDirty:
+            oldHints = self.hintList
+            self.hintList = [self.itemHint(item, spacings) for item in self.itemList]
+            self.hintDirty = False
+            changed = 0
+            for old, new in zip(oldHints, self.hintList):
+                if old != new:
+                    break
+                changed += 1
+        else:
+            for index in self.dirtyItems:
+                if index < len(self.hintList):
+                    hint = self.itemHint(self.itemList[index], spacings)
+                    if hint != self.hintList[index]:
+                        self.hintList[index] = hint
+                        changed = min(changed, index)
+            # only the added items
+            self.hintList.extend(self.itemHint(item, spacings)
+                                 for item in self.itemList[len(self.hintList):])
+        self.dirtyItems.clear()
+
+        # drop the line starting at the first changed item and the ones after it,
+        # a smaller item at the start of a line may move up to the previous line
+        while self.lineList and self.lineList[-1][0] >= changed:
+            self.lineList.pop()
+        return self.hintList
 
     def doLayout(self, rect, testOnly):
+        hints = self.itemHints()
         x = rect.x()
         y = rect.y()
         lineHeight = 0
-
-        for item in self.itemList:
-            wid = item.widget()
-            spaceX = self.spacing() + wid.style().layoutSpacing(QSizePolicy.PushButton,
-                                                                QSizePolicy.PushButton, Qt.Horizontal)
-            spaceY = self.spacing() + wid.style().layoutSpacing(QSizePolicy.PushButton,
-                                                                QSizePolicy.PushButton, Qt.Vertical)
-            nextX = x + item.sizeHint().width() + spaceX
+        lineStart = 0
+        lines = []
+
+        last = self.lineRect
+        if self.lineList and rect.x() == last.x() and rect.width() == last.width() \
+                and (testOnly or rect.y() == last.y()):
+            # same width as last time, only relayout from the last line,
+            # the items above it are already in place
+            lineStart, top, _ = self.lineList[-1]
+            y += top
+            lines = self.lineList[:-1]
+
+        for index in range(lineStart, len(hints)):
+            width, height, spaceX, spaceY = hints[index]
+            nextX = x + width + spaceX
             if nextX - spaceX > rect.right() and lineHeight > 0:
+                lines.append((lineStart, y - rect.y(), lineHeight))
                 x = rect.x()
                 y = y + lineHeight + spaceY
-                nextX = x + item.sizeHint().width() + spaceX
+                nextX = x + width + spaceX
                 lineHeight = 0
+                lineStart = index
 
             if not testOnly:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+                self.itemList[index].setGeometry(QRect(x, y, width, height))
 
             x = nextX
-            lineHeight = max(lineHeight, item.sizeHint().height())
+            lineHeight = max(lineHeight, height)
+
+        if not testOnly:
+            if lineStart < len(hints):
+                lines.append((lineStart, y - rect.y(), lineHeight))
+            self.lineList = lines
+            self.lineRect = QRect(rect)
 
         return y + lineHeight - rect.y()
 
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: MapCache
+@description: 把GeoJSON编译成可以直接内存映射的二进制文件, 启动时不再解析json和简化
+    文件结构(小端):
+        头部: 标识, 版本, 源文件大小, 源文件修改时间(ns), 级数, 环数
+        每一级的简化距离 float64
+        每一级: 顶点数 uint64, 坐标 float32 (顶点数 * 2), 每个环的结束位置 uint64 (环数)
+    每个数组都按8字节对齐, 源文件大小、修改时间或简化距离变化时重新编译
+"""
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from Lib.MapLod import Tolerances, geoJsonRings, lodLevels  # @UnresolvedImport
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+Magic = b'WMAP'
+Version = 1
+Header = struct.Struct('<4sIQqII')
+
+
+def cachePath(source):
+    return source + '.bin'
+
+
+def _sourceStat(source):
+    stat = os.stat(source)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _pad(fp):
+    fp.write(b'\0' * (-fp.tell() % 8))
+
+
+def build(source, tolerances=Tolerances):
+    """解析GeoJSON并简化, 返回(源文件大小, 修改时间), lodLevels的结果"""
+    # 先取文件信息再读取, 读取过程中文件被修改时下次会重新编译
+    stat = _sourceStat(source)
+    with open(source, encoding='utf8') as fp:
+        features = json.load(fp).get('features')
+    return stat, lodLevels(list(geoJsonRings(features)), tolerances)
+
+
+def save(target, stat, levels, tolerances=Tolerances):
+    """写入临时文件后替换, 中途出错不会留下损坏的缓存"""
+    temp = target + '.tmp'
+    rings = len(levels[0][1]) if levels else 0
+    try:
+        with open(temp, 'wb') as fp:
+            fp.write(Header.pack(Magic, Version, stat[0], stat[1], len(levels), rings))
+            fp.write(np.asarray(tolerances, '<f8').tobytes())
+            for points, ends in levels:
+                _pad(fp)
+                fp.write(struct.pack('<Q', len(points)))
+                fp.write(np.ascontiguousarray(points, '<f4').tobytes())
+                _pad(fp)
+                fp.write(np.asarray(ends, '<u8').tobytes())
+        os.replace(temp, target)
+    except OSError:
+        if os.path.exists(temp):
+            os.unlink(temp)
+        raise
+
+
+def read(target, source=None, tolerances=Tolerances):
+    """内存映射缓存文件, 返回每一级的(坐标float32(n, 2), 每个环的结束位置)
+    文件无效或者和源文件不匹配时返回None
+    """
+    try:
+        fp = open(target, 'rb')
+    except OSError:
+        return None
+    with fp:
+        try:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件
+            return None
+    if len(buffer) < Header.size:
+        return None
+    magic, version, size, mtime, count, rings = Header.unpack_from(buffer)
+    if magic != Magic or version != Version:
+        return None
+    if source is not None and _sourceStat(source) != (size, mtime):
+        return None
+    offset = Header.size
+    levels = []
+    try:
+        stored = np.frombuffer(buffer, '<f8', count, offset)
+        if len(stored) != len(tolerances) or not np.array_equal(stored, tolerances):
+            return None
+        offset += count * 8
+        for _ in range(count):
+            offset += -offset % 8
+            vertices, = struct.unpack_from('<Q', buffer, offset)
+            offset += 8
+            points = np.frombuffer(
+                buffer, '<f4', vertices * 2, offset).reshape(-1, 2)
+            offset += vertices * 8
+            offset += -offset % 8
+            ends = np.frombuffer(buffer, '<u8', rings, offset)
+            offset += rings * 8
+            levels.append((points, ends))
+    except (ValueError, struct.error):
+        # 文件被截断
+        return None
+    return levels
+
+
+def load(source, tolerances=Tolerances):
+    """有可用的缓存时直接映射, 否则编译并写入缓存
+    缓存无法写入(比如只读目录)时直接返回编译的结果
+    """
+    target = cachePath(source)
+    levels = read(target, source, tolerances)
+    if levels is not None:
+        return levels
+    stat, levels = build(source, tolerances)
+    try:
+        save(target, stat, levels, tolerances)
+    except OSError:
+        return levels
+    return read(target, source, tolerances) or levels
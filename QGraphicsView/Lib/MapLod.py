@@ -0,0 +1,399 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: MapLod
+@description: 世界地图的多级精度几何和瓦片缓存
+    - simplify: Douglas–Peucker 简化, 每个多边形预先生成几种精度
+    - LodPolygonItem: 根据当前缩放选择精度绘制
+    - MapScene: 只存放静态地图的场景, 批量添加后再建立BSP索引
+    - MapTiles: 把地图按缩放级别渲染成256像素的瓦片并缓存, 平移时直接绘制图片
+"""
+from collections import OrderedDict
+import json
+import math
+
+from PyQt5.QtCore import Qt, QObject, QPointF, QRectF, QTimer
+from PyQt5.QtGui import QPainter, QPixmap, QPolygonF, QTransform
+from PyQt5.QtWidgets import QGraphicsScene, QAbstractGraphicsShapeItem,\
+    QStyleOptionGraphicsItem
+
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+# 各级精度的简化距离(经纬度), 第一级为原始数据
+Tolerances = (0, 0.01, 0.04, 0.16, 0.64)
+# 简化后的误差不超过多少像素
+PixelTolerance = 0.5
+
+
+def _simplifyPython(points, tolerance):
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        ax, ay = points[start]
+        bx, by = points[end]
+        dx, dy = bx - ax, by - ay
+        norm = math.hypot(dx, dy)
+        index, distance = start, -1
+        for i in range(start + 1, end):
+            px, py = points[i]
+            if norm:
+                d = abs(dx * (py - ay) - dy * (px - ax)) / norm
+            else:
+                d = math.hypot(px - ax, py - ay)
+            if d > distance:
+                index, distance = i, d
+        if distance > tolerance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def _simplifyMask(points, tolerance, ends):
+    """多个环连接在一起同时简化, ends为每个环的结束位置(不包含)
+    同一层的所有线段一起计算, 循环次数等于最大的递归深度
+    """
+    count = len(points)
+    keep = np.zeros(count, bool)
+    keep[ends - 1] = True
+    keep[np.r_[0, ends[:-1]]] = True
+    # 已经确定不需要保留的点
+    settled = np.zeros(count, bool)
+    while True:
+        candidates = np.flatnonzero(~(keep | settled))
+        if not len(candidates):
+            break
+        kept = np.flatnonzero(keep)
+        # 每个点所在线段的首尾
+        segment = np.searchsorted(kept, candidates) - 1
+        a = points[kept[segment]]
+        dx, dy = (points[kept[segment + 1]] - a).T
+        rest = points[candidates] - a
+        norm = np.hypot(dx, dy)
+        distance = np.abs(dx * rest[:, 1] - dy * rest[:, 0])
+        closed = norm == 0
+        # 首尾重合(闭合的环)时用到起点的距离
+        distance[closed] = np.hypot(rest[closed, 0], rest[closed, 1])
+        distance[~closed] /= norm[~closed]
+        # 每条线段中距离最大的点(相同时取第一个)
+        changed = segment[1:] != segment[:-1]
+        group = np.r_[0, np.cumsum(changed)]
+        maximum = np.maximum.reduceat(distance, np.flatnonzero(np.r_[True, changed]))
+        farthest = np.flatnonzero(distance == maximum[group])
+        farthest = farthest[np.r_[True, group[farthest][1:] != group[farthest][:-1]]]
+        split = maximum > tolerance
+        if not split.any():
+            break
+        keep[candidates[farthest[split]]] = True
+        settled[candidates[~split[group]]] = True
+    return keep
+
+
+def simplify(points, tolerance):
+    """Douglas–Peucker 简化, points为(n, 2)的数组(没有numpy时为列表)"""
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    if np is None:
+        return _simplifyPython(points, tolerance)
+    return points[_simplifyMask(points, tolerance, np.array([len(points)]))]
+
+
+def toPolygonF(points):
+    """(n, 2)的数组直接写入QPolygonF的内存"""
+    if np is None:
+        return QPolygonF([QPointF(x, y) for x, y in points])
+    polygon = QPolygonF(len(points))
+    ptr = polygon.data()
+    ptr.setsize(len(points) * 2 * 8)
+    np.frombuffer(ptr, np.float64)[:] = np.ascontiguousarray(
+        points, np.float64).ravel()
+    return polygon
+
+
+def lodLevels(rings, tolerances=Tolerances):
+    """所有的环连接在一起简化, 返回每一级的(坐标(n, 2), 每个环的结束位置)
+    比简化距离还小的环在这一级开始长度为0
+    """
+    rings = [np.asarray(ring, np.float64).reshape(-1, 2) for ring in rings]
+    lengths = np.array([len(ring) for ring in rings], np.int64)
+    points = np.concatenate(rings) if rings else np.empty((0, 2))
+    ends = np.cumsum(lengths)
+    nonempty = lengths > 0
+    sizes = np.zeros(len(rings))
+    if nonempty.any():
+        starts = (ends - lengths)[nonempty]
+        sizes[nonempty] = (np.maximum.reduceat(points, starts) -
+                           np.minimum.reduceat(points, starts)).max(1)
+    levels = []
+    for tolerance in tolerances:
+        if tolerance and len(points):
+            # 在上一级的基础上继续简化, 误差不超过各级之和
+            keep = _simplifyMask(points, tolerance, ends[lengths > 0])
+            # 整个环去掉
+            keep &= np.repeat(sizes >= tolerance, lengths)
+            counts = np.r_[0, np.cumsum(keep)]
+            lengths = counts[ends] - counts[ends - lengths]
+            ends = np.cumsum(lengths)
+            points = points[keep]
+        levels.append((points, ends))
+    return levels
+
+
+def ringPolygons(points, ends):
+    """按每个环的结束位置转换为QPolygonF, 少于3个点的为None"""
+    # 缓存中是float32, 整体转换一次
+    points = np.asarray(points, np.float64)
+    polygons = []
+    start = 0
+    for end in ends.tolist():
+        polygons.append(toPolygonF(points[start:end]) if end - start >= 3 else None)
+        start = end
+    return polygons
+
+
+def lodPolygons(rings, tolerances=Tolerances):
+    """每个环的各级精度, 太小的环在粗的级别中为None"""
+    if np is None:
+        return [_lodPolygonsPython(ring, tolerances) for ring in rings]
+    levels = [ringPolygons(points, ends)
+              for points, ends in lodLevels(rings, tolerances)]
+    return list(zip(*levels))
+
+
+def _lodPolygonsPython(ring, tolerances):
+    xs = [x for x, _ in ring]
+    ys = [y for _, y in ring]
+    size = max(max(xs) - min(xs), max(ys) - min(ys))
+    polygons = []
+    points = ring
+    for tolerance in tolerances:
+        if tolerance and size < tolerance:
+            polygons.append(None)
+            continue
+        points = simplify(points, tolerance)
+        polygons.append(toPolygonF(points) if len(points) >= 3 else None)
+    return polygons
+
+
+def geoJsonRings(features):
+    """GeoJSON的features中所有的环, 坐标转换为(经度, -纬度)"""
+    for feature in features:
+        geometry = feature.get('geometry')
+        if not geometry:
+            continue
+        _type = geometry.get('type')
+        coordinates = geometry.get('coordinates')
+        if _type == 'Polygon':
+            polygons = [coordinates]
+        elif _type == 'MultiPolygon':
+            polygons = coordinates
+        else:
+            continue
+        for polygon in polygons:
+            for ring in polygon:
+                if len(ring) < 3:
+                    continue
+                if np is not None:
+                    ring = np.asarray(ring, np.float64)[:, :2] * (1, -1)
+                else:
+                    ring = [(x, -y) for x, y, *_ in ring]
+                yield ring
+
+
+class LodPolygonItem(QAbstractGraphicsShapeItem):
+    """根据当前缩放选择精度的多边形, polygons为lodPolygons的结果"""
+
+    def __init__(self, polygons, tolerances=Tolerances, *args, **kwargs):
+        super(LodPolygonItem, self).__init__(*args, **kwargs)
+        self.polygons = polygons
+        self.tolerances = tolerances
+        self._rect = polygons[0].boundingRect()
+
+    def boundingRect(self):
+        return self._rect
+
+    def polygonFor(self, lod):
+        """误差不超过PixelTolerance像素的最粗的一级"""
+        limit = PixelTolerance / lod if lod else float('inf')
+        polygon = self.polygons[0]
+        for tolerance, candidate in zip(self.tolerances, self.polygons):
+            if tolerance > limit:
+                break
+            polygon = candidate
+        return polygon
+
+    def paint(self, painter, option, widget=None):
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(
+            painter.worldTransform())
+        polygon = self.polygonFor(lod)
+        if polygon is None:
+            return
+        painter.setPen(self.pen())
+        painter.setBrush(self.brush())
+        painter.drawPolygon(polygon)
+
+
+class MapScene(QGraphicsScene):
+    """只存放静态地图的场景"""
+
+    def __init__(self, *args, **kwargs):
+        super(MapScene, self).__init__(-180, -90, 360, 180, *args, **kwargs)
+        self.vertices = 0
+
+    def loadGeoJson(self, path, pen, brush):
+        with open(path, encoding='utf8') as fp:
+            features = json.load(fp).get('features')
+        self.addRings(geoJsonRings(features), pen, brush)
+
+    def addRings(self, rings, pen, brush):
+        self.addPolygons(lodPolygons(list(rings)), pen, brush)
+
+    def addLevels(self, levels, pen, brush):
+        """添加lodLevels的结果(可以来自MapCache)"""
+        self.addPolygons(list(zip(*[ringPolygons(points, ends)
+                                    for points, ends in levels])), pen, brush)
+
+    def addPolygons(self, rings, pen, brush):
+        # 添加时不维护索引, 全部添加后一次建立
+        self.setItemIndexMethod(QGraphicsScene.NoIndex)
+        count = 0
+        for polygons in rings:
+            if polygons[0] is None:
+                continue
+            item = LodPolygonItem(polygons)
+            item.setPen(pen)
+            item.setBrush(brush)
+            self.addItem(item)
+            self.vertices += polygons[0].count()
+            count += 1
+        self.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        # 地图不会移动, 每个叶子大约10个多边形
+        self.setBspTreeDepth(max(5, min(16, int(math.log2(max(count, 1) / 10)) + 1)))
+
+
+class MapTiles(QObject):
+    """把场景按缩放级别渲染成瓦片并缓存
+
+    - draw(painter, rect) 在QGraphicsView.drawBackground中调用
+    - 视图只有缩放和平移时使用瓦片, 其它变换直接渲染
+    - 空闲时预先渲染可见区域周围一圈的瓦片
+    """
+
+    def __init__(self, scene, tileSize=256, cacheSize=256, *args, **kwargs):
+        super(MapTiles, self).__init__(*args, **kwargs)
+        self.scene = scene
+        self.tileSize = tileSize
+        self.cacheSize = cacheSize
+        self.antialiasing = True
+        self.rendered = 0
+        self._tiles = OrderedDict()
+        self._pending = []
+        self._prefetchTimer = QTimer(self, timeout=self._prefetchOne)
+        self._prefetchTimer.setSingleShot(True)
+
+    def clear(self):
+        self._tiles.clear()
+        self._pending = []
+
+    def tile(self, scale, ratio, x, y):
+        key = (scale, ratio, x, y)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        size = self.tileSize
+        pixmap = QPixmap(int(size * ratio), int(size * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing, self.antialiasing)
+        self.scene.render(
+            painter, QRectF(0, 0, size, size),
+            QRectF(x * size / scale, y * size / scale, size / scale, size / scale),
+            Qt.IgnoreAspectRatio)
+        painter.end()
+        self.rendered += 1
+        self._tiles[key] = pixmap
+        if len(self._tiles) > self.cacheSize:
+            self._tiles.popitem(last=False)
+        return pixmap
+
+    def draw(self, painter, rect):
+        transform = painter.worldTransform()
+        scale = transform.m11()
+        if transform.m12() or transform.m21() or scale <= 0 or \
+                abs(transform.m22() - scale) > 1e-9:
+            # 旋转等变换不使用瓦片
+            return self.scene.render(painter, rect, rect, Qt.IgnoreAspectRatio)
+        ratio = painter.device().devicePixelRatioF()
+        # 缩放比例作为缓存的一部分, 舍入后避免浮点误差产生不同的key
+        scale = round(scale, 9)
+        size = self.tileSize
+        # 只绘制地图范围内的瓦片
+        left, top, right, bottom = self._tileRange(
+            rect.intersected(self.scene.sceneRect()), scale)
+        tiles = [(x, y) for y in range(top, bottom + 1)
+                 for x in range(left, right + 1)]
+        missing = sum((scale, ratio, x, y) not in self._tiles for x, y in tiles)
+        self._prefetch(scale, ratio, left - 1, top - 1, right + 1, bottom + 1)
+        if missing * 2 > len(tiles):
+            # 刚缩放过, 大部分瓦片还没有, 直接渲染一次比逐个渲染瓦片快
+            # 瓦片在空闲时再渲染
+            return self.scene.render(painter, rect, rect, Qt.IgnoreAspectRatio)
+        # 瓦片在设备坐标中按整数像素对齐
+        dx, dy = round(transform.dx()), round(transform.dy())
+        painter.save()
+        painter.setWorldTransform(QTransform())
+        for x, y in tiles:
+            painter.drawPixmap(x * size + dx, y * size + dy,
+                               self.tile(scale, ratio, x, y))
+        painter.restore()
+
+    def _tileRange(self, rect, scale):
+        size = self.tileSize
+        return (math.floor(rect.left() * scale / size),
+                math.floor(rect.top() * scale / size),
+                math.floor(rect.right() * scale / size),
+                math.floor(rect.bottom() * scale / size))
+
+    def _prefetch(self, scale, ratio, left, top, right, bottom):
+        # 只预取地图范围内的瓦片
+        minX, minY, maxX, maxY = self._tileRange(self.scene.sceneRect(), scale)
+        centerX, centerY = (left + right) / 2, (top + bottom) / 2
+        pending = [
+            (scale, ratio, x, y)
+            for y in range(max(top, minY), min(bottom, maxY) + 1)
+            for x in range(max(left, minX), min(right, maxX) + 1)
+            if (scale, ratio, x, y) not in self._tiles]
+        # 从中间开始(列表末尾先渲染), 不超过缓存的一半, 避免把正在显示的瓦片挤出去
+        pending.sort(key=lambda key: abs(key[2] - centerX) + abs(key[3] - centerY),
+                     reverse=True)
+        self._pending = pending[-(self.cacheSize // 2):]
+        if self._pending:
+            self._prefetchTimer.start(0)
+
+    def _prefetchOne(self):
+        if self._pending:
+            self.tile(*self._pending.pop())
+        if self._pending:
+            self._prefetchTimer.start(0)
@@ -9,13 +9,21 @@ Created on 2017年12月17日
 @file: WorldMap
 @description: 
 """
-import json
 import math
 
-from PyQt5.QtCore import Qt, QPointF, QRectF
-from PyQt5.QtGui import QColor, QPainter, QPolygonF, QPen, QBrush
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QColor, QPainter, QPen, QBrush
 from PyQt5.QtOpenGL import QGLFormat
-from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPolygonItem
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene
+
+from Lib.MapLod import MapScene, MapTiles  # @UnresolvedImport
+
+
+try:
+    from Lib import MapCache  # @UnresolvedImport
+except ImportError:
+    # 没有numpy
+    MapCache = None
 
 
 __Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
@@ -30,8 +38,9 @@ class GraphicsView(QGraphicsView):
     # 边框颜色
     borderColor = QColor(58, 58, 90)
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, path="Data/world.json", **kwargs):
         super(GraphicsView, self).__init__(*args, **kwargs)
+        self.path = path
         self.resize(800, 600)
         # 设置背景颜色
         self.setBackgroundBrush(self.backgroundColor)
@@ -109,6 +118,10 @@ class GraphicsView(QGraphicsView):
         self._scene = QGraphicsScene(-180, -90, 360, 180, self)
         self.setScene(self._scene)
 
+        # 地图放在单独的场景中, 渲染成瓦片后作为背景绘制
+        # 显示的场景可以用来放其它可交互的item
+        self.mapScene = MapScene(self)
+        self.tiles = MapTiles(self.mapScene, parent=self)
         # 初始化地图
         self.initMap()
 
@@ -126,33 +139,19 @@ class GraphicsView(QGraphicsView):
             return
         self.scale(scaleFactor, scaleFactor)
 
+    def drawBackground(self, painter, rect):
+        super(GraphicsView, self).drawBackground(painter, rect)
+        self.tiles.draw(painter, rect)
+
     def initMap(self):
-        features = json.load(
-            open("Data/world.json", encoding="utf8")).get("features")
-        for feature in features:
-            geometry = feature.get("geometry")
-            if not geometry:
-                continue
-            _type = geometry.get("type")
-            coordinates = geometry.get("coordinates")
-            for coordinate in coordinates:
-                if _type == "Polygon":
-                    polygon = QPolygonF(
-                        [QPointF(latitude, -longitude) for latitude, longitude in coordinate])
-                    item = QGraphicsPolygonItem(polygon)
-                    item.setPen(QPen(self.borderColor, 0))
-                    item.setBrush(QBrush(self.backgroundColor))
-                    item.setPos(0, 0)
-                    self._scene.addItem(item)
-                elif _type == "MultiPolygon":
-                    for _coordinate in coordinate:
-                        polygon = QPolygonF(
-                            [QPointF(latitude, -longitude) for latitude, longitude in _coordinate])
-                        item = QGraphicsPolygonItem(polygon)
-                        item.setPen(QPen(self.borderColor, 0))
-                        item.setBrush(QBrush(self.backgroundColor))
-                        item.setPos(0, 0)
-                        self._scene.addItem(item)
+        # 每个多边形预先简化出几种精度, 根据缩放选择
+        pen, brush = QPen(self.borderColor, 0), QBrush(self.backgroundColor)
+        if MapCache is None:
+            self.mapScene.loadGeoJson(self.path, pen, brush)
+        else:
+            # 简化结果缓存在 world.json.bin 中, 直接映射到内存
+            self.mapScene.addLevels(MapCache.load(self.path), pen, brush)
+        self.tiles.clear()
 
 
 if __name__ == "__main__":
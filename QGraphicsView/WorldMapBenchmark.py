@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: WorldMapBenchmark
+@description: 世界地图平移和缩放时每帧的耗时
+    原来每个环一个全精度的QGraphicsPolygonItem, 现在多级精度+瓦片缓存
+    没有Data/world.json时生成一个顶点很密的GeoJSON
+    python WorldMapBenchmark.py startup 比较约50MB的GeoJSON在有无二进制缓存时的启动时间
+"""
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+from PyQt5.QtCore import QPointF, QEventLoop, QTimer
+from PyQt5.QtGui import QPolygonF, QPen, QBrush
+from PyQt5.QtWidgets import QApplication, QGraphicsPolygonItem
+
+from Lib import MapCache  # @UnresolvedImport
+from WorldMap import GraphicsView
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class OldGraphicsView(GraphicsView):
+    """原来的实现: 全精度的QGraphicsPolygonItem直接放在显示的场景中"""
+
+    def drawBackground(self, painter, rect):
+        super(GraphicsView, self).drawBackground(painter, rect)
+
+    def initMap(self):
+        features = json.load(open(self.path, encoding="utf8")).get("features")
+        for feature in features:
+            geometry = feature.get("geometry")
+            if not geometry:
+                continue
+            _type = geometry.get("type")
+            coordinates = geometry.get("coordinates")
+            for coordinate in coordinates:
+                rings = [coordinate] if _type == "Polygon" else coordinate
+                for ring in rings:
+                    polygon = QPolygonF(
+                        [QPointF(latitude, -longitude) for latitude, longitude in ring])
+                    item = QGraphicsPolygonItem(polygon)
+                    item.setPen(QPen(self.borderColor, 0))
+                    item.setBrush(QBrush(self.backgroundColor))
+                    self._scene.addItem(item)
+
+
+class NoCacheGraphicsView(GraphicsView):
+    """每次启动都解析json并简化"""
+
+    def initMap(self):
+        self.mapScene.loadGeoJson(
+            self.path, QPen(self.borderColor, 0), QBrush(self.backgroundColor))
+        self.tiles.clear()
+
+
+def makeGeoJson(path, countries=200, vertices=3000, islands=5):
+    """随机生成边界很曲折的国家和岛屿"""
+    random.seed(1)
+    features = []
+    total = 0
+    for _ in range(countries):
+        cx, cy = random.uniform(-170, 170), random.uniform(-80, 80)
+        radius = random.uniform(2, 12)
+        waves = [(random.randint(2, 400), random.uniform(0, 0.15 / (i + 1) ** 0.5),
+                  random.uniform(0, 2 * math.pi)) for i in range(12)]
+        polygons = []
+        for island in range(islands + 1):
+            r = radius if island == 0 else radius * random.uniform(0.02, 0.1)
+            x0 = cx if island == 0 else cx + random.uniform(-2, 2) * radius
+            y0 = cy if island == 0 else cy + random.uniform(-2, 2) * radius
+            count = vertices if island == 0 else vertices // 20
+            ring = []
+            for i in range(count):
+                a = 2 * math.pi * i / count
+                k = 1 + sum(amp * math.sin(f * a + p) for f, amp, p in waves)
+                ring.append([round(x0 + r * k * math.cos(a), 5),
+                             round(y0 + r * k * math.sin(a) * 0.6, 5)])
+            ring.append(ring[0])
+            total += len(ring)
+            polygons.append([ring])
+        features.append({'type': 'Feature', 'properties': {},
+                         'geometry': {'type': 'MultiPolygon', 'coordinates': polygons}})
+    json.dump({'type': 'FeatureCollection', 'features': features}, open(path, 'w'))
+    return total
+
+
+def idle(ms=16):
+    """两帧之间空闲的时间(60帧), 预取瓦片在这时运行"""
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def frameTimes(view, actions):
+    times = []
+    for action in actions:
+        action()
+        t = perf_counter()
+        view.viewport().repaint()
+        times.append((perf_counter() - t) * 1000)
+        idle()
+    times.sort()
+    return sum(times) / len(times), times[int(len(times) * 0.95)]
+
+
+def panActions(view, steps=30, delta=40):
+    bar = view.horizontalScrollBar()
+    vbar = view.verticalScrollBar()
+
+    def pan(i):
+        return lambda: (bar.setValue(bar.value() + (delta if i < steps // 2 else -delta)),
+                        vbar.setValue(vbar.value() + (delta // 2 if i % 4 < 2 else -delta // 2)))
+    return [pan(i) for i in range(steps)]
+
+
+def zoomActions(view, steps=20):
+    return [lambda: view.scaleView(1.2) for _ in range(steps)] + \
+        [lambda: view.scaleView(1 / 1.2) for _ in range(steps)]
+
+
+def benchmark(cls, path):
+    t = perf_counter()
+    view = cls(path=path)
+    load = perf_counter() - t
+    view.resize(1280, 800)
+    view.show()
+    QApplication.processEvents()
+    results = {'load': load * 1000}
+    for zoom in (3, 12, 40):
+        view.resetTransform()
+        view.scale(zoom, zoom)
+        view.centerOn(0, 0)
+        view.viewport().repaint()
+        results['pan x%d' % zoom] = frameTimes(view, panActions(view))
+        QApplication.processEvents()
+    view.resetTransform()
+    view.scale(3, 3)
+    view.centerOn(0, 0)
+    results['zoom 3-115'] = frameTimes(view, zoomActions(view))
+    view.close()
+    return results
+
+
+def startupTime(cls, path):
+    t = perf_counter()
+    view = cls(path=path)
+    elapsed = perf_counter() - t
+    vertices = view.mapScene.vertices
+    view.deleteLater()
+    QApplication.processEvents()
+    return elapsed, vertices
+
+
+def startup():
+    path = os.path.join(tempfile.gettempdir(), 'WorldMapStartup.json')
+    if not os.path.exists(path):
+        makeGeoJson(path, countries=560)
+    cache = MapCache.cachePath(path)
+    if os.path.exists(cache):
+        os.unlink(cache)
+    print('geojson %.1fMB' % (os.path.getsize(path) / 1024 / 1024))
+    before, vertices = startupTime(NoCacheGraphicsView, path)
+    print('before (json + simplify): %.2fs, %d vertices' % (before, vertices))
+    first, vertices2 = startupTime(GraphicsView, path)
+    print('first run (compile + write cache): %.2fs, cache %.1fMB' % (
+        first, os.path.getsize(cache) / 1024 / 1024))
+    cached, vertices3 = startupTime(GraphicsView, path)
+    print('cached (mmap): %.2fs, same vertices %s' % (
+        cached, vertices == vertices2 == vertices3))
+    # 源文件变化后重新编译
+    os.utime(path)
+    again, _ = startupTime(GraphicsView, path)
+    print('source touched (recompile): %.2fs' % again)
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    if 'startup' in sys.argv:
+        startup()
+        sys.exit()
+    path = 'Data/world.json'
+    if not os.path.exists(path):
+        path = os.path.join(tempfile.gettempdir(), 'WorldMapBenchmark.json')
+        print('vertices: %d (%s)' % (makeGeoJson(path), path))
+    old = benchmark(OldGraphicsView, path)
+    new = benchmark(GraphicsView, path)
+    print('%-12s %20s %20s' % ('', 'old mean/p95', 'new mean/p95'))
+    print('%-12s %19.0fms %19.0fms' % ('load', old.pop('load'), new.pop('load')))
+    for name in old:
+        print('%-12s %10.1f/%6.1fms %10.1f/%6.1fms' % ((name,) + old[name] + new[name]))
@@ -9,11 +9,18 @@ Created on 2018年10月25日
 @file: NinePatch
 @description: 
 """
+from collections import OrderedDict
 from math import fabs
+import os
 
 from PyQt5.QtCore import QRect
 from PyQt5.QtGui import QImage, QColor, QPainter, qRed, qGreen, qBlue, qAlpha
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 __Author__ = """By: Irony
 QQ: 892768447
@@ -59,14 +66,88 @@ class ExceptionNot9Patch(Exception):
         return "It is not nine patch image"
 
 
+class NinePatchCache:
+    """进程内共享的LRU缓存,按字节数限制大小
+    缓存两类数据:
+        (文件, 修改时间) -> (源图片, 内容区, 拉伸区X, 拉伸区Y)
+        (文件, 修改时间, 宽, 高) -> 渲染好的QImage
+    """
+
+    def __init__(self, maxBytes=32 * 1024 * 1024):
+        self._items = OrderedDict()    # key: (value, bytes)
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def setMaxBytes(self, maxBytes):
+        self.maxBytes = maxBytes
+        self._evict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, value, size):
+        if key in self._items:
+            self.bytes -= self._items.pop(key)[1]
+        if size > self.maxBytes:
+            # 单个超过上限的不缓存
+            return
+        self._items[key] = (value, size)
+        self.bytes += size
+        self._evict()
+
+    def clear(self):
+        self._items.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'count': len(self._items),
+            'bytes': self.bytes,
+            'maxBytes': self.maxBytes,
+        }
+
+    def _evict(self):
+        while self.bytes > self.maxBytes and self._items:
+            _, (_, size) = self._items.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    @staticmethod
+    def imageBytes(image):
+        return image.bytesPerLine() * image.height()
+
+
+# 默认的全局缓存, NinePatch(fileName, cache=None)可以关闭
+ninePatchCache = NinePatchCache()
+
+
 class NinePatch:
 
-    def __init__(self, fileName):
+    def __init__(self, fileName, useNumpy=True, cache=ninePatchCache, useTiles=True):
         self.CachedImage = None    # 缓存图片
         self.OldWidth = -1
         self.OldHeight = -1
         self.ResizeDistancesX = []
         self.ResizeDistancesY = []    # [(int,int)]数组
+        # 有numpy时通过bits()一次性读取四条边框来解析拉伸区和内容区
+        self.UseNumpy = useNumpy and np is not None
+        self.Cache = cache
+        self.CacheKey = None
+        # 加载时预先切好的各个分块 {(x, y, w, h): QImage}
+        self.UseTiles = useTiles
+        self.Tiles = None
         self.setImage(fileName)
 
     def width(self):
@@ -76,15 +157,69 @@ class NinePatch:
         return self.Image.height()
 
     def setImage(self, fileName):
+        if self.Cache is not None and isinstance(fileName, str):
+            try:
+                mtime = os.path.getmtime(fileName)
+            except OSError:
+                mtime = 0    # qrc资源等
+            self.CacheKey = (os.path.abspath(fileName), mtime)
+            meta = self.Cache.get(self.CacheKey)
+            if meta is not None:
+                self.Image, self.ContentArea, resizeX, resizeY, tiles = meta
+                self.ResizeDistancesX = list(resizeX)
+                self.ResizeDistancesY = list(resizeY)
+                if self.UseTiles:
+                    self.Tiles = tiles if tiles is not None else self.SliceTiles()
+                return
+
         self.Image = QImage(fileName)
         if self.Image.isNull():
             return
 
-        self.ContentArea = self.GetContentArea()
-        self.GetResizeArea()
+        if self.UseNumpy:
+            self.ScanBorders()
+        else:
+            self.ContentArea = self.GetContentArea()
+            self.GetResizeArea()
         if not self.ResizeDistancesX or not self.ResizeDistancesY:
             raise ExceptionNot9Patch
 
+        size = NinePatchCache.imageBytes(self.Image)
+        if self.UseTiles:
+            self.Tiles = self.SliceTiles()
+            size *= 2
+        if self.CacheKey is not None:
+            self.Cache.put(self.CacheKey, (
+                self.Image, self.ContentArea, tuple(self.ResizeDistancesX),
+                tuple(self.ResizeDistancesY), self.Tiles), size)
+
+    def SliceTiles(self):
+        """按拉伸区把图片切成N×M个分块,绘制时不再copy
+        分块保持QImage, 拉伸绘制的结果和原来的copy+scaled逐像素相同
+        """
+        xs = [0]
+        for pos, length in self.ResizeDistancesX:
+            xs.extend((pos, pos + length))
+        xs.append(self.Image.width() - 2)
+        ys = [0]
+        for pos, length in self.ResizeDistancesY:
+            ys.extend((pos, pos + length))
+        ys.append(self.Image.height() - 2)
+
+        tiles = {}
+        for x1, x2 in zip(xs, xs[1:]):
+            for y1, y2 in zip(ys, ys[1:]):
+                if x2 > x1 and y2 > y1:
+                    rect = QRect(x1 + 1, y1 + 1, x2 - x1, y2 - y1)
+                    tiles[(rect.x(), rect.y(), rect.width(), rect.height())] = \
+                        self.Image.copy(rect)
+        return tiles
+
+    def GetTile(self, rect):
+        if self.Tiles is None:
+            return None
+        return self.Tiles.get((rect.x(), rect.y(), rect.width(), rect.height()))
+
     def __del__(self):
         if hasattr(self, "CachedImage"):
             del self.CachedImage
@@ -94,6 +229,14 @@ class NinePatch:
     def Draw(self, painter, x, y):
         painter.drawImage(x, y, self.CachedImage)
 
+    def Paint(self, painter, x, y, width, height):
+        """不经过缓存图片直接把各个分块绘制到painter上
+        """
+        painter.save()
+        painter.translate(x, y)
+        self.DrawParts(painter, width, height)
+        painter.restore()
+
     def SetImageSize(self, width, height):
         resizeWidth = 0
         resizeHeight = 0
@@ -129,6 +272,12 @@ class NinePatch:
     def DrawScaledPart(self, oldRect, newRect, painter):
         if (newRect.width() and newRect.height()):
             # print("DrawScaledPart newRect.width:%d newRect.height:%d" % (newRect.width() , newRect.height()))
+            tile = self.GetTile(oldRect)
+            if tile is not None:
+                # 分块是QImage, drawImage拉伸和QImage.scaled的取样相同,
+                # QPixmap的drawPixmap在纵向放大很多时取样位置不同
+                painter.drawImage(newRect, tile)
+                return
             img = self.Image.copy(oldRect)
             img = img.scaled(newRect.width(), newRect.height())
             painter.drawImage(newRect.x(), newRect.y(), img,
@@ -136,6 +285,11 @@ class NinePatch:
 
     def DrawConstPart(self, oldRect, newRect, painter):
         # print("DrawConstPart oldRect:{oldRect} newRect:{newRect}".format(oldRect = oldRect, newRect = newRect))
+        tile = self.GetTile(oldRect)
+        if tile is not None:
+            painter.drawImage(newRect.x(), newRect.y(), tile, 0,
+                              0, newRect.width(), newRect.height())
+            return
         img = self.Image.copy(oldRect)
         painter.drawImage(newRect.x(), newRect.y(), img, 0,
                           0, newRect.width(), newRect.height())
@@ -214,6 +368,56 @@ class NinePatch:
         # print(self.ResizeDistancesX, len(self.ResizeDistancesX))
         # print(self.ResizeDistancesY, len(self.ResizeDistancesY))
 
+    def ScanBorders(self):
+        """numpy版本的GetContentArea和GetResizeArea,结果与逐像素扫描完全一致
+        """
+        image = self.Image.convertToFormat(QImage.Format_ARGB32)
+        w = image.width()
+        h = image.height()
+        ptr = image.constBits()
+        ptr.setsize(image.bytesPerLine() * h)
+        pixels = np.frombuffer(ptr, np.uint32).reshape(
+            h, image.bytesPerLine() // 4)[:, :w]
+        # 只取出四条边框(复制出来,避免引用image的内存)
+        top = self.IsColorBlackArray(pixels[0])
+        bottom = self.IsColorBlackArray(pixels[h - 1])
+        left = self.IsColorBlackArray(pixels[:, 0])
+        right = self.IsColorBlackArray(pixels[:, w - 1])
+        del pixels, ptr
+
+        # 内容区: 底边和右边第一个到最后一个黑点(第0个像素不参与)
+        x1, x2 = self.GetBlackBounds(bottom)
+        y1, y2 = self.GetBlackBounds(right)
+        self.ContentArea = QRect(x1, y1, x2 - x1, y2 - y1)
+
+        # 拉伸区: 顶边和左边每一段连续黑点
+        self.ResizeDistancesX.extend(self.GetBlackRuns(top))
+        self.ResizeDistancesY.extend(self.GetBlackRuns(left))
+
+    @staticmethod
+    def IsColorBlackArray(colors):
+        colors = np.array(colors, dtype=np.uint32)
+        return (((colors >> 24) & 0xff) >= 128) & \
+            (((colors >> 16) & 0xff) < 128) & \
+            (((colors >> 8) & 0xff) < 128) & \
+            ((colors & 0xff) < 128)
+
+    @staticmethod
+    def GetBlackBounds(black):
+        index = np.flatnonzero(black[1:])
+        if not len(index):
+            return -1, 0
+        return int(index[0]), int(index[-1]) + 1
+
+    @staticmethod
+    def GetBlackRuns(black):
+        # 游程检测, 返回[(起点-1, 长度)]
+        diff = np.diff(np.concatenate(
+            ([0], black[1:].astype(np.int8), [0])))
+        starts = np.flatnonzero(diff == 1)
+        ends = np.flatnonzero(diff == -1)
+        return [(int(s), int(e - s)) for s, e in zip(starts, ends)]
+
     def GetFactor(self, width, height, factorX, factorY):
         topResize = width - (self.Image.width() - 2)
         leftResize = height - (self.Image.height() - 2)
@@ -231,10 +435,27 @@ class NinePatch:
 
     def UpdateCachedImage(self, width, height):
         # print("UpdateCachedImage: ", width, "  " , height)
+        if self.CacheKey is not None:
+            key = self.CacheKey + (width, height)
+            image = self.Cache.get(key)
+            if image is None:
+                self.RenderImage(width, height)
+                self.Cache.put(key, self.CachedImage,
+                               NinePatchCache.imageBytes(self.CachedImage))
+            else:
+                self.CachedImage = image
+        else:
+            self.RenderImage(width, height)
+
+    def RenderImage(self, width, height):
         self.CachedImage = QImage(
             width, height, QImage.Format_ARGB32_Premultiplied)
         self.CachedImage.fill(QColor(0, 0, 0, 0))
         painter = QPainter(self.CachedImage)
+        self.DrawParts(painter, width, height)
+        painter.end()
+
+    def DrawParts(self, painter, width, height):
         factorX = 0.0
         factorY = 0.0
         factorX, factorY = self.GetFactor(width, height, factorX, factorY)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: NinePatchBenchmark
+@description: 对比.9图片逐像素解析和numpy解析的耗时, 以及拖动窗口宽度时的绘制耗时
+    先检查预切分块和copy+scaled绘制的结果逐像素相同
+"""
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = "Copyright (c) 2018 Irony"
+__Version__ = "Version 1.0"
+
+import sys
+from time import perf_counter
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QColor, QGuiApplication, QPainter
+
+from Lib.NinePatch import NinePatch
+
+
+def createNinePatchImage(width, height, segments=8):
+    """生成一张带有多段拉伸标记的大尺寸.9图片
+    """
+    image = QImage(width, height, QImage.Format_ARGB32)
+    image.fill(Qt.transparent)
+    black = QColor(Qt.black).rgba()
+    stepX = (width - 2) // (segments * 2)
+    stepY = (height - 2) // (segments * 2)
+    for n in range(segments):
+        # 顶边和左边: 拉伸区
+        for i in range(1 + stepX * (2 * n + 1), 1 + stepX * (2 * n + 2)):
+            image.setPixel(i, 0, black)
+        for j in range(1 + stepY * (2 * n + 1), 1 + stepY * (2 * n + 2)):
+            image.setPixel(0, j, black)
+    # 底边和右边: 内容区
+    for i in range(stepX, width - stepX):
+        image.setPixel(i, height - 1, black)
+    for j in range(stepY, height - stepY):
+        image.setPixel(width - 1, j, black)
+    return image
+
+
+def benchmark(image, useNumpy, number=5):
+    t = perf_counter()
+    for _ in range(number):
+        patch = NinePatch(image, useNumpy=useNumpy, useTiles=False)
+    return (perf_counter() - t) / number, patch
+
+
+def resizeStorm(fileName, useTiles, cache=None, height=200, number=1000):
+    """模拟拖动窗口宽度经过1000个不同尺寸, 每次都重新生成并绘制
+    """
+    patch = NinePatch(fileName, cache=cache, useTiles=useTiles)
+    canvas = QImage(200 + number, height, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(canvas)
+    t = perf_counter()
+    for width in range(200, 200 + number):
+        patch.SetImageSize(width, height)
+        patch.Draw(painter, 0, 0)
+    t = perf_counter() - t
+    painter.end()
+    return t
+
+
+def compare(fileName, sizes):
+    """预切分块和copy+scaled生成的图片不同的像素数"""
+    differences = {}
+    for width, height in sizes:
+        images = []
+        for useTiles in (False, True):
+            patch = NinePatch(fileName, cache=None, useTiles=useTiles)
+            patch.SetImageSize(width, height)
+            images.append(patch.CachedImage)
+        old, new = images
+        if old == new:
+            continue
+        differences[(width, height)] = sum(
+            old.pixel(x, y) != new.pixel(x, y)
+            for y in range(height) for x in range(width))
+    return differences
+
+
+if __name__ == '__main__':
+    app = QGuiApplication(sys.argv)
+    fileName = 'Data/skin_aio_friend_bubble_pressed.9.png'
+    sizes = [(width, height) for width in (120, 200, 333, 1000)
+             for height in (120, 257, 700, 900, 1000)]
+    differences = compare(fileName, sizes)
+    assert not differences, 'tiles differ from copy+scaled: %s' % differences
+    print('tiles match copy+scaled at %d sizes' % len(sizes))
+
+    for size in (512, 2048, 8192):
+        image = createNinePatchImage(size, size)
+        t1, p1 = benchmark(image, False)
+        t2, p2 = benchmark(image, True)
+        assert p1.ResizeDistancesX == p2.ResizeDistancesX
+        assert p1.ResizeDistancesY == p2.ResizeDistancesY
+        assert p1.ContentArea == p2.ContentArea
+        print('%dx%d  pixel: %.2fms  numpy: %.2fms  x%.1f' % (
+            size, size, t1 * 1000, t2 * 1000, t1 / max(t2, 1e-9)))
+
+    t1 = resizeStorm(fileName, False)
+    t2 = resizeStorm(fileName, True)
+    print('resize 1000 sizes  copy+scaled: %.2fms  tiles: %.2fms  x%.1f' % (
+        t1 * 1000, t2 * 1000, t1 / max(t2, 1e-9)))
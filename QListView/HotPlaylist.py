@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: TencentMovieHotPlay_ListView
+@description: 腾讯视频热播列表（Model/View版，只绘制可见的item）
+'''
+import sys
+import webbrowser
+
+from PyQt5.QtCore import QSize, Qt, QUrl, QTimer, QRect, QEvent,\
+    QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QPainter, QFont, QLinearGradient, QGradient, QColor,\
+    QBrush, QPixmap, QPixmapCache
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+from PyQt5.QtSvg import QSvgWidget, QSvgRenderer
+from PyQt5.QtWidgets import QApplication, QAbstractSlider, QListView,\
+    QStyledItemDelegate
+
+from Lib.ImageService import ImageService  # @UnresolvedImport
+from lxml.etree import HTML  # @UnresolvedImport
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2018 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+# offset=0,30,60,90
+Url = "http://v.qq.com/x/list/movie?pay=-1&offset={0}"
+
+# 播放量图标
+Svg_icon_play_sm = '''<svg xmlns="http://www.w3.org/2000/svg" version="1.1">
+    <path d="M10.83 8.31v.022l-4.08 2.539-.005.003-.048.03-.012-.005c-.073.051-.15.101-.246.101-.217 0-.376-.165-.413-.369l-.027-.011V5.461l.009-.005c0-.009-.009-.014-.009-.022 0-.24.197-.435.44-.435.096 0 .174.049.247.101l.031-.017 4.129 2.569v.016a.42.42 0 0 1 .153.317.418.418 0 0 1-.169.325zm3.493 2.604a.986.986 0 0 1-.948.742 1 1 0 0 1-1-1 .98.98 0 0 1 .094-.412l-.019-.01C12.79 9.559 13 8.807 13 8a5 5 0 1 0-5 5c.766 0 1.484-.186 2.133-.494l.013.03a.975.975 0 0 1 .417-.097 1 1 0 0 1 1 1 .987.987 0 0 1-.77.954A6.936 6.936 0 0 1 8 14.999a7 7 0 1 1 7-7c0 1.048-.261 2.024-.677 2.915z" fill="#999999"></path>
+</svg>
+'''.encode()
+
+Svg_icon_loading = '''<svg width="100%" height="100%" viewBox="0 0 38 38" xmlns="http://www.w3.org/2000/svg">
+    <defs>
+        <linearGradient x1="8.042%" y1="0%" x2="65.682%" y2="23.865%" id="a">
+            <stop stop-color="#03a9f4" stop-opacity="0" offset="0%"/>
+            <stop stop-color="#03a9f4" stop-opacity=".631" offset="63.146%"/>
+            <stop stop-color="#03a9f4" offset="100%"/>
+        </linearGradient>
+    </defs>
+    <g fill="none" fill-rule="evenodd">
+        <g transform="translate(1 1)">
+            <path d="M36 18c0-9.94-8.06-18-18-18" id="Oval-2" stroke="url(#a)" stroke-width="2">
+                <animateTransform
+                    attributeName="transform"
+                    type="rotate"
+                    from="0 18 18"
+                    to="360 18 18"
+                    dur="0.5s"
+                    repeatCount="indefinite" />
+            </path>
+            <circle fill="#03a9f4" cx="36" cy="18" r="4">
+                <animateTransform
+                    attributeName="transform"
+                    type="rotate"
+                    from="0 18 18"
+                    to="360 18 18"
+                    dur="0.5s"
+                    repeatCount="indefinite" />
+            </circle>
+        </g>
+    </g>
+</svg>'''.encode()
+
+# 每个item的大小和封面的位置
+ItemSize = QSize(240, 420)
+CoverRect = QRect(10, 20, 220, 308)
+
+MovieRole = Qt.UserRole + 1     # 影片信息(dict)
+CoverRole = Qt.UserRole + 2     # 封面图片(QPixmap)
+
+
+class PlaylistModel(QAbstractListModel):
+    """只保存影片数据, 封面放在QPixmapCache中, 只有绘制到的item才会去加载或下载
+    """
+
+    # 需要加载封面 (封面地址)
+    coverRequested = pyqtSignal(str)
+
+    def __init__(self, *args, **kwargs):
+        super(PlaylistModel, self).__init__(*args, **kwargs)
+        self._movies = []
+        self._rows = {}         # 封面地址 -> [行号]
+        self._pending = set()   # 正在加载的封面
+        self._default = QPixmap('Data/pic_v.png').scaled(
+            CoverRect.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._movies)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        movie = self._movies[index.row()]
+        if role == Qt.DisplayRole:
+            return movie['title']
+        if role == MovieRole:
+            return movie
+        if role == CoverRole:
+            return self.cover(movie)
+        return None
+
+    def cover(self, movie):
+        url = movie['cover_url']
+        pixmap = QPixmapCache.find(url)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if url and url not in self._pending:
+            # 封面未加载或者已经被QPixmapCache清理掉了
+            self._pending.add(url)
+            self.coverRequested.emit(url)
+        return self._default
+
+    def appendMovies(self, movies):
+        # 一页数据只插入一次
+        if not movies:
+            return
+        start = len(self._movies)
+        self.beginInsertRows(QModelIndex(), start, start + len(movies) - 1)
+        for row, movie in enumerate(movies, start):
+            self._rows.setdefault(movie['cover_url'], []).append(row)
+        self._movies.extend(movies)
+        self.endInsertRows()
+
+    def coverLoaded(self, url, image):
+        self._pending.discard(url)
+        QPixmapCache.insert(url, QPixmap.fromImage(image))
+        for row in self._rows.get(url, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [CoverRole])
+
+    def coverFailed(self, url):
+        # 不再重复请求, 显示默认封面
+        QPixmapCache.insert(url, self._default)
+        self._pending.discard(url)
+
+
+class PlaylistDelegate(QStyledItemDelegate):
+    """绘制封面、底部渐变文字、片名和分数、主演、播放量
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PlaylistDelegate, self).__init__(*args, **kwargs)
+        # svg图标只渲染一次
+        self._playIcon = QPixmap(16, 16)
+        self._playIcon.fill(Qt.transparent)
+        painter = QPainter(self._playIcon)
+        QSvgRenderer(Svg_icon_play_sm).render(painter)
+        painter.end()
+
+    def sizeHint(self, option, index):
+        return ItemSize
+
+    def paint(self, painter, option, index):
+        movie = index.data(MovieRole)
+        if not movie:
+            return
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        rect = option.rect
+        font = QFont(option.font)
+        fheight = option.fontMetrics.height()
+
+        # 封面
+        cover = CoverRect.translated(rect.topLeft())
+        painter.drawPixmap(cover, index.data(CoverRole))
+
+        if movie['info']:
+            # 底部矩形框背景渐变颜色
+            bottomRectColor = QLinearGradient(
+                cover.center().x(), cover.bottom() - 24 - fheight,
+                cover.center().x(), cover.bottom())
+            bottomRectColor.setSpread(QGradient.PadSpread)
+            bottomRectColor.setColorAt(0, QColor(255, 255, 255, 70))
+            bottomRectColor.setColorAt(1, QColor(0, 0, 0, 50))
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QBrush(bottomRectColor))
+            painter.drawRect(cover.x(), cover.bottom() - 24 - fheight,
+                             cover.width(), 24 + fheight)
+            # 距离底部一定高度画文字
+            font.setPointSize(8)
+            painter.setFont(font)
+            painter.setPen(Qt.white)
+            painter.drawText(cover.adjusted(0, 0, 0, -12), Qt.AlignHCenter |
+                             Qt.AlignBottom, movie['info'])
+            painter.setFont(option.font)
+
+        # 片名和分数
+        line = QRect(cover.x(), cover.bottom() + 8, cover.width(), fheight)
+        painter.setPen(QColor(Qt.red))
+        painter.drawText(line, Qt.AlignRight | Qt.AlignVCenter, movie['score'])
+        scoreWidth = option.fontMetrics.width(movie['score']) + 6
+        painter.setPen(option.palette.color(option.palette.WindowText))
+        painter.drawText(line.adjusted(0, 0, -scoreWidth, 0), Qt.AlignLeft | Qt.AlignVCenter,
+                         option.fontMetrics.elidedText(
+                             movie['title'], Qt.ElideRight, line.width() - scoreWidth))
+
+        # 主演
+        line.translate(0, fheight + 8)
+        painter.setPen(QColor('#999999'))
+        painter.drawText(line, Qt.AlignLeft | Qt.AlignVCenter,
+                         option.fontMetrics.elidedText(
+                             '主演：' + ' '.join(movie['actors']), Qt.ElideRight, line.width()))
+
+        # 播放量
+        line.translate(0, fheight + 8)
+        painter.drawPixmap(line.x(), line.center().y() - 8, self._playIcon)
+        painter.drawText(line.adjusted(22, 0, 0, 0),
+                         Qt.AlignLeft | Qt.AlignVCenter, movie['count'])
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        # 点击封面打开播放地址
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if CoverRect.translated(option.rect.topLeft()).contains(event.pos()):
+                movie = index.data(MovieRole)
+                if movie and movie['video_url']:
+                    webbrowser.open_new_tab(movie['video_url'])
+                return True
+        return super(PlaylistDelegate, self).editorEvent(event, model, option, index)
+
+
+class Window(QListView):
+
+    Page = 0
+
+    def __init__(self, *args, **kwargs):
+        super(Window, self).__init__(*args, **kwargs)
+        self.resize(800, 600)
+        self.setFrameShape(self.NoFrame)  # 无边框
+        self.setFlow(self.LeftToRight)  # 从左到右
+        self.setWrapping(True)  # 这三个组合可以达到和FlowLayout一样的效果
+        self.setResizeMode(self.Adjust)
+        # 所有item大小一样, 布局时不用逐个计算
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(self.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(40)
+        self.setSelectionMode(self.NoSelection)
+        self.setEditTriggers(self.NoEditTriggers)
+
+        self._model = PlaylistModel(self)
+        self.setModel(self._model)
+        self.setItemDelegate(PlaylistDelegate(self))
+
+        self._loadStart = False
+        # 连接竖着的滚动条滚动事件
+        self.verticalScrollBar().actionTriggered.connect(self.onActionTriggered)
+        # 进度条
+        self.loadWidget = QSvgWidget(
+            self, minimumHeight=120, minimumWidth=120, visible=False)
+        self.loadWidget.load(Svg_icon_loading)
+
+        # 异步网络下载管理器
+        self._manager = QNetworkAccessManager(self)
+        self._manager.finished.connect(self.onFinished)
+        # 封面下载服务(限制并发数、磁盘缓存、线程池解码)
+        self._service = ImageService(
+            'cache', maxConcurrent=6, size=CoverRect.size(), parent=self)
+        self._service.imageReady.connect(self._model.coverLoaded)
+        self._service.failed.connect(self._model.coverFailed)
+        self._model.coverRequested.connect(self._service.request)
+
+    def load(self):
+        if self.Page == -1:
+            return
+        self._loadStart = True
+        self.loadWidget.setVisible(True)
+        # 延迟一秒后调用目的在于显示进度条
+        QTimer.singleShot(1000, self._load)
+
+    def _load(self):
+        print("load url:", Url.format(self.Page * 30))
+        url = QUrl(Url.format(self.Page * 30))
+        self._manager.get(QNetworkRequest(url))
+
+    def onFinished(self, reply):
+        # 请求完成后会调用该函数
+        html = reply.readAll().data()
+        reply.deleteLater()
+        del reply
+        # 解析网页
+        self._parseHtml(html)
+        self._loadStart = False
+        self.loadWidget.setVisible(False)
+
+    def _parseHtml(self, html):
+        html = HTML(html)
+        # 查找所有的li list_item
+        lis = html.xpath("//li[@class='list_item']")
+        if not lis:
+            self.Page = -1  # 后面没有页面了
+            return
+        self.Page += 1
+        self._makeItem(lis)
+
+    def _makeItem(self, lis):
+        movies = []
+        for li in lis:
+            a = li.find("a")
+            video_url = a.get("href")  # 视频播放地址
+            img = a.find("img")
+            figure_info = a.find("div/span")
+            movies.append({
+                'video_url': video_url,
+                'cover_url': "http:" + img.get("r-lazyload"),  # 封面图片
+                'title': img.get("alt"),  # 电影名
+                'info': "" if figure_info is None else figure_info.text,  # 影片信息
+                'score': "".join(li.xpath(".//em/text()")),  # 评分
+                # 主演
+                'actors': [fd.get("title") for fd in li.xpath(".//div[@class='figure_desc']/a")],
+                # 播放数
+                'count': (li.xpath(".//div[@class='figure_count']/span/text()") or [""])[0],
+            })
+        self._model.appendMovies(movies)
+
+    def onActionTriggered(self, action):
+        # 这里要判断action=QAbstractSlider.SliderMove，可以避免窗口大小改变的问题
+        # 同时防止多次加载同一个url
+        if action != QAbstractSlider.SliderMove or self._loadStart:
+            return
+        # 使用sliderPosition获取值可以同时满足鼠标滑动和拖动判断
+        if self.verticalScrollBar().sliderPosition() == self.verticalScrollBar().maximum():
+            # 可以下一页了
+            self.load()
+
+    def resizeEvent(self, event):
+        super(Window, self).resizeEvent(event)
+        self.loadWidget.setGeometry(
+            int((self.width() - self.loadWidget.minimumWidth()) / 2),
+            int((self.height() - self.loadWidget.minimumHeight()) / 2),
+            self.loadWidget.minimumWidth(),
+            self.loadWidget.minimumHeight()
+        )
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    # 封面缓存上限(KB)
+    QPixmapCache.setCacheLimit(50 * 1024)
+    w = Window()
+    w.show()
+    w.load()
+    sys.exit(app.exec_())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: HotPlaylistBenchmark
+@description: 10万条数据时HotPlaylist(Model/View版)的控件数量和滚动耗时
+'''
+import sys
+from time import perf_counter
+
+from PyQt5.QtWidgets import QApplication
+
+from HotPlaylist import Window
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2018 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+
+def makeMovies(start, count):
+    return [{
+        'video_url': '',
+        'cover_url': '',  # 不下载封面
+        'title': '影片 %d' % i,
+        'info': '更新至%d集' % (i % 40),
+        'score': '%.1f' % (i % 100 / 10),
+        'actors': ['演员%d' % (i % 7), '演员%d' % (i % 11)],
+        'count': '%d万' % (i % 9999),
+    } for i in range(start, start + count)]
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    w = Window()
+    w.show()
+    app.processEvents()
+    widgets = len(app.allWidgets())
+
+    for total in (1000, 10000, 100000):
+        t = perf_counter()
+        w._model.appendMovies(makeMovies(w._model.rowCount(), total - w._model.rowCount()))
+        app.processEvents()
+        load = perf_counter() - t
+
+        # 从头滚动到尾, 每次滚动一屏的1/10并立即重绘
+        bar = w.verticalScrollBar()
+        step = max(1, w.viewport().height() // 10)
+        values = list(range(0, bar.maximum(), max(step, bar.maximum() // 300)))
+        frames = []
+        for value in values:
+            t = perf_counter()
+            bar.setValue(value)
+            w.viewport().repaint()
+            frames.append(perf_counter() - t)
+        frames.sort()
+        print('%6d items  widgets: %d -> %d  append: %.2fms  frame avg: %.2fms  p95: %.2fms' % (
+            total, widgets, len(app.allWidgets()), load * 1000,
+            sum(frames) / len(frames) * 1000, frames[int(len(frames) * 0.95)] * 1000))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ImageServiceBenchmark
+@description: 用本地HTTP服务器提供生成的封面图片, 测试ImageService的并发、去重和缓存
+'''
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import hashlib
+import shutil
+import sys
+import tempfile
+from threading import Thread
+from time import perf_counter, sleep
+
+from PyQt5.QtCore import QBuffer, QByteArray, QEventLoop, Qt
+from PyQt5.QtGui import QGuiApplication, QImage, QPainter, QColor
+
+from Lib.ImageService import ImageService  # @UnresolvedImport
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2018 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+Count = 200     # 不同的封面数量
+Latency = 0.02  # 模拟网络延迟
+
+
+def makeCover(i):
+    image = QImage(440, 616, QImage.Format_RGB32)
+    image.fill(QColor.fromHsv(i * 37 % 360, 160, 200))
+    painter = QPainter(image)
+    painter.setPen(Qt.white)
+    painter.drawText(image.rect(), Qt.AlignCenter, 'Cover %d' % i)
+    painter.end()
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QBuffer.WriteOnly)
+    image.save(buffer, 'JPG', 85)
+    return data.data()
+
+
+class CoverHandler(BaseHTTPRequestHandler):
+
+    covers = {}
+
+    def do_GET(self):
+        sleep(Latency)
+        data = self.covers.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(app, service, urls):
+    loop = QEventLoop()
+    images = []
+
+    def onDone(*args):
+        images.append(args)
+        if not service.pending():
+            loop.quit()
+
+    service.imageReady.connect(onDone)
+    service.failed.connect(onDone)
+    t = perf_counter()
+    for url in urls:
+        service.request(url)
+    if service.pending():
+        loop.exec_()
+    t = perf_counter() - t
+    service.imageReady.disconnect(onDone)
+    service.failed.disconnect(onDone)
+    return t, images
+
+
+if __name__ == '__main__':
+    app = QGuiApplication(sys.argv)
+    CoverHandler.covers = {'/cover/%d.jpg' % i: makeCover(i) for i in range(Count)}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CoverHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    host = 'http://127.0.0.1:%d' % server.server_port
+    # 每个封面请求3次, 测试去重
+    urls = ['%s/cover/%d.jpg' % (host, i % Count) for i in range(Count * 3)]
+
+    for concurrent in (1, 6):
+        cacheDir = tempfile.mkdtemp()
+        service = ImageService(cacheDir, maxConcurrent=concurrent)
+        t, images = run(app, service, urls)
+        size = images[0][1].size()
+        print('concurrent %d  cold: %.2fs  images: %d  size: %dx%d  %s' % (
+            concurrent, t, len(images), size.width(), size.height(), service.stats))
+        service.saveIndex()
+
+        # 磁盘缓存
+        service = ImageService(cacheDir, maxConcurrent=concurrent)
+        t, images = run(app, service, urls)
+        print('concurrent %d  warm: %.2fs  images: %d  %s' % (
+            concurrent, t, len(images), service.stats))
+
+        # ETag确认
+        service = ImageService(cacheDir, maxConcurrent=concurrent, revalidate=True)
+        t, images = run(app, service, urls)
+        print('concurrent %d  etag: %.2fs  images: %d  %s' % (
+            concurrent, t, len(images), service.stats))
+
+        # 超过大小后清理
+        service.maxCacheBytes = 512 * 1024
+        service._evict()
+        print('evict to %dKB  files: %d' % (service._bytes // 1024, len(service._index)))
+        shutil.rmtree(cacheDir, ignore_errors=True)
+    server.shutdown()
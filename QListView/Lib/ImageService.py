@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ImageService
+@description: 限制并发数的图片下载服务, 带磁盘缓存, 在线程池中解码
+'''
+from collections import deque
+import hashlib
+import json
+import os
+from time import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, QTimer, QUrl,\
+    Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2018 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+
+class _DecodeSignals(QObject):
+
+    # url, 图片, 写入的文件(新下载的才有), 文件大小
+    finished = pyqtSignal(str, QImage, str, int)
+
+
+class _DecodeTask(QRunnable):
+    """在线程池中写入磁盘并用QImageReader按目标大小解码
+    """
+
+    def __init__(self, signals, url, path, size, data=None):
+        super(_DecodeTask, self).__init__()
+        self.signals = signals
+        self.url = url
+        self.path = path
+        self.size = size
+        self.data = data
+
+    def run(self):
+        written = ''
+        length = 0
+        try:
+            if self.data is not None and not os.path.isfile(self.path):
+                tmp = '%s.%d.tmp' % (self.path, id(self))
+                with open(tmp, 'wb') as fp:
+                    fp.write(self.data)
+                os.replace(tmp, self.path)
+                written = self.path
+                length = len(self.data)
+            reader = QImageReader(self.path)
+            reader.setDecideFormatFromContent(True)
+            if self.size.isValid():
+                reader.setScaledSize(self.size)
+            image = reader.read()
+        except OSError:
+            image = QImage()
+        self.signals.finished.emit(self.url, image, written, length)
+
+
+class ImageService(QObject):
+    """图片下载服务
+
+    - 最多同时下载maxConcurrent个, 同一个url只会下载一次
+    - 按文件内容的sha1保存在cacheDir中, index.json记录url对应的文件、ETag和大小
+    - 超过maxCacheBytes时删除最久未使用的文件
+    - 在线程池中用QImageReader解码并缩放到size, 通过imageReady返回QImage
+    """
+
+    imageReady = pyqtSignal(str, QImage)
+    failed = pyqtSignal(str)
+
+    def __init__(self, cacheDir='cache', maxConcurrent=6, maxCacheBytes=200 * 1024 * 1024,
+                 size=QSize(220, 308), revalidate=False, *args, **kwargs):
+        super(ImageService, self).__init__(*args, **kwargs)
+        self.cacheDir = cacheDir
+        self.maxConcurrent = maxConcurrent
+        self.maxCacheBytes = maxCacheBytes
+        self.size = size
+        # 已缓存的也通过If-None-Match向服务器确认
+        self.revalidate = revalidate
+        os.makedirs(cacheDir, exist_ok=True)
+
+        self._queue = deque()   # 等待下载的url
+        self._waiting = set()   # 排队、下载和解码中的url
+        self._running = 0
+        self._index = self._loadIndex()
+        self._bytes = sum(dict((entry['hash'], entry['size'])
+                               for entry in self._index.values()).values())
+        self.stats = {'requests': 0, 'deduplicated': 0, 'hits': 0,
+                      'downloads': 0, 'notModified': 0, 'bytes': 0, 'evictions': 0}
+
+        self._pool = QThreadPool(self)
+        self._signals = _DecodeSignals(self)
+        self._signals.finished.connect(self._onDecoded, Qt.QueuedConnection)
+        self._manager = QNetworkAccessManager(self)
+        self._manager.finished.connect(self._onFinished)
+        # 索引延迟写入磁盘
+        self._saveTimer = QTimer(self, singleShot=True, interval=1000,
+                                 timeout=self.saveIndex)
+
+    def request(self, url):
+        self.stats['requests'] += 1
+        if url in self._waiting:
+            self.stats['deduplicated'] += 1
+            return
+        self._waiting.add(url)
+        entry = self._index.get(url)
+        if entry and os.path.isfile(self._path(entry['hash'])) and not self.revalidate:
+            self.stats['hits'] += 1
+            self._touch(entry)
+            self._decode(url, self._path(entry['hash']))
+            return
+        self._queue.append(url)
+        self._next()
+
+    def pending(self):
+        return len(self._waiting)
+
+    def clear(self):
+        for entry in self._index.values():
+            try:
+                os.remove(self._path(entry['hash']))
+            except OSError:
+                pass
+        self._index.clear()
+        self._bytes = 0
+        self.saveIndex()
+
+    def saveIndex(self):
+        tmp = os.path.join(self.cacheDir, 'index.json.tmp')
+        with open(tmp, 'w') as fp:
+            json.dump(self._index, fp)
+        os.replace(tmp, os.path.join(self.cacheDir, 'index.json'))
+
+    def _loadIndex(self):
+        try:
+            with open(os.path.join(self.cacheDir, 'index.json')) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def _path(self, digest):
+        return os.path.join(self.cacheDir, digest)
+
+    def _touch(self, entry):
+        entry['atime'] = time()
+        self._saveTimer.start()
+
+    def _next(self):
+        while self._queue and self._running < self.maxConcurrent:
+            url = self._queue.popleft()
+            req = QNetworkRequest(QUrl(url))
+            req.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
+            req.setAttribute(QNetworkRequest.User + 1, url)
+            entry = self._index.get(url)
+            if entry and entry.get('etag') and os.path.isfile(self._path(entry['hash'])):
+                req.setRawHeader(b'If-None-Match', entry['etag'].encode())
+            self._running += 1
+            self._manager.get(req)
+
+    def _decode(self, url, path, data=None):
+        self._pool.start(_DecodeTask(self._signals, url, path, self.size, data))
+
+    def _onFinished(self, reply):
+        self._running -= 1
+        url = reply.request().attribute(QNetworkRequest.User + 1)
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        entry = self._index.get(url)
+        if status == 304 and entry:
+            # 服务器上没有变化
+            self.stats['notModified'] += 1
+            self._touch(entry)
+            self._decode(url, self._path(entry['hash']))
+        elif reply.error() == reply.NoError:
+            data = reply.readAll().data()
+            digest = hashlib.sha1(data).hexdigest()
+            self.stats['downloads'] += 1
+            self.stats['bytes'] += len(data)
+            if entry and entry['hash'] != digest:
+                self._remove(url)
+            self._index[url] = {
+                'hash': digest, 'size': len(data), 'atime': time(),
+                'etag': bytes(reply.rawHeader(b'ETag')).decode(errors='ignore'),
+            }
+            self._decode(url, self._path(digest), data)
+        else:
+            self._waiting.discard(url)
+            self.failed.emit(url)
+        reply.deleteLater()
+        self._next()
+
+    def _onDecoded(self, url, image, written, length):
+        self._waiting.discard(url)
+        if written:
+            self._bytes += length
+            self._evict()
+            self._saveTimer.start()
+        if image.isNull():
+            self.failed.emit(url)
+        else:
+            self.imageReady.emit(url, image)
+
+    def _remove(self, url):
+        entry = self._index.pop(url)
+        # 相同内容的文件可能被多个url共用
+        if not any(e['hash'] == entry['hash'] for e in self._index.values()):
+            try:
+                os.remove(self._path(entry['hash']))
+                self._bytes -= entry['size']
+            except OSError:
+                pass
+
+    def _evict(self):
+        if self._bytes <= self.maxCacheBytes:
+            return
+        for url, _ in sorted(self._index.items(), key=lambda item: item[1]['atime']):
+            if self._bytes <= self.maxCacheBytes:
+                break
+            if url in self._waiting:
+                continue
+            self._remove(url)
+            self.stats['evictions'] += 1
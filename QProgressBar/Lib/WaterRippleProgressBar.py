@@ -14,13 +14,134 @@ Email: 892768447@qq.com"""
 __Copyright__ = 'Copyright (c) 2018 Irony'
 __Version__ = 1.0
 
+from collections import OrderedDict
 import math
 
-from PyQt5.QtCore import QTimer, Qt, QRectF, QSize
-from PyQt5.QtGui import QPainter, QPainterPath, QColor, QFont
+from PyQt5.QtCore import QObject, QTimer, Qt, QRectF, QSize, QPointF
+from PyQt5.QtGui import QPainter, QPainterPath, QColor, QFont, QPolygonF
 from PyQt5.QtWidgets import QProgressBar
 
 
+try:
+    from PyQt5 import sip
+except ImportError:
+    import sip
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# 每次刷新波浪偏移的距离
+OffsetStep = 0.6
+# 缓存的波浪数量(每种尺寸每个相位一对)
+CacheSize = 1024
+
+
+def wavePolygon(width, height, w, A, phase):
+    """y = A * sin(ωx + φ) 从左下角开始, 经过波浪后回到左下角封闭
+    k不参与计算, 绘制时平移, 不同进度可以共用
+    """
+    if np is None:
+        points = [QPointF(0, height)]
+        points.extend(QPointF(i, A * math.sin(w * i + phase))
+                      for i in range(width + 1))
+        points.extend((QPointF(width, height), QPointF(0, height)))
+        return QPolygonF(points)
+    count = width + 4
+    polygon = QPolygonF(count)
+    # 直接写入QPolygonF的内存, 一次算完所有点
+    ptr = polygon.data()
+    ptr.setsize(count * 2 * 8)
+    buffer = np.frombuffer(ptr, np.float64).reshape(count, 2)
+    xs = np.arange(width + 1, dtype=np.float64)
+    buffer[1:-2, 0] = xs
+    buffer[1:-2, 1] = A * np.sin(w * xs + phase)
+    buffer[(0, -1), 0] = 0
+    buffer[-2, 0] = width
+    buffer[(0, -2, -1), 1] = height
+    return polygon
+
+
+class WaveCache:
+    """按 (宽, 高, 密度, 浪高, 相位) 缓存两条波浪, 同样大小的进度条共用"""
+
+    def __init__(self, size=CacheSize):
+        self.size = size
+        self._waves = OrderedDict()
+
+    def get(self, width, height, density, waterHeight, index):
+        key = (width, height, density, waterHeight, index)
+        waves = self._waves.get(key)
+        if waves is not None:
+            self._waves.move_to_end(key)
+            return waves
+        # w表示周期，6为人为定义
+        w = 6 * density * math.pi / width
+        # A振幅 高度百分比，1/26为人为定义
+        A = height * waterHeight * 1 / 26
+        offset = index * OffsetStep
+        waves = (wavePolygon(width, height, w, A, offset),
+                 # 相对第一条需要进行错位
+                 wavePolygon(width, height, w, A, offset + width / 2 * A))
+        self._waves[key] = waves
+        if len(self._waves) > self.size:
+            self._waves.popitem(last=False)
+        return waves
+
+    def clear(self):
+        self._waves.clear()
+
+
+class WaveClock(QObject):
+    """所有进度条共用的定时器, 只刷新显示中且没有被遮挡的进度条"""
+
+    _instance = None
+
+    def __init__(self, interval=100, *args, **kwargs):
+        super(WaveClock, self).__init__(*args, **kwargs)
+        self.index = 0
+        self._bars = set()
+        self._timer = QTimer(self, timeout=self.tick)
+        self._timer.setInterval(interval)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None or sip.isdeleted(cls._instance):
+            cls._instance = cls()
+        return cls._instance
+
+    def interval(self):
+        return self._timer.interval()
+
+    def setInterval(self, interval):
+        self._timer.setInterval(interval)
+
+    def register(self, bar):
+        self._bars.add(bar)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def unregister(self, bar):
+        self._bars.discard(bar)
+        if not self._bars:
+            self._timer.stop()
+
+    def tick(self):
+        self.index += 1
+        for bar in list(self._bars):
+            if sip.isdeleted(bar):
+                self._bars.discard(bar)
+                continue
+            # 被遮挡、滚动到外面或者窗口最小化时跳过
+            if bar.visibleRegion().isEmpty() or bar.window().isMinimized():
+                continue
+            bar.update()
+        if not self._bars:
+            self._timer.stop()
+
+
 class WaterRippleProgressBar(QProgressBar):
 
     # 浪高百分比
@@ -38,12 +159,21 @@ class WaterRippleProgressBar(QProgressBar):
     # 波浪颜色2
     waterColor2 = QColor(33, 178, 148, 100)
 
+    # 所有进度条共用的波浪缓存
+    waveCache = WaveCache()
+
     def __init__(self, *args, **kwargs):
         super(WaterRippleProgressBar, self).__init__(*args, **kwargs)
-        self._offset = 0
-        # 每隔100ms刷新波浪（模拟波浪动态）
-        self._updateTimer = QTimer(self, timeout=self.update)
-        self._updateTimer.start(100)
+        # 每隔100ms刷新波浪（模拟波浪动态）, 所有进度条共用一个定时器
+        self._clock = WaveClock.instance()
+
+    def showEvent(self, event):
+        super(WaterRippleProgressBar, self).showEvent(event)
+        self._clock.register(self)
+
+    def hideEvent(self, event):
+        super(WaterRippleProgressBar, self).hideEvent(event)
+        self._clock.unregister(self)
 
     def setRange(self, minValue, maxValue):
         if minValue == maxValue == 0:
@@ -85,39 +215,15 @@ class WaterRippleProgressBar(QProgressBar):
         # 当前值所占百分比
         percent = 1 - (self.value() - self.minimum()) / \
             (self.maximum() - self.minimum())
-        # w表示周期，6为人为定义
-        w = 6 * self.waterDensity * math.pi / self.width()
-        # A振幅 高度百分比，1/26为人为定义
-        A = self.height() * self.waterHeight * 1 / 26
         # k 高度百分比
         k = self.height() * percent
 
-        # 波浪1
-        waterPath1 = QPainterPath()
-        waterPath1.moveTo(0, self.height())  # 起点在左下角
-        # 波浪2
-        waterPath2 = QPainterPath()
-        waterPath2.moveTo(0, self.height())  # 起点在左下角
-
-        # 偏移
-        self._offset += 0.6
-        if self._offset > self.width() / 2:
-            self._offset = 0
-
-        for i in range(self.width() + 1):
-            # 从x轴开始计算y轴点
-            y = A * math.sin(w * i + self._offset) + k
-            waterPath1.lineTo(i, y)
-
-            # 相对第一条需要进行错位
-            y = A * math.sin(w * i + self._offset + self.width() / 2 * A) + k
-            waterPath2.lineTo(i, y)
-
-        # 封闭两条波浪，形成一个 U形 上面加波浪的封闭区间
-        waterPath1.lineTo(self.width(), self.height())
-        waterPath1.lineTo(0, self.height())
-        waterPath2.lineTo(self.width(), self.height())
-        waterPath2.lineTo(0, self.height())
+        # 偏移, 超过一半宽度后从0开始
+        width, height = self.width(), self.height()
+        index = self._clock.index % (int(width / 2 / OffsetStep) + 1)
+        # 两条波浪都是 U形 上面加波浪的封闭区间
+        wave1, wave2 = self.waveCache.get(
+            width, height, self.waterDensity, self.waterHeight, index)
 
         # 整体形状（矩形或者圆形）
         bgPath = QPainterPath()
@@ -143,16 +249,15 @@ class WaterRippleProgressBar(QProgressBar):
         painter.drawPath(bgPath)
         painter.restore()
 
-        # 波浪1
+        # 波浪按进度平移
         painter.save()
+        painter.translate(0, k)
+        # 波浪1
         painter.setBrush(self.waterColor1)
-        painter.drawPath(waterPath1)
-        painter.restore()
-
+        painter.drawPolygon(wave1)
         # 波浪2
-        painter.save()
         painter.setBrush(self.waterColor2)
-        painter.drawPath(waterPath2)
+        painter.drawPolygon(wave2)
         painter.restore()
 
         # 绘制文字
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: WaterRippleBenchmark
+@description: 200个水波纹进度条的CPU占用
+    原来每个进度条一个定时器, 每次绘制逐点计算波浪; 现在共用定时器和波浪缓存
+"""
+import math
+import sys
+from time import perf_counter, process_time
+
+from PyQt5.QtCore import QEventLoop, QTimer, Qt, QRectF
+from PyQt5.QtGui import QPainter, QPainterPath
+from PyQt5.QtWidgets import QApplication, QWidget, QGridLayout, QScrollArea
+
+from Lib.WaterRippleProgressBar import WaterRippleProgressBar
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class OldWaterRippleProgressBar(WaterRippleProgressBar):
+    """原来的实现"""
+
+    def __init__(self, *args, **kwargs):
+        super(OldWaterRippleProgressBar, self).__init__(*args, **kwargs)
+        self._offset = 0
+        self._updateTimer = QTimer(self, timeout=self.update)
+        self._updateTimer.start(100)
+
+    def showEvent(self, event):
+        QWidget.showEvent(self, event)
+
+    def hideEvent(self, event):
+        QWidget.hideEvent(self, event)
+
+    def paintEvent(self, event):
+        percent = 1 - (self.value() - self.minimum()) / \
+            (self.maximum() - self.minimum())
+        w = 6 * self.waterDensity * math.pi / self.width()
+        A = self.height() * self.waterHeight * 1 / 26
+        k = self.height() * percent
+        waterPath1 = QPainterPath()
+        waterPath1.moveTo(0, self.height())
+        waterPath2 = QPainterPath()
+        waterPath2.moveTo(0, self.height())
+        self._offset += 0.6
+        if self._offset > self.width() / 2:
+            self._offset = 0
+        for i in range(self.width() + 1):
+            y = A * math.sin(w * i + self._offset) + k
+            waterPath1.lineTo(i, y)
+            y = A * math.sin(w * i + self._offset + self.width() / 2 * A) + k
+            waterPath2.lineTo(i, y)
+        waterPath1.lineTo(self.width(), self.height())
+        waterPath1.lineTo(0, self.height())
+        waterPath2.lineTo(self.width(), self.height())
+        waterPath2.lineTo(0, self.height())
+        bgPath = QPainterPath()
+        bgPath.addRect(QRectF(self.rect()))
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.backgroundColor)
+        painter.drawPath(bgPath)
+        painter.setBrush(self.waterColor1)
+        painter.drawPath(waterPath1)
+        painter.setBrush(self.waterColor2)
+        painter.drawPath(waterPath2)
+        painter.setPen(self.textColor)
+        painter.drawText(self.rect(), Qt.AlignCenter, '%d%%' %
+                         (self.value() / self.maximum() * 100))
+
+
+def runFor(seconds):
+    """运行事件循环(空闲时不占CPU), 返回cpu时间"""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    cpu = process_time()
+    loop.exec_()
+    return process_time() - cpu
+
+
+def dashboard(cls, count=200, columns=20, visibleRows=None):
+    """count个进度条, visibleRows不为空时放在滚动区域中只能看到前几行"""
+    widget = QWidget()
+    layout = QGridLayout(widget)
+    for i in range(count):
+        bar = cls(widget, value=i % 101)
+        bar.setFixedSize(80, 80)
+        layout.addWidget(bar, i // columns, i % columns)
+    if visibleRows is None:
+        widget.show()
+        return widget
+    area = QScrollArea()
+    area.setWidget(widget)
+    area.resize(widget.sizeHint().width() + 40, visibleRows * 90)
+    area.show()
+    return area
+
+
+def measure(cls, seconds=3, **kwargs):
+    window = dashboard(cls, **kwargs)
+    runFor(0.5)
+    cpu = runFor(seconds)
+    window.close()
+    window.deleteLater()
+    runFor(0.2)
+    return cpu / seconds * 100
+
+
+def paintTime(cls, number=60):
+    """单个进度条绘制一次的耗时(毫秒)"""
+    bar = cls(value=37)
+    bar.resize(80, 80)
+    # 每次都是新的相位, 不命中缓存
+    WaterRippleProgressBar.waveCache.clear()
+    t = perf_counter()
+    for i in range(number):
+        bar._clock.index = i
+        bar.grab()
+    return (perf_counter() - t) / number * 1000
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    print('paint once: old %.3fms, new %.3fms' % (
+        paintTime(OldWaterRippleProgressBar), paintTime(WaterRippleProgressBar)))
+    print('%-28s %10s %10s' % ('200 bars, cpu', 'old', 'new'))
+    print('%-28s %9.1f%% %9.1f%%' % (
+        'all visible', measure(OldWaterRippleProgressBar),
+        measure(WaterRippleProgressBar)))
+    print('%-28s %9.1f%% %9.1f%%' % (
+        'scroll area, 2 rows visible',
+        measure(OldWaterRippleProgressBar, visibleRows=2),
+        measure(WaterRippleProgressBar, visibleRows=2)))
@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: NeighborGrid
+@description: 均匀网格索引查找每个点最近的k个点, 代替O(n²)的findClose
+    有numpy时向量化计算, 没有时用纯python的网格
+"""
+from heapq import nsmallest
+import math
+
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+# 平均每个格子里的点数
+CellDensity = 4.0
+# 向量化查询时每次处理的点数, 限制临时数组的大小
+ChunkSize = 1024
+
+
+class NeighborGrid:
+    """把点按坐标放进均匀网格, 每个点只和周围3x3个格子里的点比较距离
+
+    - build(xs, ys) 建立网格并计算所有点的k个最近点
+    - update(indices, xs, ys) 只移动部分点, 只重新计算受影响格子附近的点
+    - neighbors 为(n, k)的下标数组(纯python时为列表), 按距离从近到远排序,
+      点数不足k+1时不足的部分为-1
+    """
+
+    def __init__(self, k=5, cellSize=None):
+        self.k = k
+        self.cellSize = cellSize
+        self.neighbors = []
+
+    def __len__(self):
+        return len(self.xs) if hasattr(self, 'xs') else 0
+
+    def build(self, xs, ys):
+        if np is None:
+            self._pyBuild(xs, ys)
+            return self.neighbors
+        self.xs = np.array(xs, np.float64)
+        self.ys = np.array(ys, np.float64)
+        n = len(self.xs)
+        self.neighbors = np.full((n, self.k), -1, np.intp)
+        if not n:
+            return self.neighbors
+        self.left = self.xs.min()
+        self.top = self.ys.min()
+        width = self.xs.max() - self.left + 1
+        height = self.ys.max() - self.top + 1
+        self.size = self.cellSize or max(
+            math.sqrt(width * height * CellDensity / n), 1.0)
+        self.columns = int(width // self.size) + 1
+        self.rows = int(height // self.size) + 1
+        self._cells = self._cellOf(self.xs, self.ys)
+        self._sortCells()
+        # 超出3x3范围后用暴力计算的点, 任意点移动都要重新计算
+        self._slow = np.zeros(n, bool)
+        # 每个点到第k个最近点的距离的平方
+        self._kth = np.full(n, np.inf)
+        self._query(np.arange(n))
+        return self.neighbors
+
+    def update(self, indices, xs, ys):
+        """移动部分点: indices为点的下标, xs, ys为新坐标"""
+        if np is None or not len(self):
+            # 纯python时直接重建
+            allXs, allYs = list(self.xs), list(self.ys)
+            for i, x, y in zip(indices, xs, ys):
+                allXs[i] = x
+                allYs[i] = y
+            return self.build(allXs, allYs)
+        indices = np.asarray(indices, np.intp)
+        if not len(indices):
+            return self.neighbors
+        if len(indices) * 4 >= len(self):
+            # 大部分点都移动了, 重新排序并计算所有点比逐个找受影响的点快
+            self.xs[indices] = xs
+            self.ys[indices] = ys
+            self._cells = self._cellOf(self.xs, self.ys)
+            self._sortCells()
+            self._query(np.arange(len(self)))
+            return self.neighbors
+        oldCells = self._cells[indices]
+        self.xs[indices] = xs
+        self.ys[indices] = ys
+        newCells = self._cellOf(self.xs[indices], self.ys[indices])
+        changed = oldCells != newCells
+        if np.any(changed):
+            self._cells[indices] = newCells
+            self._moveCells(indices[changed])
+        self._sortedXs[self._rank[indices]] = self.xs[indices]
+        self._sortedYs[self._rank[indices]] = self.ys[indices]
+        # 需要重新计算的点: 被移动的点, 近邻中有被移动的点的点,
+        # 被移动的点的新位置比它第k个近邻更近的点, 以及超出3x3范围的点
+        moved = np.zeros(len(self) + 1, bool)
+        moved[indices] = True
+        # 下标-1(近邻不足k个)对应最后一个False
+        affected = moved[self.neighbors].any(1)
+        affected |= moved[:-1]
+        affected |= self._slow
+        affected[self._closer(indices)] = True
+        self._query(np.flatnonzero(affected))
+        return self.neighbors
+
+    def _cellOf(self, xs, ys):
+        # 超出网格的点放到边上的格子里, 只会多出一些候选点, 不影响结果
+        cx = np.clip(((xs - self.left) // self.size).astype(np.intp), 0, self.columns - 1)
+        cy = np.clip(((ys - self.top) // self.size).astype(np.intp), 0, self.rows - 1)
+        return cy * self.columns + cx
+
+    def _sortCells(self):
+        self._order = np.argsort(self._cells, kind='stable')
+        self._countCells()
+
+    def _moveCells(self, indices):
+        """只把换了格子的点移到新格子的位置, 其它点的顺序不变, 不用重新排序"""
+        keep = np.ones(len(self._order), bool)
+        keep[self._rank[indices]] = False
+        order = self._order[keep]
+        indices = indices[np.argsort(self._cells[indices], kind='stable')]
+        positions = np.searchsorted(self._cells[order], self._cells[indices], 'right')
+        self._order = np.insert(order, positions, indices)
+        self._countCells()
+
+    def _countCells(self):
+        counts = np.bincount(self._cells, minlength=self.rows * self.columns)
+        self._starts = np.zeros(len(counts) + 1, np.intp)
+        np.cumsum(counts, out=self._starts[1:])
+        # 按格子排序后的坐标, 候选点直接从这里连续读取
+        self._sortedXs = self.xs[self._order]
+        self._sortedYs = self.ys[self._order]
+        # 每个点在排序后的位置
+        self._rank = np.empty_like(self._order)
+        self._rank[self._order] = np.arange(len(self._order))
+
+    def _segments(self, indices):
+        """每个点周围3x3个格子: 同一行左中右3个格子在排序后是连续的, 只需要3段"""
+        cy, cx = np.divmod(self._cells[indices], self.columns)
+        first = np.maximum(cx - 1, 0)
+        last = np.minimum(cx + 1, self.columns - 1)
+        begins = []
+        ends = []
+        for dy in (-1, 0, 1):
+            ny = cy + dy
+            valid = (ny >= 0) & (ny < self.rows)
+            row = np.where(valid, ny, 0) * self.columns
+            begin = self._starts[row + first]
+            begins.append(begin)
+            ends.append(np.where(valid, self._starts[row + last + 1], begin))
+        return cx, cy, np.stack(begins, 1), np.stack(ends, 1)
+
+    def _closer(self, indices):
+        """被移动的点的新位置周围3x3个格子里, 距离比自己第k个近邻更近的点
+        不超出3x3范围的点的k个近邻都在它周围3x3个格子里, 所以只需要找这些格子
+        """
+        _, _, begins, ends = self._segments(indices)
+        width = max(int((ends - begins).max()), 1)
+        slots = begins[:, :, None] + np.arange(width)
+        valid = (slots < ends[:, :, None]).reshape(len(indices), -1)
+        points = np.take(self._order, slots.reshape(len(indices), -1), mode='clip')
+        dist = (self.xs[points] - self.xs[indices][:, None]) ** 2 + \
+            (self.ys[points] - self.ys[indices][:, None]) ** 2
+        return points[valid & (dist < self._kth[points])]
+
+    def _query(self, indices):
+        if not self.k or not len(indices):
+            return
+        cx, cy, begins, ends = self._segments(indices)
+        # 按候选点数量排序后分块, 每块补齐的长度接近
+        sort = np.argsort((ends - begins).max(1), kind='stable')
+        for start in range(0, len(indices), ChunkSize):
+            chunk = sort[start:start + ChunkSize]
+            self._queryChunk(indices[chunk], cx[chunk], cy[chunk], begins[chunk], ends[chunk])
+
+    def _queryChunk(self, indices, cx, cy, begins, ends):
+        k = self.k
+        # 每段的候选点补齐到同样的长度
+        width = max(int((ends - begins).max()), 1)
+        slots = begins[:, :, None] + np.arange(width)
+        invalid = (slots >= ends[:, :, None]).reshape(len(indices), -1)
+        slots = slots.reshape(len(indices), -1)
+        # 排除点自己
+        invalid |= slots == self._rank[indices][:, None]
+        px = self.xs[indices]
+        py = self.ys[indices]
+        # 原地计算, 减少临时数组
+        dist = np.take(self._sortedXs, slots, mode='clip')
+        dist -= px[:, None]
+        dist *= dist
+        dy = np.take(self._sortedYs, slots, mode='clip')
+        dy -= py[:, None]
+        dy *= dy
+        dist += dy
+        dist[invalid] = np.inf
+        if dist.shape[1] < k:
+            dist = np.pad(dist, ((0, 0), (0, k - dist.shape[1])), constant_values=np.inf)
+            slots = np.pad(slots, ((0, 0), (0, k - slots.shape[1])))
+        part = np.argpartition(dist, k - 1, 1)[:, :k]
+        partDist = np.take_along_axis(dist, part, 1)
+        sort = np.argsort(partDist, 1)
+        part = np.take_along_axis(part, sort, 1)
+        partDist = np.take_along_axis(partDist, sort, 1)
+        result = np.take(self._order, np.take_along_axis(slots, part, 1), mode='clip')
+        result[np.isinf(partDist)] = -1
+
+        # 3x3格子范围内能保证正确的距离: 点到3x3格子边界的最短距离,
+        # 在网格边上的一侧外面的点都被放进了边上的格子, 这一侧不用限制
+        left = self.left + (cx - 1) * self.size
+        top = self.top + (cy - 1) * self.size
+        inf = np.inf
+        safe = np.minimum.reduce([
+            np.where(cx > 0, px - left, inf),
+            np.where(cx < self.columns - 1, left + 3 * self.size - px, inf),
+            np.where(cy > 0, py - top, inf),
+            np.where(cy < self.rows - 1, top + 3 * self.size - py, inf)])
+        slow = partDist[:, -1] > np.where(safe > 0, safe, 0) ** 2
+        self.neighbors[indices] = result
+        self._kth[indices] = partDist[:, -1]
+        self._slow[indices] = slow
+        for i in indices[slow]:
+            self.neighbors[i] = self._bruteForce(i)
+
+    def _bruteForce(self, i):
+        dist = (self.xs - self.xs[i]) ** 2 + (self.ys - self.ys[i]) ** 2
+        dist[i] = np.inf
+        k = min(self.k, len(dist) - 1)
+        result = np.full(self.k, -1, np.intp)
+        if k > 0:
+            part = np.argpartition(dist, k - 1)[:k]
+            result[:k] = part[np.argsort(dist[part])]
+            if k == self.k:
+                self._kth[i] = dist[result[k - 1]]
+        return result
+
+    def _pyBuild(self, xs, ys):
+        self.xs = list(xs)
+        self.ys = list(ys)
+        n = len(self.xs)
+        self.neighbors = []
+        if not n:
+            return
+        left = min(self.xs)
+        top = min(self.ys)
+        width = max(self.xs) - left + 1
+        height = max(self.ys) - top + 1
+        size = self.cellSize or max(math.sqrt(width * height * CellDensity / n), 1.0)
+        maxRing = int(max(width, height) // size) + 1
+        grid = {}
+        cells = []
+        for i, (x, y) in enumerate(zip(self.xs, self.ys)):
+            cell = (int((x - left) // size), int((y - top) // size))
+            cells.append(cell)
+            grid.setdefault(cell, []).append(i)
+        k = min(self.k, n - 1)
+        if k <= 0:
+            # k为0或者只有一个点, 没有近邻
+            self.neighbors = [[-1] * self.k for _ in range(n)]
+            return
+        for i, (cx, cy) in enumerate(cells):
+            x = self.xs[i]
+            y = self.ys[i]
+            candidates = []
+            ring = 0
+            # 一圈一圈向外找, 找到k个且第k个的距离不超过已搜索范围时停止
+            while True:
+                for gx in range(cx - ring, cx + ring + 1):
+                    for gy in range(cy - ring, cy + ring + 1):
+                        if max(abs(gx - cx), abs(gy - cy)) != ring:
+                            continue
+                        for j in grid.get((gx, gy), ()):
+                            if j != i:
+                                candidates.append(
+                                    ((self.xs[j] - x) ** 2 + (self.ys[j] - y) ** 2, j))
+                if len(candidates) >= k:
+                    closest = nsmallest(k, candidates)
+                    reach = min(x - left - (cx - ring) * size, (cx + ring + 1) * size - (x - left),
+                                y - top - (cy - ring) * size, (cy + ring + 1) * size - (y - top))
+                    if ring >= maxRing or closest[-1][0] <= reach * reach:
+                        break
+                elif ring >= maxRing:
+                    closest = sorted(candidates)
+                    break
+                ring += 1
+            row = [j for _, j in closest]
+            self.neighbors.append(row + [-1] * (self.k - len(row)))
+
+
+def getDistance(p1, p2):
+    return math.pow(p1.x - p2.x, 2) + math.pow(p1.y - p2.y, 2)
+
+
+def findClose(points, k=5):
+    """给每个点设置closest为最近的k个点, 和原来的findClose用法一样"""
+    grid = NeighborGrid(k)
+    neighbors = grid.build([p.x for p in points], [p.y for p in points])
+    for p, row in zip(points, neighbors):
+        p.closest = [points[j] if j >= 0 else None for j in row]
+    return grid
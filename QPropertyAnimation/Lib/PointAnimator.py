@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: PointAnimator
+@description: 用一个定时器驱动所有点的动画, 坐标、目标、进度都放在numpy数组中
+    代替每个点两个QPropertyAnimation, 每帧只发送一次frameChanged
+"""
+from math import pi
+
+from PyQt5.QtCore import QObject, QTimer, QElapsedTimer, Qt, pyqtSignal
+import numpy as np
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+def inOutSine(t):
+    # 和QEasingCurve.InOutSine一样
+    return (1 - np.cos(pi * t)) / 2
+
+
+class PointAnimator(QObject):
+    """每个点在原点附近随机移动, 到达后再随机选下一个目标
+
+    - xs, ys 当前坐标
+    - step(now) 按时间(毫秒)推进所有点, 帧率不稳定时速度也不变
+    """
+
+    frameChanged = pyqtSignal()
+
+    def __init__(self, originXs, originYs, distance=50, duration=(1000, 2000),
+                 fps=60, *args, **kwargs):
+        super(PointAnimator, self).__init__(*args, **kwargs)
+        self.distance = distance
+        self.duration = duration
+        self.originXs = np.asarray(originXs, np.float64)
+        self.originYs = np.asarray(originYs, np.float64)
+        n = len(self.originXs)
+        self.xs = self.originXs.copy()
+        self.ys = self.originYs.copy()
+        self._startXs = self.xs.copy()
+        self._startYs = self.ys.copy()
+        self._endXs = np.empty(n)
+        self._endYs = np.empty(n)
+        self._startTimes = np.zeros(n)
+        self._durations = np.empty(n)
+        self._random = np.random.default_rng()
+        self._retarget(np.arange(n), 0)
+
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self, timeout=self._onTimeout)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(int(1000 / fps))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def start(self):
+        self._clock.start()
+        self._startTimes[:] = 0
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def isRunning(self):
+        return self._timer.isActive()
+
+    def _onTimeout(self):
+        self.step(self._clock.elapsed())
+        self.frameChanged.emit()
+
+    def _retarget(self, indices, now):
+        # 从当前位置出发, 随机选原点附近的下一个目标
+        count = len(indices)
+        self._startXs[indices] = self.xs[indices]
+        self._startYs[indices] = self.ys[indices]
+        self._endXs[indices] = self.originXs[indices] + \
+            self._random.uniform(-self.distance, self.distance, count)
+        self._endYs[indices] = self.originYs[indices] + \
+            self._random.uniform(-self.distance, self.distance, count)
+        self._startTimes[indices] = now
+        self._durations[indices] = self._random.uniform(*self.duration, count)
+
+    def step(self, now):
+        progress = (now - self._startTimes) / self._durations
+        np.clip(progress, 0, 1, out=progress)
+        value = inOutSine(progress)
+        self.xs = self._startXs + (self._endXs - self._startXs) * value
+        self.ys = self._startYs + (self._endYs - self._startYs) * value
+        finished = np.flatnonzero(progress >= 1)
+        if len(finished):
+            self._retarget(finished, now)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: NeighborGridBenchmark
+@description: 点阵特效中查找最近5个点的耗时, 原来的O(n²)和网格索引对比
+    超过一帧(60fps, 16.7ms)的时间后面标*
+"""
+from random import random, seed
+from time import perf_counter
+
+from Lib.NeighborGrid import NeighborGrid, findClose, np
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class Point:
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def getDistance(p1, p2):
+    return (p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2
+
+
+def findCloseOld(points):
+    """原来的实现"""
+    plen = len(points)
+    for i in range(plen):
+        closest = [None, None, None, None, None]
+        p1 = points[i]
+        for j in range(plen):
+            p2 = points[j]
+            dte1 = getDistance(p1, p2)
+            if p1 != p2:
+                placed = False
+                for k in range(5):
+                    if not placed:
+                        if not closest[k]:
+                            closest[k] = p2
+                            placed = True
+                for k in range(5):
+                    if not placed:
+                        if dte1 < getDistance(p1, closest[k]):
+                            closest[k] = p2
+                            placed = True
+        p1.closest = closest
+
+
+def createPoints(count, width=800, height=600):
+    """和RlatticeEffect.initPoints一样在每个格子里随机放一个点"""
+    seed(count)
+    side = max(int(count ** 0.5), 1)
+    stepX = width / side
+    stepY = height / side
+    return [Point(x * stepX + random() * stepX, y * stepY + random() * stepY)
+            for x in range(side) for y in range(side)]
+
+
+# 60fps时一帧的时间(毫秒)
+FrameBudget = 1000 / 60
+
+
+def best(func, number=5):
+    times = []
+    for _ in range(number):
+        t = perf_counter()
+        func()
+        times.append(perf_counter() - t)
+    return min(times) * 1000
+
+
+if __name__ == '__main__':
+    print('numpy: %s' % ('yes' if np is not None else 'no'))
+    print('%6s %12s %12s %12s %14s %14s' % (
+        'points', 'old', 'findClose', 'build', 'update 1%', 'update 100%'))
+    over = []
+    for count in (100, 500, 1000, 5000, 20000):
+        points = createPoints(count)
+        count = len(points)
+        old = best(lambda: findCloseOld(points), 1) if count <= 1000 else float('nan')
+        new = best(lambda: findClose(points))
+
+        xs = [p.x for p in points]
+        ys = [p.y for p in points]
+        grid = NeighborGrid(5)
+        build = best(lambda: grid.build(xs, ys))
+
+        # 动画中每帧点移动几个像素
+        def move(part):
+            step = max(int(count * part), 1)
+            indices = list(range(0, count, count // step))[:step]
+            return lambda: grid.update(
+                indices, [xs[i] + random() * 4 - 2 for i in indices],
+                [ys[i] + random() * 4 - 2 for i in indices])
+        grid.build(xs, ys)
+        few = best(move(0.01))
+        grid.build(xs, ys)
+        every = best(move(1))
+
+        def show(name, ms, width):
+            if ms > FrameBudget:
+                over.append('%s at %d points (%.1fms)' % (name, count, ms))
+                return ('%.2fms*' % ms).rjust(width)
+            return ('%.2fms' % ms).rjust(width)
+        print('%6d %12s %12s %12s %14s %14s' % (
+            count, '%.2fms' % old, show('findClose', new, 12), show('build', build, 12),
+            show('update 1%', few, 14), show('update 100%', every, 14)))
+    if over:
+        print('* over the %.1fms frame budget: %s' % (FrameBudget, ', '.join(over)))
@@ -7,15 +7,25 @@ Created on 2018年11月22日
 @site: https://pyqt5.com , https://github.com/892768447
 @email: 892768447@qq.com
 @file: RlatticeEffect
-@description: 
+@description:
 """
-from random import random
 from time import time
 
-from PyQt5.QtCore import QPropertyAnimation, QObject, pyqtProperty, QEasingCurve,\
-    Qt, QRectF, pyqtSignal
-from PyQt5.QtGui import QColor, QPainterPath, QPainter
+from PyQt5.QtCore import Qt, QLineF
+from PyQt5.QtGui import QColor, QPainter, QPen, QPolygonF
 from PyQt5.QtWidgets import QWidget
+import numpy as np
+
+# 用网格索引查找最近的5个点, 代替原来O(n²)的pointtool
+from Lib.NeighborGrid import NeighborGrid
+# 一个定时器驱动所有点的动画, 代替每个点两个QPropertyAnimation
+from Lib.PointAnimator import PointAnimator
+
+
+try:
+    from PyQt5.sip import array as sipArray
+except ImportError:
+    sipArray = None
 
 
 __Author__ = """By: Irony
@@ -24,38 +34,30 @@ Email: 892768447@qq.com"""
 __Copyright__ = 'Copyright (c) 2018 Irony'
 __Version__ = 1.0
 
+# 与鼠标距离的平方 -> (连线透明度, 圆透明度)
+AlphaLevels = [(4000, 0.3, 0.6), (20000, 0.1, 0.3), (40000, 0.02, 0.1)]
+# 连线和圆颜色
+Color = QColor(156, 217, 249)
 
-try:
-    from Lib import pointtool  # @UnusedImport @UnresolvedImport
-    getDistance = pointtool.getDistance
-    findClose = pointtool.findClose
-except:
-    import math
-
-    def getDistance(p1, p2):
-        return math.pow(p1.x - p2.x, 2) + math.pow(p1.y - p2.y, 2)
-
-    def findClose(points):
-        plen = len(points)
-        for i in range(plen):
-            closest = [None, None, None, None, None]
-            p1 = points[i]
-            for j in range(plen):
-                p2 = points[j]
-                dte1 = getDistance(p1, p2)
-                if p1 != p2:
-                    placed = False
-                    for k in range(5):
-                        if not placed:
-                            if not closest[k]:
-                                closest[k] = p2
-                                placed = True
-                    for k in range(5):
-                        if not placed:
-                            if dte1 < getDistance(p1, closest[k]):
-                                closest[k] = p2
-                                placed = True
-            p1.closest = closest
+
+def toLines(lines):
+    """(n, 4)的数组转换为drawLines的参数"""
+    if sipArray is None:
+        return [QLineF(*line) for line in lines.tolist()]
+    array = sipArray(QLineF, len(lines))
+    np.frombuffer(memoryview(array).cast('B'), np.float64)[:] = lines.ravel()
+    return array
+
+
+def toPolygonF(xs, ys):
+    # 直接写入QPolygonF的内存, 不逐个创建QPointF
+    polygon = QPolygonF(len(xs))
+    ptr = polygon.data()
+    ptr.setsize(len(xs) * 2 * 8)
+    buffer = np.frombuffer(ptr, np.float64)
+    buffer[0::2] = xs
+    buffer[1::2] = ys
+    return polygon
 
 
 class Target:
@@ -65,76 +67,14 @@ class Target:
         self.y = y
 
 
-class Point(QObject):
-
-    valueChanged = pyqtSignal()
-
-    def __init__(self, x, ox, y, oy, *args, **kwargs):
-        super(Point, self).__init__(*args, **kwargs)
-        self.__x = x
-        self._x = x
-        self.originX = ox
-        self._y = y
-        self.__y = y
-        self.originY = oy
-        # 5个闭合点
-        self.closest = [0, 0, 0, 0, 0]
-        # 圆半径
-        self.radius = 2 + random() * 2
-        # 连线颜色
-        self.lineColor = QColor(156, 217, 249)
-        # 圆颜色
-        self.circleColor = QColor(156, 217, 249)
-
-    def initAnimation(self):
-        # 属性动画
-        if not hasattr(self, 'xanimation'):
-            self.xanimation = QPropertyAnimation(
-                self, b'x', self, valueChanged=self.valueChanged.emit,
-                easingCurve=QEasingCurve.InOutSine)
-            self.yanimation = QPropertyAnimation(
-                self, b'y', self, valueChanged=self.valueChanged.emit,
-                easingCurve=QEasingCurve.InOutSine,
-                finished=self.updateAnimation)
-            self.updateAnimation()
-
-    def updateAnimation(self):
-        self.xanimation.stop()
-        self.yanimation.stop()
-        duration = (1 + random()) * 1000
-        self.xanimation.setDuration(duration)
-        self.yanimation.setDuration(duration)
-        self.xanimation.setStartValue(self.__x)
-        self.xanimation.setEndValue(self.originX - 50 + random() * 100)
-        self.yanimation.setStartValue(self.__y)
-        self.yanimation.setEndValue(self.originY - 50 + random() * 100)
-        self.xanimation.start()
-        self.yanimation.start()
-
-    @pyqtProperty(float)
-    def x(self):
-        return self._x
-
-    @x.setter
-    def x(self, x):
-        self._x = x
-
-    @pyqtProperty(float)
-    def y(self):
-        return self._y
-
-    @y.setter
-    def y(self, y):
-        self._y = y
-
-
 class Window(QWidget):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, columns=20, rows=20, **kwargs):
         super(Window, self).__init__(*args, **kwargs)
         self.setMouseTracking(True)
         self.resize(800, 600)
-        self.points = []
+        self.columns = columns
+        self.rows = rows
         self.target = Target(self.width() / 2, self.height() / 2)
         self.initPoints()
 
@@ -154,67 +94,61 @@ class Window(QWidget):
         self.target.y = event.y()
         self.update()
 
+    def closeEvent(self, event):
+        self.animator.stop()
+        super(Window, self).closeEvent(event)
+
     def initPoints(self):
         t = time()
-        self.points.clear()
-        # 创建点
-        stepX = self.width() / 20
-        stepY = self.height() / 20
-        for x in range(0, self.width(), int(stepX)):
-            for y in range(0, self.height(), int(stepY)):
-                ox = x + random() * stepX
-                oy = y + random() * stepY
-                point = Point(ox, ox, oy, oy)
-                point.valueChanged.connect(self.update)
-                self.points.append(point)
+        # 创建点, 每个格子里随机放一个
+        stepX = self.width() / self.columns
+        stepY = self.height() / self.rows
+        x, y = np.meshgrid(np.arange(self.columns) * stepX, np.arange(self.rows) * stepY)
+        xs = x.ravel() + np.random.random(x.size) * stepX
+        ys = y.ravel() + np.random.random(y.size) * stepY
+        # 圆半径
+        self.radius = np.round((2 + np.random.random(x.size) * 2) * 2) / 2
         print(time() - t)
 
         t = time()
         # 每个点寻找5个闭合点
-        findClose(self.points)
+        self.closest = NeighborGrid(5).build(xs, ys)
         print(time() - t)
 
+        # 所有点的动画, 每帧刷新一次界面
+        self.animator = PointAnimator(xs, ys, parent=self)
+        self.animator.frameChanged.connect(self.update)
+        self.animator.start()
+
     def animate(self, painter):
-        for p in self.points:
-            # 检测点的范围
-            value = abs(getDistance(self.target, p))
-            if value < 4000:
-                # 其实就是修改颜色透明度
-                p.lineColor.setAlphaF(0.3)
-                p.circleColor.setAlphaF(0.6)
-            elif value < 20000:
-                p.lineColor.setAlphaF(0.1)
-                p.circleColor.setAlphaF(0.3)
-            elif value < 40000:
-                p.lineColor.setAlphaF(0.02)
-                p.circleColor.setAlphaF(0.1)
-            else:
-                p.lineColor.setAlphaF(0)
-                p.circleColor.setAlphaF(0)
+        xs = self.animator.xs
+        ys = self.animator.ys
+        # 检测点的范围, 按透明度分组后每组一次画完
+        value = (xs - self.target.x) ** 2 + (ys - self.target.y) ** 2
+        level = np.searchsorted([limit for limit, _, _ in AlphaLevels], value, 'right')
+        color = QColor(Color)
+        for i, (_, lineAlpha, circleAlpha) in enumerate(AlphaLevels):
+            indices = np.flatnonzero(level == i)
+            if not len(indices):
+                continue
 
             # 画线条
-            if p.lineColor.alpha():
-                for pc in p.closest:
-                    if not pc:
-                        continue
-                    path = QPainterPath()
-                    path.moveTo(p.x, p.y)
-                    path.lineTo(pc.x, pc.y)
-                    painter.save()
-                    painter.setPen(p.lineColor)
-                    painter.drawPath(path)
-                    painter.restore()
-
-            # 画圆
-            painter.save()
-            painter.setPen(Qt.NoPen)
-            painter.setBrush(p.circleColor)
-            painter.drawRoundedRect(QRectF(
-                p.x - p.radius, p.y - p.radius, 2 * p.radius, 2 * p.radius), p.radius, p.radius)
-            painter.restore()
-
-            # 开启动画
-            p.initAnimation()
+            closest = self.closest[indices]
+            valid = closest >= 0
+            starts = np.repeat(indices, closest.shape[1])[valid.ravel()]
+            ends = closest[valid]
+            color.setAlphaF(lineAlpha)
+            painter.setPen(color)
+            painter.drawLines(toLines(np.stack(
+                [xs[starts], ys[starts], xs[ends], ys[ends]], 1)))
+
+            # 画圆, 用圆头的粗画笔画点, 相同半径的一次画完
+            color.setAlphaF(circleAlpha)
+            radius = self.radius[indices]
+            for r in np.unique(radius):
+                same = indices[radius == r]
+                painter.setPen(QPen(color, 2 * r, Qt.SolidLine, Qt.RoundCap))
+                painter.drawPoints(toPolygonF(xs[same], ys[same]))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: RlatticeEffectBenchmark
+@description: 点阵特效1000/5000/20000个点时每帧的耗时
+    原来每个点两个QPropertyAnimation, 现在一个PointAnimator
+"""
+from random import random
+import sys
+from time import perf_counter, process_time
+
+from PyQt5.QtCore import QObject, QPropertyAnimation, QVariantAnimation,\
+    QEasingCurve, QEvent, QEventLoop, QTimer, pyqtProperty, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from RlatticeEffect import Window
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class OldPoint(QObject):
+    """原来的做法: 每个点两个属性动画, 每次变化都发送信号(触发update)"""
+
+    valueChanged = pyqtSignal()
+
+    def __init__(self, x, y, *args, **kwargs):
+        super(OldPoint, self).__init__(*args, **kwargs)
+        self._x = self.originX = x
+        self._y = self.originY = y
+        self.xanimation = QPropertyAnimation(
+            self, b'x', self, valueChanged=self.valueChanged.emit,
+            easingCurve=QEasingCurve.InOutSine)
+        self.yanimation = QPropertyAnimation(
+            self, b'y', self, valueChanged=self.valueChanged.emit,
+            easingCurve=QEasingCurve.InOutSine,
+            finished=self.updateAnimation)
+        self.updateAnimation()
+
+    def updateAnimation(self):
+        duration = int((1 + random()) * 1000)
+        for animation, value, origin in ((self.xanimation, self._x, self.originX),
+                                         (self.yanimation, self._y, self.originY)):
+            animation.stop()
+            animation.setDuration(duration)
+            animation.setStartValue(value)
+            animation.setEndValue(origin - 50 + random() * 100)
+            animation.start()
+
+    @pyqtProperty(float)
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, x):
+        self._x = x
+
+    @pyqtProperty(float)
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, y):
+        self._y = y
+
+
+def runFor(app, seconds):
+    """运行事件循环(空闲时不占CPU), 返回(墙上时间, cpu时间)"""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    wall = perf_counter()
+    cpu = process_time()
+    loop.exec_()
+    return perf_counter() - wall, process_time() - cpu
+
+
+def oldDriver(app, count, seconds=1.0):
+    signals = [0]
+
+    def onValueChanged():
+        signals[0] += 1
+    points = []
+    for _ in range(count):
+        point = OldPoint(random() * 800, random() * 600)
+        point.valueChanged.connect(onValueChanged)
+        points.append(point)
+    # 统计动画的帧数
+    frames = [0]
+    clock = QVariantAnimation(startValue=0.0, endValue=1.0, duration=100000)
+    clock.valueChanged.connect(lambda _: frames.__setitem__(0, frames[0] + 1))
+    clock.start()
+    _, cpu = runFor(app, seconds)
+    clock.stop()
+    for point in points:
+        point.xanimation.stop()
+        point.yanimation.stop()
+        point.deleteLater()
+    # 立即删除, 不影响后面的测试
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    frames = max(frames[0], 1)
+    return cpu / frames * 1000, signals[0] / frames
+
+
+def newFrame(app, count, seconds=1.0):
+    side = int(count ** 0.5)
+    window = Window(columns=side, rows=side)
+    window.animator.stop()
+    frames = [0]
+    window.animator.frameChanged.connect(lambda: frames.__setitem__(0, frames[0] + 1))
+    # 只测动画驱动
+    window.animator.start()
+    _, cpu = runFor(app, seconds)
+    window.animator.stop()
+    frames = max(frames[0], 1)
+    drive = cpu / frames * 1000
+
+    # 驱动+绘制
+    image = QImage(window.size(), QImage.Format_ARGB32_Premultiplied)
+    number = 30
+    t = perf_counter()
+    for i in range(number):
+        window.animator.step(i * 16)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        image.fill(0)
+        window.animate(painter)
+        painter.end()
+    paint = (perf_counter() - t) / number * 1000
+    window.deleteLater()
+    return drive, paint
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    print('%6s %18s %16s %18s %18s' % (
+        'points', 'old drive/frame', 'old signals', 'new drive/frame', 'new step+paint'))
+    for count in (1000, 5000, 20000):
+        oldTime, oldSignals = oldDriver(app, count)
+        newTime, paintTime = newFrame(app, count)
+        print('%6d %16.2fms %16d %16.2fms %16.2fms' % (
+            count, oldTime, oldSignals, newTime, paintTime))
@@ -9,9 +9,12 @@ Created on 2018年5月15日
 @file: SqlQuery
 @description: 
 """
-from PyQt5.QtCore import pyqtSlot
-from PyQt5.QtWidgets import QWidget, QMessageBox, QTableWidgetItem
+from PyQt5.QtCore import Qt, QObject, QThread, QAbstractTableModel, QModelIndex,\
+    pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QWidget, QMessageBox, QTableView
 from sqlalchemy.engine import create_engine
+from sqlalchemy.engine.reflection import Inspector
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative.api import declarative_base
 from sqlalchemy.orm.session import sessionmaker
 from sqlalchemy.sql.expression import and_
@@ -28,7 +31,7 @@ __Copyright__ = "Copyright (c) 2018 Irony"
 __Version__ = "Version 1.0"
 
 # engine = create_engine('mysql+mysqldb://root@localhost:3306/tourist?charset=utf8')
-engine = create_engine('sqlite:///Data/data.sqlite3', echo=True)  # echo 表示开启命令显示
+engine = create_engine('sqlite:///Data/data.sqlite3', echo=False)  # echo 表示开启命令显示
 Base = declarative_base()
 
 
@@ -36,18 +39,169 @@ class Tourist(Base):
 
     __tablename__ = 'tourist'
 
+    # 查询条件用到的字段(index=True)建立索引
     id = Column(Integer, primary_key=True)
-    name = Column(Text)
-    license = Column(Text)
+    name = Column(Text, index=True)
+    license = Column(Text, index=True)
     flightnumber = Column(Text)
     flightdate = Column(Text)
-    seatnumber = Column(Text)
-    boardingport = Column(Text)
+    seatnumber = Column(Text, index=True)
+    boardingport = Column(Text, index=True)
     no = Column(Text)
     departurestation = Column(Text)
     destinationstation = Column(Text)
 
 
+def createIndexes(engine):
+    """创建查询条件字段的索引(已存在的跳过)"""
+    exists = set(index['name'] for index in Inspector.from_engine(engine).get_indexes(Tourist.__tablename__))
+    for index in Tourist.__table__.indexes:
+        if index.name not in exists:
+            index.create(engine)
+
+
+class QueryWorker(QObject):
+    """在单独的线程中分页查询, 使用自己的session"""
+
+    # 查询序号, 这一页的数据, 是否已经没有更多数据
+    pageReady = pyqtSignal(int, object, bool)
+    # 查询序号, 错误信息
+    error = pyqtSignal(int, str)
+
+    def __init__(self, engine, *args, **kwargs):
+        super(QueryWorker, self).__init__(*args, **kwargs)
+        self.engine = engine
+        self.session = None
+        # 最新的查询序号, 由界面线程修改, 旧的请求直接丢弃
+        self.generation = 0
+
+    @pyqtSlot(int, object, int, int)
+    def fetch(self, generation, filters, lastId, limit):
+        if generation != self.generation:
+            return
+        if self.session is None:
+            self.session = sessionmaker(bind=self.engine)()
+        # 按id翻页(WHERE id > lastId), 不用OFFSET, 后面的页也一样快
+        conditions = [getattr(Tourist, name) == value for name, value in filters]
+        conditions.append(Tourist.id > lastId)
+        try:
+            rows = self.session.query(*TouristModel.Columns).filter(
+                and_(*conditions)).order_by(Tourist.id).limit(limit).all()
+            rows = [tuple(row) for row in rows]
+        except SQLAlchemyError as e:
+            # 数据库被锁定, 连接断开等, 通知界面停止加载
+            self.error.emit(generation, str(e))
+            return
+        finally:
+            # 释放连接, 不长时间占用读事务
+            self.session.close()
+        self.pageReady.emit(generation, rows, len(rows) < limit)
+
+
+class TouristModel(QAbstractTableModel):
+    """分页加载查询结果, 滚动到底部时通过fetchMore加载下一页"""
+
+    Columns = [Tourist.id, Tourist.name, Tourist.license, Tourist.flightnumber,
+               Tourist.flightdate, Tourist.seatnumber, Tourist.boardingport,
+               Tourist.no, Tourist.departurestation, Tourist.destinationstation]
+    Headers = ['number', 'name', 'document number', 'flight number', 'flight date',
+               'seat number', 'departure', 'serial number', 'departure place', 'destination']
+
+    # 内部信号, 发送给线程中的QueryWorker
+    requestPage = pyqtSignal(int, object, int, int)
+    # 第一页加载完成, 参数为行数
+    firstPageLoaded = pyqtSignal(int)
+    # 查询出错, 参数为错误信息
+    queryFailed = pyqtSignal(str)
+
+    def __init__(self, engine, firstPageSize=100, pageSize=1000, *args, **kwargs):
+        super(TouristModel, self).__init__(*args, **kwargs)
+        self.firstPageSize = firstPageSize
+        self.pageSize = pageSize
+        self._rows = []
+        self._filters = []
+        self._generation = 0
+        self._fetching = False
+        self._finished = True
+
+        self._thread = QThread(self)
+        self._worker = QueryWorker(engine)
+        self._worker.moveToThread(self._thread)
+        self._thread.finished.connect(self._worker.deleteLater)
+        self.requestPage.connect(self._worker.fetch)
+        self._worker.pageReady.connect(self._onPageReady)
+        self._worker.error.connect(self._onError)
+        self._thread.start()
+
+    def query(self, filters):
+        """filters: [(字段名, 值), ...]"""
+        self.beginResetModel()
+        self._rows = []
+        self._filters = list(filters)
+        self._generation += 1
+        # 上一次查询还没返回或者出错了, 不影响新的查询
+        self._fetching = False
+        self._finished = False
+        self.endResetModel()
+        self._worker.generation = self._generation
+        self._request(self.firstPageSize)
+
+    def stop(self):
+        self._worker.generation = -1
+        self._thread.quit()
+        self._thread.wait()
+
+    def _request(self, limit):
+        self._fetching = True
+        lastId = self._rows[-1][0] if self._rows else -1
+        self.requestPage.emit(self._generation, self._filters, lastId, limit)
+
+    def _onPageReady(self, generation, rows, finished):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        self._finished = finished
+        first = not self._rows
+        if rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        if first:
+            self.firstPageLoaded.emit(len(self._rows))
+
+    def _onError(self, generation, message):
+        if generation != self._generation:
+            return
+        # 停止加载这次查询的后续页, 重新查询时再开始
+        self._fetching = False
+        self._finished = True
+        self.queryFailed.emit(message)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._finished and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request(self.pageSize)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.Columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return str(self._rows[index.row()][index.column()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.Headers[section]
+        return super(TouristModel, self).headerData(section, orientation, role)
+
+
 class Window(QWidget, Ui_Form):
 
     def __init__(self, *args, **kwargs):
@@ -55,8 +209,19 @@ class Window(QWidget, Ui_Form):
         self.setupUi(self)
         # Splicing field of sql
         self.sql = {}
-        # Database linkage
-        self.session = sessionmaker(bind=engine)()
+        # 用QTableView+分页的model代替QTableWidget
+        self.model = TouristModel(engine, parent=self)
+        self.model.firstPageLoaded.connect(self.onFirstPageLoaded)
+        self.model.queryFailed.connect(self.onQueryFailed)
+        self.tableView = QTableView(self)
+        self.tableView.setModel(self.model)
+        self.tableView.verticalHeader().setDefaultSectionSize(24)
+        self.gridLayout.replaceWidget(self.tableWidget, self.tableView)
+        self.tableWidget.deleteLater()
+
+    def closeEvent(self, event):
+        self.model.stop()
+        super(Window, self).closeEvent(event)
 
     @pyqtSlot()
     def on_pushButtonQuery_clicked(self):
@@ -67,37 +232,15 @@ class Window(QWidget, Ui_Form):
         self.applyPort()
         if not self.sql:
             return QMessageBox.warning(self, 'Prompt', 'No input is made')
-        # Clear data
-        self.tableWidget.clear()
-        # Reset the header
-        self.tableWidget.setHorizontalHeaderLabels(
-            ['number', 'name', 'document number', 'flight number', 'flight date', 'seat number', 'departure', 'serial number', 'departure place', 'destination'])
-        # Parallel query based on selected fields
-        rets = self.session.query(Tourist).filter(
-            and_(*(key == value for key, value in self.sql.items()))).all()
-        if not rets:
-            return QMessageBox.information(self, 'Prompt', 'Not found results')
-        self.tableWidget.setRowCount(len(rets))
-        # Add to the table based on the results of the query
-        for row, tourist in enumerate(rets):
-            self.tableWidget.setItem(row, 0, QTableWidgetItem(str(tourist.id)))
-            self.tableWidget.setItem(
-                row, 1, QTableWidgetItem(str(tourist.name)))
-            self.tableWidget.setItem(
-                row, 2, QTableWidgetItem(str(tourist.license)))
-            self.tableWidget.setItem(
-                row, 3, QTableWidgetItem(str(tourist.flightnumber)))
-            self.tableWidget.setItem(
-                row, 4, QTableWidgetItem(str(tourist.flightdate)))
-            self.tableWidget.setItem(
-                row, 5, QTableWidgetItem(str(tourist.seatnumber)))
-            self.tableWidget.setItem(
-                row, 6, QTableWidgetItem(str(tourist.boardingport)))
-            self.tableWidget.setItem(row, 7, QTableWidgetItem(str(tourist.no)))
-            self.tableWidget.setItem(
-                row, 8, QTableWidgetItem(str(tourist.departurestation)))
-            self.tableWidget.setItem(
-                row, 9, QTableWidgetItem(str(tourist.destinationstation)))
+        # Parallel query based on selected fields, in background thread
+        self.model.query([(key.key, value) for key, value in self.sql.items()])
+
+    def onFirstPageLoaded(self, count):
+        if not count:
+            QMessageBox.information(self, 'Prompt', 'Not found results')
+
+    def onQueryFailed(self, message):
+        QMessageBox.warning(self, 'Prompt', 'Query failed: %s' % message)
 
     def applyName(self):
         """Name"""
@@ -146,6 +289,7 @@ if __name__ == '__main__':
     sys.excepthook = cgitb.Hook(1, None, 5, sys.stderr, 'text')
     from PyQt5.QtWidgets import QApplication
     app = QApplication(sys.argv)
+    createIndexes(engine)
     w = Window()
     w.show()
     sys.exit(app.exec_())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: SqlQueryBenchmark
+@description: 100万行数据时, 一次性查询+QTableWidgetItem 和 后台分页model 显示第一屏的耗时
+"""
+import os
+from random import randint, choice, seed
+import sqlite3
+import sys
+import tempfile
+from time import perf_counter
+
+from PyQt5.QtWidgets import QApplication, QTableView, QTableWidget,\
+    QTableWidgetItem
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.sql.expression import and_
+
+from SqlQuery import Tourist, TouristModel, createIndexes
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = "Copyright (c) 2018 Irony"
+__Version__ = "Version 1.0"
+
+
+def createDatabase(path, count=1000000):
+    """用sqlite3批量生成测试数据, 登机口只有20个, 所以每个登机口约5万行"""
+    seed(count)
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE IF NOT EXISTS "tourist" (
+"id"  INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+"name"  TEXT, "license"  TEXT, "flightnumber"  TEXT, "flightdate"  TEXT,
+"seatnumber"  TEXT, "boardingport"  INTEGER, "no"  INTEGER,
+"departurestation"  TEXT, "destinationstation"  TEXT)''')
+    cities = ['Beijing', 'Shanghai', 'Guangzhou', 'Shenzhen', 'Chengdu', 'Wuhan']
+    conn.executemany('INSERT INTO tourist VALUES (NULL,?,?,?,?,?,?,?,?,?)', (
+        ('name%d' % i, '%018d' % i, 'CA%04d' % randint(1, 2000),
+         '2018-05-%02d' % randint(1, 31), '%d%s' % (randint(1, 60), choice('ABCDEF')),
+         'A%d' % randint(1, 20), i, choice(cities), choice(cities))
+        for i in range(count)))
+    conn.commit()
+    conn.close()
+
+
+def oldQuery(engine, filters):
+    """原来的方式: all()后给每一行创建10个QTableWidgetItem"""
+    session = sessionmaker(bind=engine)()
+    t = perf_counter()
+    rets = session.query(Tourist).filter(
+        and_(*(getattr(Tourist, key) == value for key, value in filters))).all()
+    table = QTableWidget()
+    table.setColumnCount(10)
+    table.setRowCount(len(rets))
+    for row, tourist in enumerate(rets):
+        for column, value in enumerate((
+                tourist.id, tourist.name, tourist.license, tourist.flightnumber,
+                tourist.flightdate, tourist.seatnumber, tourist.boardingport,
+                tourist.no, tourist.departurestation, tourist.destinationstation)):
+            table.setItem(row, column, QTableWidgetItem(str(value)))
+    table.show()
+    QApplication.processEvents()
+    t = perf_counter() - t
+    table.close()
+    session.close()
+    return t, len(rets)
+
+
+def newQuery(model, view, filters):
+    """分页model: 从发起查询到第一页显示出来"""
+    loaded = []
+    model.firstPageLoaded.connect(loaded.append)
+    t = perf_counter()
+    model.query(filters)
+    while not loaded:
+        QApplication.processEvents()
+    view.viewport().repaint()
+    t = perf_counter() - t
+    model.firstPageLoaded.disconnect(loaded.append)
+    return t
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    path = os.path.join(tempfile.gettempdir(), 'tourist_benchmark.sqlite3')
+    if not os.path.isfile(path):
+        t = perf_counter()
+        createDatabase(path)
+        print('create 1000000 rows: %.2fs' % (perf_counter() - t))
+    engine = create_engine('sqlite:///' + path)
+
+    model = TouristModel(engine)
+    view = QTableView()
+    view.setModel(model)
+    view.resize(800, 600)
+    view.show()
+
+    for title, filters in (('port A7 (~50000 rows)', [('boardingport', 'A7')]),
+                           ('name (1 row)', [('name', 'name654321')])):
+        for index in Tourist.__table__.indexes:
+            engine.execute('DROP INDEX IF EXISTS %s' % index.name)
+        noIndex = newQuery(model, view, filters)
+        createIndexes(engine)
+        t1, count = oldQuery(engine, filters)
+        t2 = newQuery(model, view, filters)
+        print('%-22s rows: %6d  all()+items: %9.2fms  paged model: %7.2fms  '
+              '(no index: %7.2fms)' % (title, count, t1 * 1000, t2 * 1000, noIndex * 1000))
+
+    # 滚动到底部时加载后面的页
+    t = perf_counter()
+    model.query([('boardingport', 'A7')])
+    while model.rowCount() < 20000:
+        view.scrollToBottom()
+        QApplication.processEvents()
+    print('scroll to 20000 rows: %.2fms' % ((perf_counter() - t) * 1000))
+    model.stop()
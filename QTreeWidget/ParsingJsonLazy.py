@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ParsingJsonLazy
+@description: 通过json数据生成树形结构(延迟加载版)
+    后台线程边读边解析, 子节点展开时才创建, 标签由delegate绘制
+"""
+import codecs
+import json
+import webbrowser
+
+from PyQt5.QtCore import Qt, QThread, QAbstractItemModel, QModelIndex,\
+    QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QIcon, QColor, QPainter
+from PyQt5.QtWidgets import QTreeView, QStyledItemDelegate, QStyle,\
+    QStyleOptionViewItem, QMessageBox
+import chardet
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = "Copyright (c) 2018 Irony"
+__Version__ = "Version 1.0"
+
+BadgeRole = Qt.UserRole + 1     # 后面带颜色的标签 [文字, 颜色]
+UrlRole = Qt.UserRole + 2       # 网址
+
+# 每次展开最多创建的子节点数量
+FetchSize = 200
+
+
+class JsonLoader(QThread):
+    """在线程中分块读取文件, 逐个解析最外层数组中的元素并分批发送
+    """
+
+    # 用object传递, 避免list被转换成QVariantList(嵌套数据很慢)
+    nodesParsed = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, path, chunkSize=64 * 1024, batchSize=200, *args, **kwargs):
+        super(JsonLoader, self).__init__(*args, **kwargs)
+        self.path = path
+        self.chunkSize = chunkSize
+        self.batchSize = batchSize
+
+    def run(self):
+        try:
+            self.parse()
+        except (OSError, ValueError) as e:
+            self.error.emit(str(e))
+
+    def parse(self):
+        decoder = json.JSONDecoder()
+        with open(self.path, 'rb') as fp:
+            data = fp.read(self.chunkSize)
+            # 只用开头的数据检测编码
+            encoding = chardet.detect(data).get('encoding') or 'utf-8'
+            if encoding == 'ascii':
+                encoding = 'utf-8'
+            textDecoder = codecs.getincrementaldecoder(encoding)()
+            text = textDecoder.decode(data).lstrip('﻿').lstrip()
+            eof = not data
+            if not text.startswith('['):
+                raise ValueError('json data must be a list')
+            pos = 1
+            # text[0]在文件中的字符位置, 用于错误信息
+            base = 0
+            batch = []
+            while not self.isInterruptionRequested():
+                # 跳过空白和逗号
+                while pos < len(text) and text[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(text) and text[pos] == ']':
+                    break
+                try:
+                    node, end = decoder.raw_decode(text, pos)
+                except json.JSONDecodeError as e:
+                    if eof or not self.incomplete(e, text):
+                        raise ValueError('%s: char %d' % (e.msg, base + e.pos))
+                    # 数据不完整, 至少读入和未解析部分一样多的数据再重试,
+                    # 大元素的重复解析总量不超过它自身长度的两倍
+                    base += pos
+                    parts = [text[pos:]]
+                    need = max(self.chunkSize, len(parts[0]))
+                    while need > 0 and not eof:
+                        data = fp.read(max(self.chunkSize, need))
+                        eof = not data
+                        parts.append(textDecoder.decode(data, final=eof))
+                        need -= len(data)
+                    text = ''.join(parts)
+                    pos = 0
+                    continue
+                if not isinstance(node, dict):
+                    raise ValueError('list element must be an object: char %d' % (base + pos))
+                pos = end
+                batch.append(node)
+                if len(batch) >= self.batchSize:
+                    self.nodesParsed.emit(batch)
+                    batch = []
+            if batch:
+                self.nodesParsed.emit(batch)
+
+    @staticmethod
+    def incomplete(error, text):
+        """解析错误是否因为数据还没有读完(出错位置在缓冲区末尾)"""
+        return error.pos >= len(text) - 6 or \
+            error.msg.startswith('Unterminated string')
+
+
+class JsonNode:
+
+    __slots__ = ('parent', 'row', 'name', 'icon', 'badge', 'url', 'items', 'children')
+
+    def __init__(self, parent, row, data):
+        self.parent = parent
+        self.row = row
+        self.name = data.get('name', '')
+        self.icon = data.get('icon', '')
+        self.badge = data.get('badge', [])
+        self.url = data.get('url', '')
+        # 有网址时跳过子节点
+        self.items = [] if self.url else (data.get('items', []) or [])
+        self.children = []
+
+
+class JsonTreeModel(QAbstractItemModel):
+
+    def __init__(self, *args, **kwargs):
+        super(JsonTreeModel, self).__init__(*args, **kwargs)
+        self._root = JsonNode(None, 0, {})
+        self._icons = {}
+
+    def appendNodes(self, datas):
+        """添加最外层的节点"""
+        root = self._root
+        start = len(root.children)
+        self.beginInsertRows(QModelIndex(), start, start + len(datas) - 1)
+        root.children.extend(JsonNode(root, row, data)
+                             for row, data in enumerate(datas, start))
+        self.endInsertRows()
+
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if column != 0 or row < 0 or row >= len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self.node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        return bool(node.children or node.items)
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return len(node.children) < len(node.items)
+
+    def fetchMore(self, parent):
+        # 展开时才创建子节点
+        node = self.node(parent)
+        start = len(node.children)
+        end = min(start + FetchSize, len(node.items))
+        if end <= start:
+            return
+        self.beginInsertRows(parent, start, end - 1)
+        node.children.extend(JsonNode(node, row, node.items[row])
+                             for row in range(start, end))
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return node.name
+        if role == Qt.DecorationRole:
+            if node.icon not in self._icons:
+                self._icons[node.icon] = QIcon(node.icon)
+            return self._icons[node.icon]
+        if role == BadgeRole:
+            return node.badge
+        if role == UrlRole:
+            return node.url
+        return None
+
+
+class BadgeDelegate(QStyledItemDelegate):
+    """绘制白色文字和后面带颜色的标签, 代替每个节点一个ItemWidget"""
+
+    BadgeSize = QSize(80, 38)
+    Spacing = 60
+
+    def sizeHint(self, option, index):
+        size = super(BadgeDelegate, self).sizeHint(option, index)
+        return QSize(size.width() + self.Spacing + self.BadgeSize.width(),
+                     max(size.height(), self.BadgeSize.height()))
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ''
+        style = opt.widget.style() if opt.widget else None
+        if style:
+            style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+            rect = style.subElementRect(QStyle.SE_ItemViewItemText, opt, opt.widget)
+        else:
+            rect = opt.rect
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.white)
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, text)
+        badge = index.data(BadgeRole)
+        if badge and len(badge) == 2:
+            badgeRect = QRect(
+                rect.x() + opt.fontMetrics.width(text) + self.Spacing,
+                rect.center().y() - self.BadgeSize.height() // 2,
+                self.BadgeSize.width(), self.BadgeSize.height())
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(badge[1]))
+            painter.drawRoundedRect(badgeRect, 4, 4)
+            painter.setPen(Qt.white)
+            painter.drawText(badgeRect, Qt.AlignCenter, badge[0])
+        painter.restore()
+
+
+class JsonTreeView(QTreeView):
+
+    def __init__(self, *args, **kwargs):
+        super(JsonTreeView, self).__init__(*args, **kwargs)
+        self.setEditTriggers(self.NoEditTriggers)
+        self.header().setVisible(False)
+        self.setUniformRowHeights(True)
+        self._model = JsonTreeModel(self)
+        self.setModel(self._model)
+        self.setItemDelegate(BadgeDelegate(self))
+        self._loader = None
+        # 帮点单击事件
+        self.clicked.connect(self.onItemClicked)
+
+    def onItemClicked(self, index):
+        """item单击事件"""
+        url = index.data(UrlRole)
+        if url:  # 调用浏览器打开网址
+            webbrowser.open_new_tab(url)
+
+    def onLoadError(self, message):
+        QMessageBox.warning(self, '加载失败', message)
+
+    def loadData(self, path):
+        """在后台线程中加载json数据"""
+        self._loader = JsonLoader(path, parent=self)
+        self._loader.nodesParsed.connect(self._model.appendNodes)
+        self._loader.error.connect(self.onLoadError)
+        self._loader.start()
+
+    def closeEvent(self, event):
+        if self._loader:
+            self._loader.requestInterruption()
+            self._loader.wait()
+        super(JsonTreeView, self).closeEvent(event)
+
+
+if __name__ == '__main__':
+    import sys
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+    app.setStyleSheet("""QTreeView {
+    outline: 0px;
+    background: rgb(47, 64, 78);
+}
+QTreeView::item {
+    min-height: 92px;
+}
+QTreeView::item:hover {
+    background: rgb(41, 56, 71);
+}
+QTreeView::item:selected {
+    background: rgb(41, 56, 71);
+}
+    """)
+    w = JsonTreeView()
+    w.show()
+    w.loadData('Data/data.json')
+    sys.exit(app.exec_())
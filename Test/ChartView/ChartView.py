@@ -13,13 +13,24 @@ import json
 import os
 
 from PyQt5.QtChart import QChart, QChartView, QLineSeries, QCategoryAxis
-from PyQt5.QtCore import QMargins, Qt, QEasingCurve
-from PyQt5.QtGui import QColor, QBrush, QFont, QPainter, QPen, QPixmap
+from PyQt5.QtCore import QMargins, Qt, QEasingCurve, QPointF
+from PyQt5.QtGui import QColor, QBrush, QFont, QPainter, QPen, QPixmap,\
+    QPolygonF
 import chardet
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 __version__ = "0.0.1"
 
+# 编码检测只取文件开头的一部分
+EncodingSampleSize = 64 * 1024
+# 超过该数量的点按桶只保留最小最大值后再添加到series中
+DecimateBuckets = 4096
+
 # QEasingCurve 类型枚举
 EasingCurve = dict(
     [(c, getattr(QEasingCurve, n)) for n, c in QEasingCurve.__dict__.items()
@@ -38,6 +49,7 @@ class ChartView(QChartView):
 
     def __init__(self, file, parent=None):
         super(ChartView, self).__init__(parent)
+        self._values = []   # [(series, y值数组)] 鼠标移动时按x索引查找
         self._chart = QChart()
         self._chart.setAcceptHoverEvents(True)
         self.setChart(self._chart)
@@ -50,11 +62,22 @@ class ChartView(QChartView):
             if not os.path.isfile(file):
                 return self.__analysis(json.loads(file))
             with open(file, "rb") as fp:
-                data = fp.read()
-                encoding = chardet.detect(data) or {}
-                data = data.decode(encoding.get("encoding") or "utf-8")
+                data = self.__decode(fp.read())
             self.__analysis(json.loads(data))
 
+    def __decode(self, data):
+        encoding = chardet.detect(data[:EncodingSampleSize]) or {}
+        encoding = encoding.get("encoding") or "utf-8"
+        if encoding == "ascii":
+            # 开头全是ascii字符, 后面可能有中文
+            encoding = "utf-8"
+        try:
+            return data.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            # 开头的样本判断错误时再检测整个文件
+            encoding = chardet.detect(data) or {}
+            return data.decode(encoding.get("encoding") or "utf-8")
+
 #     def onSeriesHoverd(self, point, state):
 #         print(point, state)
 
@@ -70,8 +93,10 @@ class ChartView(QChartView):
         index = round(x)  # 四舍五入
         print(x, y, index)
         # 得到在坐标系中的所有series的类型和点
-        points = [(s.type(), s.at(index))
-                  for s in self._chart.series() if min_x <= x <= max_x and min_y <= y <= max_y]
+        points = []
+        if min_x <= x <= max_x and min_y <= y <= max_y:
+            points = [(s.type(), QPointF(index, values[index]))
+                      for s, values in self._values if 0 <= index < len(values)]
         print(points)
 
     def __getColor(self, color=None, default=Qt.white):
@@ -219,12 +244,52 @@ class ChartView(QChartView):
             return None
         # 设置series名字
         _series.setName(serie.get("name", "") or "")
-        # 添加数据到series中
-        for index, value in enumerate(data):
-            # 保证vlaue必须是数字
-            _series.append(index, value if type(value) in (int, float) else 0)
+        # 保证vlaue必须是数字
+        values = [value if type(value) in (int, float) else 0 for value in data]
+        if np is not None:
+            # 一次性添加数据到series中
+            values = np.array(values, dtype=np.float64)
+            _series.replace(self.__getPolygon(*self.__decimate(values)))
+        else:
+            # 添加数据到series中
+            for index, value in enumerate(values):
+                _series.append(index, value)
+        self._values.append((_series, values))
         return _series
 
+    def __decimate(self, values):
+        '''
+        :param values: y值数组, x为索引
+        数据量很大时分成DecimateBuckets个桶, 每个桶只保留最小和最大值(按原顺序)
+        这样绘制出来的形状和y轴范围不变, 鼠标所在点的值从self._values中获取
+        '''
+        count = len(values)
+        xs = np.arange(count, dtype=np.float64)
+        if count <= DecimateBuckets * 2:
+            return xs, values
+        size = count // DecimateBuckets
+        head = size * DecimateBuckets
+        bucket = values[:head].reshape(DecimateBuckets, size)
+        imin = bucket.argmin(1)
+        imax = bucket.argmax(1)
+        offset = np.arange(DecimateBuckets) * size
+        index = np.empty(DecimateBuckets * 2, dtype=np.int64)
+        index[0::2] = np.minimum(imin, imax) + offset
+        index[1::2] = np.maximum(imin, imax) + offset
+        # 保留首尾的点和最后不足一个桶的点
+        index = np.concatenate(([0], index, np.arange(head, count), [count - 1]))
+        return xs[index], values[index]
+
+    def __getPolygon(self, xs, ys):
+        # 直接写入QPolygonF的内存
+        polygon = QPolygonF(len(xs))
+        ptr = polygon.data()
+        ptr.setsize(len(xs) * 2 * 8)
+        buffer = np.frombuffer(ptr, np.float64)
+        buffer[0::2] = xs
+        buffer[1::2] = ys
+        return polygon
+
     def __setSeries(self, series=None):
         if not series or not isinstance(series, list):
             return
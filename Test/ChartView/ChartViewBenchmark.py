@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: http://alyl.vip, http://orzorz.vip, http://coding.net/u/892768447, http://github.com/892768447
+@email: 892768447@qq.com
+@file: ChartViewBenchmark
+@description: 对比10k/100k/1M个点时逐个append和一次性replace加载json图表的耗时
+'''
+import json
+import os
+import sys
+import tempfile
+from random import random
+from time import perf_counter
+
+from PyQt5.QtChart import QChart, QChartView, QLineSeries
+from PyQt5.QtWidgets import QApplication
+import chardet
+
+from ChartView import ChartView  # @UnresolvedImport
+
+
+__version__ = "0.0.1"
+
+
+def makeFile(count):
+    datas = {
+        "title": {"text": "折线图 %d" % count},
+        "series": [{"type": "line", "name": "数据", "data": [
+            round(random() * 100, 2) for _ in range(count)]}],
+    }
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(json.dumps(datas, ensure_ascii=False).encode("utf-8"))
+    return path
+
+
+def oldLoad(path):
+    # 原来的方式: 整个文件检测编码, 逐个append
+    with open(path, "rb") as fp:
+        data = fp.read()
+        encoding = chardet.detect(data) or {}
+        data = data.decode(encoding.get("encoding") or "utf-8")
+    datas = json.loads(data)
+    chart = QChart()
+    view = QChartView(chart)
+    series = QLineSeries(chart)
+    for index, value in enumerate(datas["series"][0]["data"]):
+        series.append(index, value if type(value) in (int, float) else 0)
+    chart.addSeries(series)
+    chart.createDefaultAxes()
+    return view
+
+
+def measure(app, func, path):
+    t = perf_counter()
+    view = func(path)
+    view.show()
+    app.processEvents()
+    t = perf_counter() - t
+    view.close()
+    view.deleteLater()
+    return t
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    for count in (10000, 100000, 1000000):
+        path = makeFile(count)
+        old = measure(app, oldLoad, path)
+        new = measure(app, ChartView, path)
+        os.remove(path)
+        print("%8d points  append: %.2fs  replace: %.2fs  x%.1f" % (
+            count, old, new, old / max(new, 1e-9)))
@@ -1,4 +1,5 @@
 #%%cython
+from cython cimport floating
 import numpy as np
 cimport numpy as np
 np.import_array()
@@ -7,9 +8,14 @@ np.import_array()
 # 参考https://www.zhihu.com/question/23003213
 
 cdef extern from "CalSpecSpeaLib.h":
+    # 纯C++计算, 不使用Python对象, 可以释放GIL
+    void cal_spec_accel_strided(const double acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis) except + nogil
+    void cal_spec_accel_strided(const float acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis) except + nogil
     void cal_spec_accel(double acc[], int len, double dt, double maxPeriod, double periodStep, double dampRatio, double *Period, double *Fre, double *MAcc, double *MVel, double *MDis, int numt)
 
 def calspecaccel(np.ndarray[double, ndim=1, mode="c"] acc, int length, double dt, double maxPeriod, double periodStep, double dampRatio):
+    if not 0 <= dampRatio < 1:
+        raise ValueError('阻尼比应该在[0, 1)之间: %r' % dampRatio)
     cdef int numt = int(maxPeriod / periodStep) + 1
     # 初始化各存储数据
     cdef np.ndarray[double, ndim=1] Fre = np.zeros(numt, float)
@@ -24,4 +30,46 @@ def calspecaccel(np.ndarray[double, ndim=1, mode="c"] acc, int length, double dt
         <double*> np.PyArray_DATA(Period), <double*> np.PyArray_DATA(Fre), 
         <double*> np.PyArray_DATA(MAcc), <double*> np.PyArray_DATA(MVel), 
         <double*> np.PyArray_DATA(MDis), numt)
-    return Period, Fre, MAcc, MVel, MDis
\ No newline at end of file
+    return Period, Fre, MAcc, MVel, MDis
+
+
+def calspecaccelinto(const floating[:] acc, double dt, periods, dampRatios, double[:, ::1] MAcc, double[:, ::1] MVel, double[:, ::1] MDis):
+    """把结果写入调用者提供的 MAcc, MVel, MDis (形状为(阻尼比个数, 周期个数)的连续double数组)
+    acc 可以是任意步长的float32或float64数组/memoryview(比如二维数组的一列), 不会复制
+    计算时释放GIL, 多个线程可以同时计算
+    """
+    cdef const double[::1] _periods = np.ascontiguousarray(periods, float)
+    cdef const double[::1] _dampRatios = np.ascontiguousarray(np.atleast_1d(dampRatios), float)
+    cdef int nperiods = _periods.shape[0]
+    cdef int ndamps = _dampRatios.shape[0]
+    cdef int length = acc.shape[0]
+    cdef long long stride
+    cdef int i
+    for i in range(ndamps):
+        if not 0 <= _dampRatios[i] < 1:
+            raise ValueError('阻尼比应该在[0, 1)之间: %r' % _dampRatios[i])
+    for i in range(nperiods):
+        if not _periods[i] > 0:
+            raise ValueError('周期应该大于0: %r' % _periods[i])
+    for name, out in (('MAcc', MAcc), ('MVel', MVel), ('MDis', MDis)):
+        if out.shape[0] != ndamps or out.shape[1] != nperiods:
+            raise ValueError('%s的形状应该为(%d, %d)' % (name, ndamps, nperiods))
+    if acc.strides[0] % sizeof(floating):
+        raise ValueError('acc的步长不是元素大小的整数倍')
+    if length < 2 or nperiods == 0 or ndamps == 0:
+        MAcc[...] = 0
+        MVel[...] = 0
+        MDis[...] = 0
+        return
+    stride = acc.strides[0] // <Py_ssize_t> sizeof(floating)
+    with nogil:
+        cal_spec_accel_strided(&acc[0], stride, length, dt, &_periods[0], nperiods,
+            &_dampRatios[0], ndamps, &MAcc[0, 0], &MVel[0, 0], &MDis[0, 0])
+
+
+def calspecaccels(acc, double dt, periods, dampRatios):
+    """所有周期和多个阻尼比一次计算, 返回 MAcc, MVel, MDis, 形状都为(阻尼比个数, 周期个数)"""
+    shape = (np.atleast_1d(dampRatios).shape[0], np.shape(periods)[0])
+    MAcc, MVel, MDis = np.empty(shape), np.empty(shape), np.empty(shape)
+    calspecaccelinto(acc, dt, periods, dampRatios, MAcc, MVel, MDis)
+    return MAcc, MVel, MDis
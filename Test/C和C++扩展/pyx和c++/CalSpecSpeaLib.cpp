@@ -2,30 +2,123 @@
 
 #include <stdio.h>
 #include <iostream>
+#define _USE_MATH_DEFINES
 #include <math.h>
+#include <vector>
 using namespace std;
 
 
 double maxabs(double num[], int len)
 {
-    //略
-    return abs(num[0]);
-
+    double value = 0;
+    for (int i = 0; i < len; i++) {
+        value = fmax(value, fabs(num[i]));
+    }
+    return value;
 }
+
 bool isALLvaluezero(double num[], int len)
 {
-    //略
-    return false;
+    for (int i = 0; i < len; i++) {
+        if (num[i] != 0) {
+            return false;
+        }
+    }
+    return true;
+}
+
+// Nigam-Jennings 方法的系数(加速度在每个时间步内线性变化时的精确解)
+// x[i+1] = a11*x[i] + a12*v[i] + b11*acc[i] + b12*acc[i+1]
+// v[i+1] = a21*x[i] + a22*v[i] + b21*acc[i] + b22*acc[i+1]
+static void nigam_jennings(double period, double dampRatio, double dt, double c[8])
+{
+    double w = 2 * M_PI / period;
+    double root = sqrt(1 - dampRatio * dampRatio);
+    double wd = w * root;
+    double r = dampRatio / root;
+    double e = exp(-dampRatio * w * dt);
+    double s = sin(wd * dt);
+    double cs = cos(wd * dt);
+    double k1 = (2 * dampRatio * dampRatio - 1) / (w * w * dt);
+    double k2 = 2 * dampRatio / (w * w * w * dt);
+    c[0] = e * (r * s + cs);
+    c[1] = e * s / wd;
+    c[2] = -w / root * e * s;
+    c[3] = e * (cs - r * s);
+    c[4] = e * ((k1 + dampRatio / w) * s / wd + (k2 + 1 / (w * w)) * cs) - k2;
+    c[5] = -e * (k1 * s / wd + k2 * cs) - 1 / (w * w) + k2;
+    c[6] = e * ((k1 + dampRatio / w) * (cs - r * s) - (k2 + 1 / (w * w)) * (wd * s + dampRatio * w * cs)) + 1 / (w * w * dt);
+    c[7] = -e * (k1 * (cs - r * s) - k2 * (wd * s + dampRatio * w * cs)) - 1 / (w * w * dt);
+}
+
+// acc[i * stride] 为第i个加速度, 可以是float或者double, 不需要连续
+// 不调用任何Python API, 可以在释放GIL后调用
+template <typename T>
+static void spec_accel(const T acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis)
+{
+    // 所有阻尼比和周期的振子一起计算, 时间步在外层, 内层循环连续访问可以向量化
+    int n = nperiods * ndamps;
+    vector<double> a11(n), a12(n), a21(n), a22(n), b11(n), b12(n), b21(n), b22(n);
+    vector<double> w2(n), w2d(n), x(n, 0.0), v(n, 0.0);
+    // 最大值先放在局部数组中, 和输出数组不会重叠, 编译器才能向量化
+    vector<double> maxDis(n, 0.0), maxVel(n, 0.0), maxAcc(n, 0.0);
+    for (int d = 0; d < ndamps; d++) {
+        for (int p = 0; p < nperiods; p++) {
+            int j = d * nperiods + p;
+            double c[8];
+            nigam_jennings(periods[p], dampRatios[d], dt, c);
+            a11[j] = c[0]; a12[j] = c[1]; a21[j] = c[2]; a22[j] = c[3];
+            b11[j] = c[4]; b12[j] = c[5]; b21[j] = c[6]; b22[j] = c[7];
+            double w = 2 * M_PI / periods[p];
+            w2[j] = w * w;
+            w2d[j] = 2 * dampRatios[d] * w;
+        }
+    }
+    for (int i = 0; i + 1 < len; i++) {
+        double p0 = acc[i * stride];
+        double p1 = acc[(i + 1) * stride];
+        for (int j = 0; j < n; j++) {
+            double xi = a11[j] * x[j] + a12[j] * v[j] + b11[j] * p0 + b12[j] * p1;
+            double vi = a21[j] * x[j] + a22[j] * v[j] + b21[j] * p0 + b22[j] * p1;
+            x[j] = xi;
+            v[j] = vi;
+            // 绝对加速度
+            double ai = fabs(w2d[j] * vi + w2[j] * xi);
+            xi = fabs(xi);
+            vi = fabs(vi);
+            maxDis[j] = maxDis[j] > xi ? maxDis[j] : xi;
+            maxVel[j] = maxVel[j] > vi ? maxVel[j] : vi;
+            maxAcc[j] = maxAcc[j] > ai ? maxAcc[j] : ai;
+        }
+    }
+    for (int j = 0; j < n; j++) {
+        MDis[j] = maxDis[j];
+        MVel[j] = maxVel[j];
+        MAcc[j] = maxAcc[j];
+    }
+}
+
+void cal_spec_accel_strided(const double acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis)
+{
+    spec_accel(acc, stride, len, dt, periods, nperiods, dampRatios, ndamps, MAcc, MVel, MDis);
+}
 
+void cal_spec_accel_strided(const float acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis)
+{
+    spec_accel(acc, stride, len, dt, periods, nperiods, dampRatios, ndamps, MAcc, MVel, MDis);
 }
+
+void cal_spec_accel_batch(double acc[], int len, double dt, double periods[], int nperiods, double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis)
+{
+    spec_accel(acc, 1, len, dt, periods, nperiods, dampRatios, ndamps, MAcc, MVel, MDis);
+}
+
 void cal_spec_accel(double acc[], int len, double dt, double maxPeriod, double periodStep, double dampRatio, double *Period, double *Fre, double *MAcc, double *MVel, double *MDis, int numt)
 {
-    //略
-    Period[0] = 99.95;
-    Fre[0] = 99.96;
-    MAcc[0] = 99.97;
-    MVel[0] = 99.98;
-    MDis[0] = 99.99;
+    for (int i = 0; i < numt; i++) {
+        Fre[i] = 1 / Period[i];
+    }
+    cal_spec_accel_batch(acc, len, dt, Period, numt, &dampRatio, 1, MAcc, MVel, MDis);
 }
 
 int main()
@@ -52,12 +145,16 @@ int main()
     Period[0] = 0.001;
     //cal_spec_accel(double acc[], int len,double dt,double maxPeriod,double periodStep,double dampRatio,double *Period,double *Fre,double *MAcc,double *MVel,double *MDis)
     cal_spec_accel(acc, len, dt, maxPeriod, periodStep, dampRatio, Period, Fre, MAcc, MVel, MDis, numt);
-    
+
     for (int i = 0; i<numt; i++)
     {
         cout << MAcc[i] << endl;
     }
-    
+
     delete[] Fre;
+    delete[] MDis;
+    delete[] MVel;
+    delete[] MAcc;
+    delete[] Period;
     return 0;
-}
\ No newline at end of file
+}
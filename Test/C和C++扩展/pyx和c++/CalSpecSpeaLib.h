@@ -1,3 +1,6 @@
 double maxabs(double num[], int len);
 bool isALLvaluezero(double num[], int len);
+void cal_spec_accel_strided(const double acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis);
+void cal_spec_accel_strided(const float acc[], long long stride, int len, double dt, const double periods[], int nperiods, const double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis);
+void cal_spec_accel_batch(double acc[], int len, double dt, double periods[], int nperiods, double dampRatios[], int ndamps, double *MAcc, double *MVel, double *MDis);
 void cal_spec_accel(double acc[], int len, double dt, double maxPeriod, double periodStep, double dampRatio, double *Period, double *Fre, double *MAcc, double *MVel, double *MDis, int numt);
\ No newline at end of file
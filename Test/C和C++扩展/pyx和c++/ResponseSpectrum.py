@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ResponseSpectrum
+@description: 反应谱计算(Nigam-Jennings 分段线性精确解)
+    - 编译了CalSpecSpea时使用C++实现, 否则使用numpy实现
+    - numpy实现把多条记录、所有周期和阻尼比作为一个数组一起计算
+    - spectra 在进程池中计算大量记录, 结果放在一个结构化数组中
+    - C++实现计算时释放GIL, 也可以用线程池直接写入结果数组
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+
+import numpy as np
+
+
+try:
+    from CalSpecSpea import calspecaccels, calspecaccelinto
+except ImportError:
+    calspecaccels = calspecaccelinto = None
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+def periodsOf(maxPeriod=10.0, periodStep=0.02):
+    """和calspecaccel相同的周期, 第一个周期为0.001"""
+    periods = np.arange(0.0, maxPeriod + periodStep, periodStep)
+    periods[0] = 0.001
+    return periods
+
+
+def coefficients(periods, dampRatios, dt):
+    """每个(阻尼比, 周期)的递推系数, 形状为(8, 阻尼比个数, 周期个数)
+    x[i+1] = a11*x[i] + a12*v[i] + b11*acc[i] + b12*acc[i+1]
+    v[i+1] = a21*x[i] + a22*v[i] + b21*acc[i] + b22*acc[i+1]
+    """
+    periods = np.asarray(periods, float)
+    dampRatios = np.asarray(dampRatios, float)
+    if not np.all((dampRatios >= 0) & (dampRatios < 1)):
+        raise ValueError('阻尼比应该在[0, 1)之间: %r' % (dampRatios,))
+    if not np.all(periods > 0):
+        raise ValueError('周期应该大于0')
+    w = 2 * np.pi / periods[None, :]
+    xi = dampRatios[:, None]
+    root = np.sqrt(1 - xi * xi)
+    wd = w * root
+    r = xi / root
+    e = np.exp(-xi * w * dt)
+    s = np.sin(wd * dt)
+    c = np.cos(wd * dt)
+    k1 = (2 * xi * xi - 1) / (w * w * dt)
+    k2 = 2 * xi / (w ** 3 * dt)
+    return np.array([
+        e * (r * s + c),
+        e * s / wd,
+        -w / root * e * s,
+        e * (c - r * s),
+        e * ((k1 + xi / w) * s / wd + (k2 + 1 / (w * w)) * c) - k2,
+        -e * (k1 * s / wd + k2 * c) - 1 / (w * w) + k2,
+        e * ((k1 + xi / w) * (c - r * s) - (k2 + 1 / (w * w)) * (wd * s + xi * w * c)) + 1 / (w * w * dt),
+        -e * (k1 * (c - r * s) - k2 * (wd * s + xi * w * c)) - 1 / (w * w * dt),
+    ])
+
+
+def _floating(acc):
+    """float32/float64的数组不复制(可以不连续), 其它类型转换为float64"""
+    acc = np.asarray(acc)
+    if acc.dtype not in (np.float32, np.float64):
+        acc = acc.astype(float)
+    return acc.ravel() if acc.ndim != 1 else acc
+
+
+def spectraNumpy(records, dt, periods, dampRatios):
+    """多条记录一起计算, 返回 MAcc, MVel, MDis, 形状都为(记录数, 阻尼比个数, 周期个数)
+    记录按长度从长到短排序, 每一步只计算还没有结束的前k条记录
+    """
+    records = [np.asarray(acc, float).ravel() for acc in records]
+    a11, a12, a21, a22, b11, b12, b21, b22 = coefficients(periods, dampRatios, dt)
+    w2 = (2 * np.pi / np.asarray(periods, float)) ** 2
+    w2d = 2 * np.asarray(dampRatios, float)[:, None] * np.sqrt(w2)
+    order = np.argsort([-len(acc) for acc in records], kind='stable')
+    lengths = np.array([len(records[i]) for i in order], int)
+    steps = lengths.max() if len(lengths) else 0
+    # (时间, 记录), 结束后补0
+    acc = np.zeros((steps, len(records)))
+    for column, i in enumerate(order):
+        acc[:lengths[column], column] = records[i]
+    shape = (len(records),) + a11.shape
+    x, v = np.zeros(shape), np.zeros(shape)
+    maxAcc, maxVel, maxDis = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+    temp = np.empty(shape)
+    active = len(records)
+    for i in range(steps - 1):
+        while active and lengths[active - 1] <= i + 1:
+            active -= 1
+        if not active:
+            break
+        p0 = acc[i, :active, None, None]
+        p1 = acc[i + 1, :active, None, None]
+        xs, vs = x[:active], v[:active]
+        xn = a11 * xs + a12 * vs + b11 * p0 + b12 * p1
+        vs *= a22
+        vs += a21 * xs + b21 * p0 + b22 * p1
+        xs[...] = xn
+        t = temp[:active]
+        np.abs(xs, out=t)
+        np.maximum(maxDis[:active], t, out=maxDis[:active])
+        np.abs(vs, out=t)
+        np.maximum(maxVel[:active], t, out=maxVel[:active])
+        # 绝对加速度
+        np.multiply(w2d, vs, out=t)
+        t += w2 * xs
+        np.abs(t, out=t)
+        np.maximum(maxAcc[:active], t, out=maxAcc[:active])
+    # 恢复原来的顺序
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order))
+    return maxAcc[inverse], maxVel[inverse], maxDis[inverse]
+
+
+def spectrum(acc, dt, periods, dampRatios, engine=None):
+    """一条记录的 MAcc, MVel, MDis, 形状都为(阻尼比个数, 周期个数)
+    engine 为 'cython' 或 'numpy', 默认有编译的模块时使用cython
+    """
+    engine = engine or ('cython' if calspecaccels else 'numpy')
+    if engine == 'cython':
+        if calspecaccels is None:
+            raise ImportError('CalSpecSpea没有编译, 运行 python setup.py build_ext --inplace')
+        return calspecaccels(_floating(acc), dt, periods, dampRatios)
+    return tuple(result[0] for result in spectraNumpy([acc], dt, periods, dampRatios))
+
+
+def _spectraChunk(records, dt, periods, dampRatios, engine):
+    if engine == 'numpy':
+        return spectraNumpy(records, dt, periods, dampRatios)
+    results = [spectrum(acc, dt, periods, dampRatios, engine) for acc in records]
+    return tuple(np.array(values) for values in zip(*results))
+
+
+def spectraDtype(periods, dampRatios):
+    shape = (len(dampRatios), len(periods))
+    return np.dtype([('pga', float), ('MAcc', float, shape),
+                     ('MVel', float, shape), ('MDis', float, shape)])
+
+
+def spectra(records, dt, periods, dampRatios, processes=None, chunkSize=32,
+            engine=None, threads=0):
+    """计算多条记录的反应谱, 返回结构化数组, 每条记录一行:
+    pga, MAcc, MVel, MDis (后三个的形状为(阻尼比个数, 周期个数))
+    processes 为进程数, 默认CPU个数, 为0时在当前进程计算
+    threads 不为0时(只支持cython)在线程池中计算并直接写入结果, 不需要进程间复制数据
+    """
+    engine = engine or ('cython' if calspecaccels else 'numpy')
+    periods = np.asarray(periods, float)
+    dampRatios = np.atleast_1d(np.asarray(dampRatios, float))
+    result = np.zeros(len(records), spectraDtype(periods, dampRatios))
+    result['pga'] = [np.abs(acc).max() if len(acc) else 0 for acc in records]
+    if threads and engine == 'cython':
+        def compute(i):
+            calspecaccelinto(_floating(records[i]), dt, periods, dampRatios,
+                             result['MAcc'][i], result['MVel'][i], result['MDis'][i])
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(compute, range(len(records))))
+        return result
+    chunks = [records[i:i + chunkSize] for i in range(0, len(records), chunkSize)]
+    args = (dt, periods, dampRatios, engine)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes and len(chunks) > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(_spectraChunk, chunk, *args) for chunk in chunks]
+            values = [future.result() for future in futures]
+    else:
+        values = [_spectraChunk(chunk, *args) for chunk in chunks]
+    start = 0
+    for MAcc, MVel, MDis in values:
+        end = start + len(MAcc)
+        result['MAcc'][start:end] = MAcc
+        result['MVel'][start:end] = MVel
+        result['MDis'][start:end] = MDis
+        start = end
+    return result
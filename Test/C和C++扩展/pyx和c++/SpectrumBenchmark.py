@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: SpectrumBenchmark
+@description: 1000条记录(由hf_acc.txt缩放、截取、加噪声得到)的反应谱, 比较cython和numpy实现
+    先运行 python setup.py build_ext --inplace 编译CalSpecSpea
+    python SpectrumBenchmark.py [记录数]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+import ResponseSpectrum
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+def makeRecords(count, seed=1):
+    base = np.loadtxt('hf_acc.txt')
+    random = np.random.RandomState(seed)
+    records = []
+    for _ in range(count):
+        start = random.randint(0, len(base) // 4)
+        length = random.randint(len(base) // 2, len(base) - start)
+        acc = base[start:start + length] * random.uniform(0.2, 2)
+        records.append(acc + random.normal(0, 0.002, len(acc)))
+    return records
+
+
+def measure(name, records, *args, **kwargs):
+    begin = time.time()
+    result = ResponseSpectrum.spectra(records, *args, **kwargs)
+    elapsed = time.time() - begin
+    print('%-28s %8.2fs %8.2fms/record' % (name, elapsed, elapsed * 1000 / len(records)))
+    return result
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    records = makeRecords(count)
+    dt = 0.005
+    periods = ResponseSpectrum.periodsOf(10.0, 0.02)
+    dampRatios = [0.02, 0.05, 0.1]
+    processes = os.cpu_count() or 1
+    print('%d records, %d-%d steps, %d periods x %d damping ratios, %d cpu' % (
+        count, min(map(len, records)), max(map(len, records)), len(periods),
+        len(dampRatios), processes))
+    results = []
+    if ResponseSpectrum.calspecaccels is not None:
+        results.append(measure('cython', records, dt, periods, dampRatios,
+                               processes=0, engine='cython'))
+        results.append(measure('cython, %d processes' % processes, records, dt,
+                               periods, dampRatios, engine='cython'))
+    else:
+        print('CalSpecSpea没有编译, 只测试numpy')
+    results.append(measure('numpy', records, dt, periods, dampRatios,
+                           processes=0, engine='numpy'))
+    results.append(measure('numpy, %d processes' % processes, records, dt,
+                           periods, dampRatios, engine='numpy'))
+    reference = results[0]
+    for result in results[1:]:
+        for name in ('MAcc', 'MVel', 'MDis'):
+            error = np.abs(result[name] - reference[name]).max() / np.abs(reference[name]).max()
+            assert error < 1e-9, (name, error)
+    print('results equal, Sa(0.001s)/PGA = %.4f' % np.median(
+        reference['MAcc'][:, 1, 0] / reference['pga']))
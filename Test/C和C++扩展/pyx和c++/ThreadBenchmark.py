@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ThreadBenchmark
+@description: 1到N个线程计算反应谱, 比较原来的calspecaccel(持有GIL, 每次分配输出)
+    和calspecaccelinto(释放GIL, 写入调用者提供的数组)
+    另外统计后台线程计算一条很长的记录时, 主线程最长被阻塞多久
+    先运行 python setup.py build_ext --inplace 编译CalSpecSpea
+    python ThreadBenchmark.py [最大线程数] [记录数]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+from threading import Thread
+import time
+
+import numpy as np
+
+from CalSpecSpea import calspecaccel, calspecaccelinto
+import ResponseSpectrum
+from SpectrumBenchmark import makeRecords
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+dt = 0.005
+maxPeriod = 10.0
+periodStep = 0.02
+dampRatios = (0.02, 0.05, 0.1)
+
+
+def oldEntry(records, threads):
+    """原来的入口, 每个阻尼比调用一次"""
+    def compute(acc):
+        return [calspecaccel(acc, acc.shape[0], dt, maxPeriod, periodStep, damp)
+                for damp in dampRatios]
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(compute, records))
+
+
+def newEntry(records, threads):
+    periods = ResponseSpectrum.periodsOf(maxPeriod, periodStep)
+    ResponseSpectrum.spectra(records, dt, periods, dampRatios, engine='cython',
+                             threads=threads)
+
+
+def timed(function, *args):
+    begin = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - begin
+
+
+def longestPause(function, records):
+    """后台线程计算时, 主线程两次循环之间最长的间隔(毫秒)"""
+    worker = Thread(target=function, args=(records, 1))
+    worker.start()
+    pause = 0
+    last = time.perf_counter()
+    while worker.is_alive():
+        now = time.perf_counter()
+        pause = max(pause, now - last)
+        last = now
+    worker.join()
+    return pause * 1000
+
+
+if __name__ == '__main__':
+    maxThreads = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    records = makeRecords(count)
+    print('%d records, %d cpu' % (count, os.cpu_count() or 1))
+    print('%-8s %16s %16s' % ('threads', 'calspecaccel', 'calspecaccelinto'))
+    threads = 1
+    while threads <= maxThreads:
+        old = timed(oldEntry, records, threads)
+        new = timed(newEntry, records, threads)
+        print('%-8d %15.2fs %15.2fs' % (threads, old, new))
+        threads *= 2
+
+    # 多条记录作为float32二维数组的列, 不需要复制成连续的float64
+    columns = np.zeros((max(map(len, records)), count), np.float32)
+    for i, acc in enumerate(records):
+        columns[:len(acc), i] = acc
+    periods = ResponseSpectrum.periodsOf(maxPeriod, periodStep)
+    out = [np.empty((len(dampRatios), len(periods))) for _ in range(3)]
+    begin = time.perf_counter()
+    for i in range(count):
+        calspecaccelinto(columns[:, i], dt, periods, dampRatios, *out)
+    print('float32 strided columns: %.2fs' % (time.perf_counter() - begin))
+
+    # 一条30万步的记录, 每次调用需要几百毫秒
+    long = [np.tile(records[0], 300000 // len(records[0]) + 1)[:300000]]
+    print('longest main thread pause during a %d-step record: '
+          'calspecaccel %.0fms, calspecaccelinto %.0fms' % (
+              len(long[0]), longestPause(oldEntry, long),
+              longestPause(newEntry, long)))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: CarBenchmark
+@description: 本机回环测试图片推送的吞吐量和延迟, 以及推送图片时控制命令的往返时间
+    服务器在线程中运行, 图片来源是SyntheticSource, 不需要摄像头
+    - 多个客户端时每一帧只编码一次(每种质量等级一次)
+    - 网络慢的客户端自动降低质量, 不影响其它客户端
+    python CarBenchmark.py [秒数]
+"""
+import asyncio
+from contextlib import redirect_stdout
+import io
+import logging
+import socket
+import sys
+from threading import Thread, Event
+import time
+
+from PyQt5.QtCore import QEventLoop, QTimer
+from PyQt5.QtWidgets import QApplication
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+
+from Lib.Broadcaster import Broadcaster, SyntheticSource  # @UnresolvedImport
+from Lib.CarSocket import CarSocket  # @UnresolvedImport
+from Lib.Protocol import Subscribe, SubscribeBody, message  # @UnresolvedImport
+from server import EchoServer
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class ServerThread(Thread):
+
+    def __init__(self, width, height, fps):
+        super(ServerThread, self).__init__(daemon=True)
+        self.broadcaster = Broadcaster(
+            SyntheticSource(width, height), fps, (width, height))
+        self.port = None
+        self.server = None
+        self._loop = None
+        self._ready = Event()
+
+    def run(self):
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        sockets = bind_sockets(0, '127.0.0.1')
+        self.port = sockets[0].getsockname()[1]
+        with redirect_stdout(io.StringIO()):
+            # 没有GPIO时的提示
+            self.server = EchoServer(self.broadcaster)
+        self.server.add_sockets(sockets)
+        self._loop = IOLoop.current()
+        self._ready.set()
+        self._loop.start()
+        self.server.stop()
+
+    def start(self):
+        self.broadcaster.start()
+        super(ServerThread, self).start()
+        self._ready.wait()
+
+    def stats(self):
+        """在服务器线程中获取统计"""
+        done = Event()
+        result = []
+        self._loop.add_callback(lambda: (result.append(self.server.stats()), done.set()))
+        done.wait()
+        return result[0]
+
+    def stop(self):
+        self._loop.add_callback(self._loop.stop)
+        self.join()
+        self.broadcaster.stop()
+
+
+class SlowClient(Thread):
+    """限速读取的客户端, 模拟很慢的wifi"""
+
+    def __init__(self, port, rate, fps=30):
+        super(SlowClient, self).__init__(daemon=True)
+        self.rate = rate
+        self.received = 0
+        self._stopped = False
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16 * 1024)
+        self._socket.connect(('127.0.0.1', port))
+        self._socket.sendall(message(Subscribe, SubscribeBody.pack(fps)))
+
+    def run(self):
+        while not self._stopped:
+            data = self._socket.recv(4096)
+            if not data:
+                break
+            self.received += len(data)
+            time.sleep(len(data) / self.rate)
+
+    def stop(self):
+        self._stopped = True
+        self._socket.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0
+
+
+def run(port, fps, seconds, clients=1, commandInterval=50, beforeClose=None):
+    """clients个客户端订阅fps帧, 第一个客户端每commandInterval毫秒发送一个控制命令
+    返回第一个客户端的结果, beforeClose在断开连接前调用
+    """
+    loop = QEventLoop()
+    sockets = [CarSocket() for _ in range(clients)]
+    car = sockets[0]
+    frames = []
+    commands = []
+    replies = []
+
+    def sendCommand():
+        commands.append(time.time())
+        # 转向命令, 没有GPIO时什么都不做
+        car.sendCommand('L:%d' % (32 + len(commands) % 20))
+
+    timer = QTimer(timeout=sendCommand)
+    car.frameReady.connect(frames.append)
+    car.replyReceived.connect(lambda _: replies.append(time.time()))
+    car.connected.connect(lambda: timer.start(commandInterval))
+    for client in sockets:
+        client.connected.connect(lambda client=client: client.subscribe(fps))
+        client.connectToHost('127.0.0.1', port)
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+    timer.stop()
+    dropped = car.dropped
+    server = beforeClose() if beforeClose else None
+    for client in sockets:
+        client.subscribe(0)
+        client.flush()
+        client.shutdown()
+    QApplication.processEvents()
+
+    transport = [(f.received - f.sent) * 1000 for f in frames]
+    decode = [(f.decoded - f.sent) * 1000 for f in frames]
+    rtt = [(r - c) * 1000 for c, r in zip(commands, replies)]
+    sequences = [f.sequence for f in frames]
+    return {
+        'fps': len(frames) / seconds,
+        'ordered': sequences == sorted(sequences),
+        'dropped': dropped,
+        'transport': (sum(transport) / max(len(transport), 1), percentile(transport, 0.95)),
+        'decoded': (sum(decode) / max(len(decode), 1), percentile(decode, 0.95)),
+        'rtt': (sum(rtt) / max(len(rtt), 1), percentile(rtt, 0.95)),
+        'replies': '%d/%d' % (len(replies), len(commands)),
+        'server': server,
+    }
+
+
+def measure(server, seconds, *args, **kwargs):
+    """运行客户端, 同时统计这段时间服务器的编码次数"""
+    encodes = server.broadcaster.encodes
+    result = run(server.port, *args, beforeClose=server.stats, **kwargs)
+    result['encodes'] = (server.broadcaster.encodes - encodes) / seconds
+    return result
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    # 客户端断开的提示
+    logging.getLogger('server').setLevel(logging.ERROR)
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print('single client, command every 50ms')
+    print('%-12s %6s %8s %7s %16s %16s %16s %8s' % (
+        'size', 'fps', 'ordered', 'dropped', 'transport ms',
+        'decoded ms', 'command rtt ms', 'replies'))
+    for width, height, fps in ((160, 120, 30), (640, 480, 30), (1280, 720, 30)):
+        server = ServerThread(width, height, fps)
+        server.start()
+        result = run(server.port, fps, seconds)
+        server.stop()
+        print('%-12s %6.1f %8s %7d %7.2f/%7.2f %7.2f/%7.2f %7.2f/%7.2f %8s' % (
+            ('%dx%d@%d' % (width, height, fps), result['fps'],
+             result['ordered'], result['dropped']) + result['transport'] +
+            result['decoded'] + result['rtt'] + (result['replies'],)))
+
+    print('\nviewers, 320x240@30 (one encode per frame and level in use)')
+    print('%-8s %12s %12s %24s %12s' % (
+        'viewers', 'capture fps', 'encodes/s', 'encodes/s (per client)', 'client fps'))
+    for viewers in (1, 4, 8):
+        server = ServerThread(320, 240, 30)
+        server.start()
+        result = measure(server, seconds, 30, seconds, viewers)
+        server.stop()
+        print('%-8d %12.1f %12.1f %24.1f %12.1f' % (
+            viewers, result['server']['fps'], result['encodes'],
+            viewers * result['server']['fps'], result['fps']))
+
+    print('\nslow client (100KB/s) next to a fast one, 640x480@30')
+    server = ServerThread(640, 480, 30)
+    server.start()
+    slow = SlowClient(server.port, 100 * 1024)
+    slow.start()
+    samples = []
+
+    def sample():
+        # 每0.5秒记录慢客户端的(等级, 帧数)
+        while slow.is_alive():
+            clients = server.stats()['clients']
+            if len(clients) == 2:
+                samples.append(min((c['fps'], c['level']) for c in clients))
+            time.sleep(0.5)
+    Thread(target=sample, daemon=True).start()
+    result = measure(server, seconds * 4, 30, seconds * 4)
+    slow.stop()
+    server.stop()
+    for level in sorted(set(level for _, level in samples)):
+        fps = [f for f, l in samples if l == level]
+        print('slow client level %d: %3d%% of the time, %.1ffps' % (
+            level, len(fps) * 100 / len(samples), sum(fps) / len(fps)))
+    print('slow client received %.1fKB/s' % (slow.received / 1024 / seconds / 4))
+    print('fast client: %.1ffps, transport %.2fms' % (
+        result['fps'], result['transport'][0]))
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: Broadcaster
+@description: 在单独的线程中读取摄像头并编码, 所有客户端共享同一份编码结果
+    - 按客户端当前使用的几种质量(Levels)各编码一次, 和客户端数量无关
+    - 没有客户端订阅时不读取摄像头
+    - SyntheticSource 生成测试图片, 不需要摄像头
+"""
+from threading import Thread, Event, Lock
+import time
+
+import numpy as np
+
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+if cv2 is None:
+    try:
+        # 没有opencv时用Qt编码(比如在电脑上测试)
+        from PyQt5.QtCore import QBuffer, QByteArray
+        from PyQt5.QtGui import QImage
+    except ImportError:
+        QImage = None
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+# 质量等级: (缩放, jpg质量), 网络跟不上时客户端降到后面的等级
+Levels = ((1, 80), (1, 50), (0.5, 50), (0.5, 20))
+
+
+def resize(frame, width, height):
+    if frame.shape[1] == width and frame.shape[0] == height:
+        return frame
+    if cv2 is not None:
+        return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+    # 最近邻
+    rows = np.linspace(0, frame.shape[0] - 1, height).astype(np.intp)
+    columns = np.linspace(0, frame.shape[1] - 1, width).astype(np.intp)
+    return np.ascontiguousarray(frame[rows][:, columns])
+
+
+def encode(frame, quality):
+    """BGR图片编码为jpg, 返回支持buffer协议的对象"""
+    if cv2 is not None:
+        ret, data = cv2.imencode(
+            '.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        return data if ret else None
+    if QImage is None:
+        raise RuntimeError('需要opencv或者PyQt5来编码图片')
+    frame = np.ascontiguousarray(frame)
+    image = QImage(frame.data, frame.shape[1], frame.shape[0],
+                   frame.strides[0], QImage.Format_BGR888)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QBuffer.WriteOnly)
+    return bytes(data) if image.save(buffer, 'JPG', quality) else None
+
+
+class Meter:
+    """指数移动平均"""
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.value = 0
+        self.count = 0
+
+    def add(self, value):
+        if self.count:
+            self.value += self.alpha * (value - self.value)
+        else:
+            self.value = value
+        self.count += 1
+
+
+class RateMeter(Meter):
+    """每秒次数"""
+
+    def __init__(self, *args, **kwargs):
+        super(RateMeter, self).__init__(*args, **kwargs)
+        self._last = None
+
+    def tick(self, now=None):
+        now = time.time() if now is None else now
+        if self._last is not None:
+            self.add(now - self._last)
+        self._last = now
+
+    @property
+    def rate(self):
+        return 1 / self.value if self.value else 0
+
+
+class EncodedFrame:
+
+    __slots__ = ('sequence', 'timestamp', 'data')
+
+    def __init__(self, sequence, timestamp, data):
+        self.sequence = sequence
+        # 读取摄像头的时间
+        self.timestamp = timestamp
+        # {质量等级: jpg数据}
+        self.data = data
+
+    def get(self, level):
+        """指定等级的数据, 刚切换等级还没有编码时用最接近的等级"""
+        if level not in self.data:
+            level = min(self.data, key=lambda other: abs(other - level))
+        return self.data[level]
+
+
+class CameraSource:
+
+    def __init__(self, cap):
+        self.cap = cap
+
+    def __call__(self):
+        if not self.cap or not self.cap.isOpened():
+            return None
+        ret, frame = self.cap.read()  # 读取一帧图片
+        return frame if ret else None
+
+
+class SyntheticSource:
+    """移动的渐变和方块"""
+
+    def __init__(self, width=640, height=480):
+        self.width = width
+        self.height = height
+        self._index = 0
+        y, x = np.mgrid[0:height, 0:width]
+        self._base = ((x + y) * 255 // (width + height)).astype(np.uint8)
+
+    def __call__(self):
+        self._index += 1
+        frame = np.empty((self.height, self.width, 3), np.uint8)
+        frame[..., 0] = self._base + np.uint8(self._index * 3 % 256)
+        frame[..., 1] = self._base[::-1]
+        frame[..., 2] = self._base[:, ::-1]
+        size = self.height // 4
+        x = self._index * 4 % (self.width - size)
+        frame[size:size * 2, x:x + size] = 255
+        return frame
+
+
+class Broadcaster(Thread):
+    """按fps读取source(返回BGR图片的函数), 缩放到size后编码,
+    每一帧在线程中调用callback(EncodedFrame)
+    """
+
+    def __init__(self, source, fps, size, callback=None, levels=Levels):
+        super(Broadcaster, self).__init__(daemon=True)
+        self.source = source
+        self.fps = fps
+        self.size = size
+        self.callback = callback
+        self.levels = levels
+        self._using = ()
+        self._lock = Lock()
+        self._active = Event()
+        self._stopped = False
+        self.sequence = 0
+        # 统计
+        self.captureRate = RateMeter()
+        self.readTime = Meter()
+        self.encodeTime = Meter()
+        self.encodes = 0
+
+    def use(self, levels):
+        """设置客户端正在使用的质量等级, 为空时暂停读取"""
+        with self._lock:
+            self._using = tuple(sorted(set(levels)))
+        if self._using:
+            self._active.set()
+        else:
+            self._active.clear()
+
+    def stop(self):
+        self._stopped = True
+        self._active.set()
+        self.join()
+
+    def stats(self):
+        return {
+            'fps': self.captureRate.rate,
+            'read': self.readTime.value * 1000,
+            'encode': self.encodeTime.value * 1000,
+            'encodes': self.encodes,
+        }
+
+    def run(self):
+        interval = 1 / self.fps
+        while not self._stopped:
+            self._active.wait()
+            if self._stopped:
+                break
+            begin = time.time()
+            try:
+                frame = self.source()
+            except Exception as e:
+                print(e)
+                frame = None
+            if frame is None:
+                time.sleep(interval)
+                continue
+            self.readTime.add(time.time() - begin)
+            with self._lock:
+                using = self._using
+            data = {}
+            start = time.time()
+            for level in using:
+                scale, quality = self.levels[level]
+                image = resize(frame, int(self.size[0] * scale),
+                               int(self.size[1] * scale))
+                encoded = encode(image, quality)
+                if encoded is not None:
+                    data[level] = encoded
+            if data:
+                self.encodes += len(data)
+                self.encodeTime.add(time.time() - start)
+                self.sequence += 1
+                self.captureRate.tick(begin)
+                if self.callback:
+                    self.callback(EncodedFrame(self.sequence, begin, data))
+            time.sleep(max(0, interval - (time.time() - begin)))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: CarSocket
+@description: 按Protocol中的消息格式收发数据的QTcpSocket
+    - 先看消息头中的长度, 数据没有到齐时留在Qt的缓冲区中, 到齐后一次读出, 不在python中拼接
+    - 图片在线程中解码, 解码跟不上时只保留最新的一帧
+"""
+from collections import deque
+from threading import Thread, Condition
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+from PyQt5.QtNetwork import QTcpSocket, QAbstractSocket
+
+from Lib.Protocol import Header, FrameHeader, SubscribeBody, MaxLength, \
+    Command, Reply, Subscribe, Frame, message  # @UnresolvedImport
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+
+class DecodedFrame:
+
+    __slots__ = ('image', 'sequence', 'sent', 'received', 'decoded')
+
+    def __init__(self, image, sequence, sent, received, decoded):
+        self.image = image
+        self.sequence = sequence
+        # 服务器发送的时间, 两台机器时钟不同步时延迟只能作参考
+        self.sent = sent
+        self.received = received
+        self.decoded = decoded
+
+
+class ImageDecoder(QObject):
+    """在线程中把jpg解码为QImage"""
+
+    decoded = pyqtSignal(object)
+
+    def __init__(self, *args, **kwargs):
+        super(ImageDecoder, self).__init__(*args, **kwargs)
+        self._frames = deque(maxlen=1)
+        self._condition = Condition()
+        self._closed = False
+        self.dropped = 0
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def put(self, data, sequence, sent, received):
+        with self._condition:
+            if self._frames:
+                # 上一帧还没来得及解码
+                self.dropped += 1
+            self._frames.append((data, sequence, sent, received))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._frames and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                data, sequence, sent, received = self._frames.popleft()
+            image = QImage.fromData(data, 'JPG')
+            if not image.isNull():
+                self.decoded.emit(DecodedFrame(
+                    image, sequence, sent, received, time.time()))
+
+
+class CarSocket(QTcpSocket):
+
+    # 命令的回复
+    replyReceived = pyqtSignal(bytes)
+    # 解码后的图片 DecodedFrame
+    frameReady = pyqtSignal(object)
+
+    def __init__(self, *args, **kwargs):
+        super(CarSocket, self).__init__(*args, **kwargs)
+        # 已经读取了消息头, 等待内容的(类型, 长度)
+        self._pending = None
+        self._decoder = ImageDecoder()
+        self._decoder.decoded.connect(self.frameReady)
+        self.connected.connect(self._onConnected)
+        self.disconnected.connect(self._reset)
+        self.readyRead.connect(self._onReadyRead)
+
+    @property
+    def dropped(self):
+        return self._decoder.dropped
+
+    def shutdown(self):
+        """关闭连接并停止解码线程"""
+        self.abort()
+        self._decoder.close()
+
+    def sendCommand(self, command):
+        return self._send(message(Command, command.encode()))
+
+    def subscribe(self, fps):
+        """订阅图片, 服务器按fps主动推送, 0为取消"""
+        return self._send(message(Subscribe, SubscribeBody.pack(fps)))
+
+    def _send(self, data):
+        if not self.isWritable():
+            return False
+        return self.write(data) == len(data)
+
+    def _onConnected(self):
+        # 控制命令很小, 不等待合并立即发送
+        self.setSocketOption(QAbstractSocket.LowDelayOption, 1)
+
+    def _reset(self):
+        self._pending = None
+
+    def _onReadyRead(self):
+        while True:
+            if self._pending is None:
+                if self.bytesAvailable() < Header.size:
+                    return
+                kind, length = Header.unpack(self.read(Header.size))
+                if length > MaxLength:
+                    # 数据错乱
+                    self.setErrorString('消息长度错误: %d' % length)
+                    return self.abort()
+                self._pending = kind, length
+            kind, length = self._pending
+            if self.bytesAvailable() < length:
+                return
+            self._pending = None
+            if kind == Frame and length > FrameHeader.size:
+                sequence, sent = FrameHeader.unpack(self.read(FrameHeader.size))
+                self._decoder.put(self.read(length - FrameHeader.size),
+                                  sequence, sent, time.time())
+            elif kind == Reply:
+                self.replyReceived.emit(self.read(length) if length else b'')
+            elif length:
+                # 不认识的消息
+                self.read(length)
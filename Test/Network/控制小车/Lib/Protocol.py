@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Created on 2026年10月18日
+@author: Irony
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: Protocol
+@description: 小车客户端和服务器之间的消息格式(服务器端不依赖PyQt)
+    每条消息: 类型(1字节) + 长度(4字节, 网络字节序) + 内容
+    - Command   客户端 -> 服务器  控制命令, 比如 b'F:10'
+    - Reply     服务器 -> 客户端  命令的回复, 成功时原样返回, 失败时为空
+    - Subscribe 客户端 -> 服务器  订阅图片, 内容为每秒帧数(2字节), 0为取消
+    - Frame     服务器 -> 客户端  序号(4字节) + 发送时间(8字节) + jpg图片
+"""
+import struct
+
+
+__Author__ = """By: Irony
+QQ: 892768447
+Email: 892768447@qq.com"""
+__Copyright__ = 'Copyright (c) 2018 Irony'
+__Version__ = 1.0
+
+Command = 1
+Reply = 2
+Subscribe = 3
+Frame = 4
+
+# 类型, 内容长度
+Header = struct.Struct('!BI')
+# 序号, 发送时间(time.time())
+FrameHeader = struct.Struct('!Id')
+# 每秒帧数
+SubscribeBody = struct.Struct('!H')
+
+# 超过这个长度认为数据错乱, 断开连接
+MaxLength = 16 * 1024 * 1024
+
+
+def message(kind, payload=b''):
+    """完整的小消息"""
+    return Header.pack(kind, len(payload)) + payload
+
+
+def frameHeader(sequence, timestamp, length):
+    """图片消息的头部, 图片数据单独发送, 不需要拼接"""
+    return Header.pack(Frame, FrameHeader.size + length) + \
+        FrameHeader.pack(sequence, timestamp)
@@ -1,15 +1,29 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import atexit
+from datetime import timedelta
 import logging
+import socket
+import time
 
-import cv2
 from tornado import gen
-from tornado.ioloop import IOLoop
+from tornado.ioloop import IOLoop, PeriodicCallback
 from tornado.iostream import StreamClosedError
+from tornado.locks import Condition
 from tornado.options import options, define
 from tornado.tcpserver import TCPServer
 
+from Lib.Protocol import Header, SubscribeBody, MaxLength, Command, Reply, \
+    Subscribe, message, frameHeader  # @UnresolvedImport
+from Lib.Broadcaster import Broadcaster, CameraSource, SyntheticSource, \
+    Levels, Meter, RateMeter  # @UnresolvedImport
+
+
+try:
+    import cv2
+except ImportError:
+    # 没有opencv时只能使用生成的测试图片
+    cv2 = None
 
 try:
     import RPi.GPIO as GPIO  # @UnusedImport @UnresolvedImport
@@ -31,22 +45,92 @@ __Version__ = 1.0
 
 
 define("port", default=8888, help="TCP port to listen on")
+define("synthetic", default=False, type=bool,
+       help="use generated frames instead of the camera")
 logger = logging.getLogger(__name__)
 
 # SIZE = (640, 480)  # 分辨率
 # FPS = 24
 SIZE = (100, 80)  # 分辨率
 FPS = 5
-PARAM = [int(cv2.IMWRITE_JPEG_QUALITY), FPS]
+# 发送缓冲区小一些, 网络跟不上时能尽快反映在发送时间上, 缓冲区中积压的图片也更少
+SEND_BUFFER = 16 * 1024
+# 统计发送情况的时间窗口(秒)
+WINDOW = 1
 
 
-class EchoServer(TCPServer):
+class Subscriber:
+    """订阅了图片的客户端, 根据等待网络的时间调整质量等级"""
+
+    def __init__(self, stream, address):
+        self.stream = stream
+        self.address = address
+        self.fps = 0
+        # Levels中的质量等级
+        self.level = 0
+        # 已发送的最后一帧
+        self.sequence = 0
+        # 推送协程是否在运行
+        self.pushing = False
+        self.sendRate = RateMeter()
+        # 从读取摄像头到发送完成
+        self.latency = Meter()
+        # 上一个时间窗口中等待网络的时间占比
+        self.busy = 0
+        self._windowStart = None
+        self._blocked = 0
+        # 连续空闲的窗口数, 达到_upgradeAfter时提高质量
+        self._calm = 0
+        self._upgradeAfter = 2
+        self._upgraded = False
+
+    def adapt(self, blocked, now):
+        """blocked为这一帧等待发送完成的时间, 返回等级是否变化
+        发送缓冲区满之前写入是立即完成的, 所以按时间窗口统计等待的总时间
+        """
+        self._blocked += blocked
+        if self._windowStart is None:
+            self._windowStart = now
+        elapsed = now - self._windowStart
+        if elapsed < WINDOW:
+            return False
+        self.busy = self._blocked / elapsed
+        self._windowStart, self._blocked = now, 0
+        if self.busy > 0.5 and self.level < len(Levels) - 1:
+            if self._upgraded:
+                # 刚提高就跟不上了, 下次等久一点再试
+                self._upgradeAfter = min(self._upgradeAfter * 2, 32)
+            self.level += 1
+            self._calm = 0
+            self._upgraded = False
+            return True
+        if self.busy > 0.1:
+            self._calm = 0
+            return False
+        self._calm += 1
+        self._upgraded = False
+        if self._calm >= self._upgradeAfter and self.level > 0:
+            self.level -= 1
+            self._calm = 0
+            self._upgraded = True
+            return True
+        return False
 
-    IMAGE = None
 
-    def __init__(self, cap, *args, **kwargs):
+class EchoServer(TCPServer):
+
+    def __init__(self, broadcaster, *args, **kwargs):
         super(EchoServer, self).__init__(*args, **kwargs)
-        self.cap = cap
+        self.broadcaster = broadcaster
+        self.subscribers = set()
+        # 最新编码的一帧
+        self.latest = None
+        self._newFrame = Condition()
+        loop = IOLoop.current()
+        # 在摄像头线程中调用, 转到IOLoop中通知所有客户端
+        broadcaster.callback = lambda frame: loop.add_callback(self._onFrame, frame)
+        self._statsTimer = PeriodicCallback(self.logStats, 5000)
+        self._statsTimer.start()
         self.init()
 
     def init(self):
@@ -99,58 +183,138 @@ class EchoServer(TCPServer):
         except:
             pass
 
+    def execute(self, stream, data):
+        """执行控制命令, 成功时原样回复"""
+        try:
+            ver, value = data.decode().split(':')
+            if ver == 'L':
+                self.lr(int(value))
+            elif ver == 'R':
+                self.lr(int(value))
+            elif ver == 'F':
+                self.forward(int(value))
+            elif ver == 'B':
+                self.back(int(value))
+        except Exception:
+            data = b''
+        # 不等待发送完成, 最多排在正在发送的一帧图片后面
+        stream.write(message(Reply, data))
+
+    def _onFrame(self, frame):
+        self.latest = frame
+        self._newFrame.notify_all()
+
+    def subscribe(self, subscriber, fps):
+        subscriber.fps = fps
+        if fps:
+            self.subscribers.add(subscriber)
+        else:
+            self.subscribers.discard(subscriber)
+        self.broadcaster.use(s.level for s in self.subscribers)
+        if fps and not subscriber.pushing:
+            subscriber.pushing = True
+            IOLoop.current().spawn_callback(self.pushFrames, subscriber)
+
+    def stats(self):
+        """摄像头线程和每个客户端的统计"""
+        return dict(self.broadcaster.stats(), clients=[{
+            'address': s.address,
+            'level': s.level,
+            'busy': s.busy,
+            'fps': s.sendRate.rate,
+            'latency': s.latency.value * 1000,
+        } for s in self.subscribers])
+
+    def logStats(self):
+        if not self.subscribers:
+            return
+        stats = self.stats()
+        logger.info("capture %.1ffps, read %.1fms, encode %.1fms",
+                    stats['fps'], stats['read'], stats['encode'])
+        for client in stats['clients']:
+            logger.info("  %s level %d, %.1ffps, latency %.1fms, busy %d%%",
+                        client['address'][0], client['level'], client['fps'],
+                        client['latency'], client['busy'] * 100)
+
+    @gen.coroutine
+    def pushFrames(self, subscriber):
+        """推送最新的一帧, 上一帧发送完才发送下一帧, 网络慢时跳过中间的帧"""
+        stream = subscriber.stream
+        loop = IOLoop.current()
+        try:
+            while subscriber.fps and not stream.closed():
+                frame = self.latest
+                if frame is None or frame.sequence == subscriber.sequence:
+                    yield self._newFrame.wait(timedelta(seconds=1))
+                    continue
+                begin = loop.time()
+                data = memoryview(frame.get(subscriber.level)).cast('B')
+                subscriber.sequence = frame.sequence
+                stream.write(frameHeader(frame.sequence, frame.timestamp, len(data)))
+                yield stream.write(data)
+                subscriber.sendRate.tick()
+                subscriber.latency.add(time.time() - frame.timestamp)
+                if subscriber.adapt(loop.time() - begin, loop.time()):
+                    self.broadcaster.use(s.level for s in self.subscribers)
+                if subscriber.fps < self.broadcaster.fps:
+                    # 客户端要求的帧数比摄像头低
+                    yield gen.sleep(max(0, 1 / subscriber.fps - (loop.time() - begin)))
+        except StreamClosedError:
+            pass
+        except Exception as e:
+            print(e)
+        finally:
+            subscriber.pushing = False
+
     @gen.coroutine
     def handle_stream(self, stream, address):
+        stream.set_nodelay(True)
+        stream.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        subscriber = Subscriber(stream, address)
         while True:
             try:
-                data = yield stream.read_until(b"\n")
-#                 logger.info("Received bytes: %s", data)
-                if not data.endswith(b"\n"):
-                    data = data + b"\n"
-                if data == b'getimage\n' and self.cap and self.cap.isOpened():
-                    _, frame = self.cap.read()  # 读取一帧图片
-                    if str(type(frame)).find('ndarray') > -1:
-                        frame = cv2.resize(frame, SIZE)
-                        ret, data = cv2.imencode('.jpg', frame, PARAM)
-                        if ret:
-                            yield stream.write(data.tostring())  # 发送图片
-                else:
-                    try:
-                        ver, value = data.decode().split(':')
-                        if ver == 'L':
-                            self.lr(int(value))
-                        elif ver == 'R':
-                            self.lr(int(value))
-                        elif ver == 'F':
-                            self.forward(int(value))
-                        elif ver == 'B':
-                            self.back(int(value))
-                        yield stream.write(data)
-                    except:
-                        yield stream.write(b'\n')
+                kind, length = Header.unpack((yield stream.read_bytes(Header.size)))
+                if length > MaxLength:
+                    logger.warning("Bad message from %s", address[0])
+                    self.subscribe(subscriber, 0)
+                    stream.close()
+                    break
+                data = (yield stream.read_bytes(length)) if length else b''
+                if kind == Command:
+                    self.execute(stream, data)
+                elif kind == Subscribe and len(data) == SubscribeBody.size:
+                    self.subscribe(subscriber, *SubscribeBody.unpack(data))
             except StreamClosedError:
                 logger.warning("Lost client at host %s", address[0])
+                self.subscribe(subscriber, 0)
                 break
             except Exception as e:
                 print(e)
 
 
-def start(cap):
-    """启动服务器"""
-    options.parse_command_line()
-    server = EchoServer(cap)
+def start(source):
+    """启动摄像头线程和服务器"""
+    broadcaster = Broadcaster(source, FPS, SIZE)
+    broadcaster.start()
+    server = EchoServer(broadcaster)
     server.listen(options.port)
     logger.info("Listening on TCP port %d", options.port)
     IOLoop.current().start()
 
 
 if __name__ == "__main__":
+    options.parse_command_line()
     cap = None
     try:
-        cap = cv2.VideoCapture(0)  # 开启摄像头
-        atexit.register(lambda: cap.release())
+        if options.synthetic or cv2 is None:
+            # 没有摄像头时用生成的图片测试
+            source = SyntheticSource()
+        else:
+            cap = cv2.VideoCapture(0)  # 开启摄像头
+            atexit.register(lambda: cap.release())
+            source = CameraSource(cap)
         atexit.register(lambda: GPIO.cleanup())
-        start(cap)
+        start(source)
     except Exception as e:
         print(e)
     if cap:
@@ -1,11 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 from PyQt5 import uic
-from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QPixmap, QImage
-from PyQt5.QtNetwork import QTcpSocket
+from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import QWidget
 
+from Lib.CarSocket import CarSocket  # @UnresolvedImport
+
 
 # Created on 2018年4月18日
 # author: Irony
@@ -24,6 +24,8 @@ class ControlCar(QWidget):
 
     HOST = '127.0.0.1'
     PORT = 8888
+    # 服务器推送图片的帧数
+    FPS = 5
 
     def __init__(self, *args, **kwargs):
         super(ControlCar, self).__init__(*args, **kwargs)
@@ -44,34 +46,30 @@ class ControlCar(QWidget):
         self.sliderLeft.setEnabled(False)
         self.sliderRight.setEnabled(False)
 
-        # 定时器定时向图片服务器发送请求
-        self._timer = QTimer(self, timeout=self.doGetImage)
-
     def _clearConn(self):
         """清理连接"""
         if self._connCar:
-            self._connCar.close()
+            self._connCar.shutdown()
             self._connCar.deleteLater()
             del self._connCar
             self._connCar = None
 
     def closeEvent(self, event):
         """窗口关闭事件"""
-        self._timer.stop()
         self._clearConn()
         super(ControlCar, self).closeEvent(event)
 
     def doConnect(self):
         """连接服务器"""
         self.buttonConnect.setEnabled(False)
-        self._timer.stop()
         self._clearConn()
         self.browserResult.append('正在连接服务器')
         # 连接控制小车的服务器
-        self._connCar = QTcpSocket(self)
+        self._connCar = CarSocket(self)
         self._connCar.connected.connect(self.onConnected)  # 绑定连接成功信号
         self._connCar.disconnected.connect(self.onDisconnected)  # 绑定连接丢失信号
-        self._connCar.readyRead.connect(self.onReadyRead)  # 准备读取信号
+        self._connCar.replyReceived.connect(self.onReply)  # 命令回复信号
+        self._connCar.frameReady.connect(self.onFrame)  # 图片解码完成信号
         self._connCar.error.connect(self.onError)  # 连接错误信号
         self._connCar.connectToHost(self.HOST, self.PORT)
 
@@ -84,12 +82,11 @@ class ControlCar(QWidget):
         self.sliderLeft.setEnabled(True)
         self.sliderRight.setEnabled(True)
         self.browserResult.append('连接成功')  # 记录日志
-        # 开启获取摄像头图片定时器
-        self._timer.start(200)
+        # 订阅摄像头图片, 服务器主动推送
+        self._connCar.subscribe(self.FPS)
 
     def onDisconnected(self):
         """丢失连接"""
-        self._timer.stop()
         self.buttonConnect.setEnabled(True)  # 按钮可用
         # 设置初始拉动条不可用
         self.sliderForward.setEnabled(False)
@@ -103,22 +100,16 @@ class ControlCar(QWidget):
         self.sliderRight.setValue(self.sliderRight.minimum())
         self.browserResult.append('丢失连接')  # 记录日志
 
-    def onReadyRead(self):
-        """接收到数据"""
-        while self._connCar.bytesAvailable() > 0:
-            try:
-                data = self._connCar.readAll().data()
-                if data and data.find(b'JFIF') > -1:
-                    self.qlabel.setPixmap(  # 图片
-                        QPixmap.fromImage(QImage.fromData(data)))
-                else:
-                    self.browserResult.append('接收到数据: ' + data.decode())
-            except Exception as e:
-                self.browserResult.append('解析数据错误: ' + str(e))
+    def onReply(self, data):
+        """接收到命令的回复"""
+        self.browserResult.append('接收到数据: ' + data.decode(errors='replace'))
+
+    def onFrame(self, frame):
+        """图片已经在线程中解码"""
+        self.qlabel.setPixmap(QPixmap.fromImage(frame.image))
 
     def onError(self, _):
         """连接报错"""
-        self._timer.stop()
         self.buttonConnect.setEnabled(True)  # 按钮可用
         self.browserResult.append('连接服务器错误: ' + self._connCar.errorString())
 
@@ -142,15 +133,10 @@ class ControlCar(QWidget):
         # 发送的内容为  R:1 类似的
         self.sendData('R:', str(value))
 
-    def doGetImage(self):
-        # 请求图片
-        self.sendData('getimage', '')
-
     def sendData(self, ver, data):
         """发送数据"""
-        if not self._connCar or not self._connCar.isWritable():
+        if not self._connCar or not self._connCar.sendCommand(ver + str(data)):
             return self.browserResult.append('服务器未连接或不可写入数据')
-        self._connCar.write(ver.encode() + str(data).encode() + b'\n')
 
 
 if __name__ == '__main__':
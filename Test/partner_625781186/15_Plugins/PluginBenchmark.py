@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+插件启动时间测试.
+"""
+
+"""
+Created on 2026-10-18 <br>
+description: 生成200个插件, 比较原来的启动方式(每个插件重写一次plugin.json, 启动时全部导入)
+    和 PluginManager(从清单注册, 分批/按需导入, 合并写入json) <br>
+    每种情况在新的进程中运行, 各自的临时目录: python PluginBenchmark.py [插件数] <br>
+author: 625781186@qq.com <br>
+site: https://github.com/625781186 <br>
+更多经典例子:https://github.com/892768447/PyQt <br>
+课件: https://github.com/625781186/WoHowLearn_PyQt5 <br>
+视频教程: https://space.bilibili.com/1863103/#/ <br>
+"""
+import importlib, json, os, shutil, subprocess, sys, tempfile, time
+from fnmatch import fnmatch
+
+PLUGIN = '''# -*- coding: utf-8 -*-
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QPushButton
+
+# 实例化类名, 必须
+className = "Form"
+
+class Form(QWidget):
+    def __init__(self, parent=None):
+        super(Form, self).__init__(parent)
+        self.__mw = parent
+        layout = QHBoxLayout(self)
+        layout.addWidget(QLabel("{name} v{version}", self))
+        for i in range(3):
+            layout.addWidget(QPushButton("button%d" % i, self))
+
+    def getParentLayout(self):
+        return self.__mw.verticalLayout
+
+    def toInterface(self):
+        self.getParentLayout().addWidget(self)
+{methods}
+'''
+
+METHOD = '''
+    def method{index}(self, values):
+        total = 0
+        for i, value in enumerate(values):
+            if value % {mod} == 0:
+                total += value * i
+            else:
+                total -= {index}
+        return total
+'''
+
+
+def writePlugin(folder, name, version=1):
+    methods = "".join(METHOD.format(index=i, mod=i % 5 + 2) for i in range(40))
+    with open(os.path.join(folder, name + ".py"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN.format(name=name, version=version, methods=methods))
+
+
+def makePlugins(root, count):
+    folder = os.path.join(root, "Plugins")
+    os.makedirs(folder)
+    for i in range(count):
+        writePlugin(folder, "PluginGen%03d" % i)
+    os.makedirs(os.path.join(root, "PluginManager"))
+
+
+def run(root, mode):
+    """在root中用新进程运行, 返回结果字典"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # 第二次启动使用__pycache__, 和平时一样
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), "--run", mode], cwd=root, env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def child(mode):
+    """子进程: 启动主窗口和插件管理器, 统计时间"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import (QApplication, QMainWindow, QMenuBar, QWidget,
+                                 QVBoxLayout)
+    app = QApplication(sys.argv)
+
+    class Window(QMainWindow):
+        def __init__(self):
+            super(Window, self).__init__()
+            self.menuBar = QMenuBar(self)
+            self.menuBar.setObjectName("menuBar")
+            self.setMenuBar(self.menuBar)
+            central = QWidget(self)
+            self.verticalLayout = QVBoxLayout(central)
+            self.setCentralWidget(central)
+
+    result = {}
+    begin = time.perf_counter()
+    window = Window()
+    window.show()
+
+    if mode == "eager":
+        # 原来的方式: 每个新插件重写一次json, 然后全部导入
+        from Tools.pmf_myjson import mfunc_AKrCVJson, mfunc_readJson, setting_flie
+        folder = os.path.join(os.path.abspath("./"), "Plugins")
+        sys.path.insert(0, folder)
+        try:
+            jsonPlugin = mfunc_readJson(setting_flie)
+        except:
+            jsonPlugin = {}
+        for name in sorted(os.listdir(folder)):
+            if not fnmatch(name, "Plugin*.py"):
+                continue
+            mod = name[:-3]
+            if mod not in jsonPlugin:
+                stat = os.stat(os.path.join(folder, name))
+                data = {"Allow": True,
+                        "CreateTime": time.strftime("%Y-%m-%d-%H:%M:%S", time.localtime(stat.st_ctime)),
+                        "ModifyTime": time.strftime("%Y-%m-%d-%H:%M:%S", time.localtime(stat.st_mtime))}
+                mfunc_AKrCVJson(mod, data)
+                jsonPlugin[mod] = data
+        for mod in jsonPlugin:
+            if jsonPlugin[mod]["Allow"]:
+                pluginObject = getattr(importlib.import_module(mod), "Form")(window)
+                pluginObject.toInterface()
+        def ready():
+            # 全部加载后事件循环才开始 , 窗口才能显示和响应
+            result["ready"] = result["loaded"] = time.perf_counter() - begin
+            result["stall"] = result["ready"]
+            result["imported"] = sum(name.startswith("PluginGen") for name in sys.modules)
+            app.quit()
+        QTimer.singleShot(0, ready)
+        app.exec_()
+        print(json.dumps(result))
+        return
+
+    from PluginManager.PluginManager import PluginManager
+    manager = PluginManager(window)
+    stall = {"last": None, "max": 0}
+
+    def tick():
+        now = time.perf_counter()
+        if stall["last"] is not None:
+            stall["max"] = max(stall["max"], now - stall["last"])
+        stall["last"] = now
+
+    ticker = QTimer(interval=0, timeout=tick)
+
+    def ready(*args):
+        if "ready" not in result:
+            result["ready"] = time.perf_counter() - begin
+            ticker.start()
+
+    def loaded():
+        # 修改插件后导入新插件还会发出allLoaded
+        if "loaded" in result:
+            return
+        result["loaded"] = time.perf_counter() - begin
+        result["stall"] = stall["max"]
+        result["imported"] = sum(name.startswith("PluginGen") for name in sys.modules)
+        ticker.stop()
+        if mode == "storm":
+            QTimer.singleShot(0, storm)
+        else:
+            manager.store.flush(wait=True)
+            app.quit()
+
+    def storm():
+        # 修改20个插件, 新增20个插件, 删除10个插件, 都在一次事件循环内
+        folder = manager.pluginDirs["pluginFolder"]
+        writes = manager.store.writes
+        reloads = []
+        manager.rescanned.connect(lambda added, removed, changed: reloads.append(
+            (len(added), len(removed), len(changed))))
+        for i in range(20):
+            writePlugin(folder, "PluginGen%03d" % i, version=2)
+        for i in range(20):
+            writePlugin(folder, "PluginNew%03d" % i)
+        for name in sorted(name for name in os.listdir(folder)
+                           if name.startswith("PluginGen"))[-10:]:
+            os.remove(os.path.join(folder, name))
+
+        def finish():
+            manager.store.flush(wait=True)
+            result["storm"] = {"rescans": reloads,
+                               "writes": manager.store.writes - writes}
+            app.quit()
+        # 等待合并和分批导入完成
+        QTimer.singleShot(manager.Debounce * 3, finish)
+
+    manager.rescanned.connect(ready)
+    manager.allLoaded.connect(loaded)
+    app.exec_()
+    print(json.dumps(result))
+
+
+def main(count):
+    print("%d plugins" % count)
+    print("%-26s %10s %12s %12s %9s" % ("", "window", "all loaded", "max stall", "imported"))
+
+    def show(name, result):
+        print("%-26s %8.0fms %10.0fms %10.0fms %9d" % (
+            name, result["ready"] * 1000, result["loaded"] * 1000,
+            result["stall"] * 1000, result["imported"]))
+        return result
+
+    for mode in ("eager", "manager"):
+        root = tempfile.mkdtemp()
+        try:
+            makePlugins(root, count)
+            show("%s, first run" % mode, run(root, mode))
+            show("%s, cached json" % mode, run(root, mode))
+            if mode == "manager":
+                # 只有10个自启动, 其它第一次使用时才导入
+                path = os.path.join(root, "PluginManager", "plugin.json")
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                for i, mod in enumerate(sorted(data)):
+                    data[mod]["Allow"] = i < 10
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                show("manager, 10 autostart", run(root, mode))
+                result = run(root, "storm")
+                print("change storm (20 modified, 20 added, 10 removed): "
+                      "rescans(added, removed, changed) %s, json writes %d" % (
+                          result["storm"]["rescans"], result["storm"]["writes"]))
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--run":
+        child(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -2,7 +2,12 @@
 """
 管理插件的加载 , 卸载 , 监控文件的添加/删除.
 """
-import os, time, sys , importlib, sip, traceback
+import os, time, sys , importlib, traceback
+from fnmatch import fnmatch
+try:
+    from PyQt5 import sip
+except ImportError:
+    import sip
 # ==添加插件的搜索路径==
 #__file__ 为此文件路径 , 在ipython里是测不出来的
 pluginsManagerPath = os.path.dirname(os.path.abspath(__file__))
@@ -12,16 +17,14 @@ mainPath           = os.path.dirname(pluginsManagerPath)
 pluginsPath        =  os.path.join( mainPath, "Plugins")
 pluginsPath2       =  os.path.join( os.path.dirname(sys.argv[0]), "Plugins")
 #以后可能会有其他插件目录
-AllPluginsPath     = {"customer":pluginsPath, 
+AllPluginsPath     = {"customer":pluginsPath,
                    "afterPacket":pluginsPath2}
 #设置模块搜索路径
 for key in AllPluginsPath :
     if AllPluginsPath[key] not in sys.path:
-        sys.path.insert(0, AllPluginsPath[key]) 
+        sys.path.insert(0, AllPluginsPath[key])
 # ==添加插件的搜索路径==
 
-from copy import deepcopy
-
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
@@ -29,33 +32,64 @@ from PyQt5.QtWidgets import *
 from PluginManager.PluginStore import PluginStore
 from PluginManager.PluginStore.StoreModel import FileModel
 
-from Tools.pmf_myjson import *
+from Tools.pmf_myjson import setting_flie
+from Tools.pmf_jsonStore import JsonStore
 
 "setting_flie -> From Tools.pmf_myjson , json写入的位置"
 
 class PluginManager(QObject):
     """
     管理插件的加载 , 卸载 , 监控文件的添加/删除.
+    - 启动时从 plugin.json(清单) 注册插件, 不导入
+    - 自启动的插件在事件循环中分批导入, 其它插件在第一次使用(load/plugin)时导入
+    - 文件的增删改合并后只扫描一次目录, 只处理变化的插件
+    - 所有json配置都通过 self.store 修改, 异步写入
     """
+    # 插件文件名
+    NameFilter = "Plugin*.py"
+    # 每次事件循环导入插件的最长时间(毫秒), 超过后先处理界面事件
+    LoadBudget = 50
+    # 文件变化后等待的毫秒数, 期间的变化合并为一次扫描
+    Debounce   = 200
+
+    # 插件导入并实例化之后
+    pluginLoaded = pyqtSignal(str)
+    # 自启动的插件全部导入之后
+    allLoaded    = pyqtSignal()
+    # 扫描目录之后 (新增, 删除, 修改)
+    rescanned    = pyqtSignal(list, list, list)
+
     def __init__(self, parent=None, *args, **kwargs):
         super(PluginManager, self).__init__(parent, *args, **kwargs)
         self.__mw = parent
-        self.__initUI()
 
         self.pluginDirs = {"pluginFolder": os.path.join(
-        os.path.abspath("./"), 
+        os.path.abspath("./"),
         "Plugins"), }
+        if self.pluginDirs["pluginFolder"] not in sys.path:
+            sys.path.insert(0, self.pluginDirs["pluginFolder"])
 
         self.header = ["PlugName",
                        "Allow", "CreateTime", "ModifyTime"]
 
         self.pluginsInfo = {
             "StartModule": {},
-            
-        }
-        # self.jsonPlugin   :{插件名:{header参数}}
 
-        self.jsonPlugin = None
+        }
+        # self.jsonPlugin   :{插件名:{header参数, Size, MTimeNs}} , 就是 self.store.data
+        self.store      = JsonStore(setting_flie, self)
+        self.jsonPlugin = self.store.data
+
+        self.started = False
+        # 等待自启动的插件
+        self.__pending  = []
+        self.__loadTimer = QTimer(self, interval=0, timeout=self.__loadBatch)
+        self.__rescanTimer = QTimer(self, singleShot=True,
+                                    interval=self.Debounce,
+                                    timeout=self.rescan)
+
+        self.startGetPlugin(self.pluginDirs['pluginFolder'])
+        self.__initUI()
 
     def __initUI(self):
 
@@ -66,7 +100,7 @@ class PluginManager(QObject):
                                     triggered=self.__createPluginStoreDialog)
 
             mw.menuBar.addAction(mw.menuPlugin)
-            
+
         else:
             QMessageBox.information(mw, "", "主窗体没有菜单栏, 请先创建.")
 
@@ -74,12 +108,18 @@ class PluginManager(QObject):
         self.model = FileModel(self)
         self.model.setRootPath("./Plugins")
         self.model.setFilter(QDir.Files)
-        self.model.setNameFilters(["Plugin*.py"])
+        self.model.setNameFilters([self.NameFilter])
         self.model.setNameFilterDisables(False);
         self.index = self.model.index("./Plugins")
-        
+
         self.model.directoryLoaded.connect(self.start)
-                
+
+        # 目录的增删和已导入插件的修改
+        self.watcher = QFileSystemWatcher([self.pluginDirs["pluginFolder"]], self)
+        self.watcher.directoryChanged.connect(self.scheduleRescan)
+        self.watcher.fileChanged.connect(self.__fileChanged)
+        self.__watched = set()
+
     def __createPluginStoreDialog(self):
         """
         显示插件加载情况的 窗体.
@@ -89,145 +129,186 @@ class PluginManager(QObject):
 
         self.dia.show()
 
-    def __m_rowsRemoved(self, index, first, last):
+    def watch(self, path, on=True):
         """
-        文件被删除或重命名时候被调用.
+        监视/取消监视已导入插件的文件.
         """
-        print("removeName:", self.model.index(first, 0, index).data(),first )
-        mod = (self.model.index(first, 0, index).data())[:-3]
-
-        self.unload(mod)
-        self.pluginsInfo["StartModule"].pop(mod)
-        self.delJson(self.jsonPlugin , self.pluginsInfo["StartModule"])  
-        
-        # pop的步骤u已经在deljson中执行
-        # self.jsonPlugin.pop(mod)      
-        
-    def __m_rowsInserted(self, index, first, last):
+        watched = path in self.__watched
+        if on and not watched and os.path.exists(path):
+            self.watcher.addPath(path)
+            self.__watched.add(path)
+        elif not on and watched:
+            self.watcher.removePath(path)
+            self.__watched.discard(path)
+
+    def __fileChanged(self, path):
+        # 替换保存的文件会从监视中移除 , rescan 时重新添加
+        if path not in self.watcher.files():
+            self.__watched.discard(path)
+        self.scheduleRescan()
+
+    def scheduleRescan(self, *args):
         """
-        文件增加或重命名时候被调用.
+        文件变化时调用, 重新计时, 连续的变化只扫描一次.
         """
-        print("insertName:", self.model.index(first, 0, index).data(), first)
-        f = self.model.index(first, 0, index).data()
-        mod = f[:-3]
-        
-        fullPath = os.path.join(self.pluginDirs["pluginFolder"], f)
-        self.pluginsInfo["StartModule"][mod] = {"path": fullPath}
-        mod, data = self.addJson(fullPath, mod)
-        
-        self.jsonPlugin[mod] = data
-        
-        self.load(mod)
+        self.__rescanTimer.start()
 
     def start(self):
         """
-        self.model 异步加载完成之后开始调用 self.startGetPlugin.
+        self.model 异步加载完成之后 , 对比目录和清单 , 开始自启动插件.
         """
-        self.jsonPlugin = self.startGetPlugin(self.pluginDirs['pluginFolder'])
-#        print("jsonPlugin:", self.jsonPlugin,"\n",
-#              "pluginsModule:", self.pluginsInfo)
-        self.loadAll()
-        
-        self.model.rowsAboutToBeRemoved.connect(self.__m_rowsRemoved)
-        self.model.rowsInserted.connect(self.__m_rowsInserted)        
         self.model.directoryLoaded.disconnect(self.start)
+        self.rescan()
+        self.started = True
+        self.loadAll()
+
+        self.model.rowsAboutToBeRemoved.connect(self.scheduleRescan)
+        self.model.rowsInserted.connect(self.scheduleRescan)
         self.__createPluginStoreDialog()
-        
-    def startGetPlugin(self, pluginFolder: "./Plugins", CHANGE=False) -> "FoJson":
+
+    def startGetPlugin(self, pluginFolder: "./Plugins") -> "FoJson":
         """
-        1 . 程序启动加载插件.
+        1 . 程序启动时从清单注册插件 , 不访问插件文件.
         """
-        try:
-            jsonPlugin = mfunc_readJson(setting_flie)
-
-        except:
-            jsonPlugin = {}
-
-        pluginInfo = {}
+        for module in self.jsonPlugin:
+            self.register(module, os.path.join(pluginFolder, module + ".py"))
+        return self.jsonPlugin
 
-        rowCount = self.model.rowCount(self.index)
+    def register(self, module, fullPath):
+        self.pluginsInfo["StartModule"].setdefault(
+            module, {"path": fullPath, "active": False})
 
-        for row in range(rowCount):
-            index = self.model.index(row, 0, self.index)
-            # 文件名
-            f = index.data()
-            # 去掉后缀 , 加入模块
-            module = f[:-3]
-            fullPath = os.path.join(pluginFolder, f)
-
-            pluginInfo[module] = {"path": fullPath}
-
-            if module not in jsonPlugin:
-                module, data = self.addJson(fullPath, module)
-                jsonPlugin[module]=data
-
-
-        if CHANGE is False:
-            self.pluginsInfo["StartModule"] = deepcopy(pluginInfo)
-
-        jsonPlugin = self.delJson({}, pluginInfo)
-        
-#        print("jsonPlugin",jsonPlugin, "\n",  "pluginInfo",pluginInfo )
-        
-        return jsonPlugin
-
-    def addJson(self, fullPath, module) -> "ToJson":
+    def scanFolder(self, pluginFolder):
+        """
+        {模块名: (路径, os.stat_result)}
+        """
+        files = {}
+        try:
+            entries = list(os.scandir(pluginFolder))
+        except OSError:
+            return files
+        for entry in entries:
+            if fnmatch(entry.name, self.NameFilter) and entry.is_file():
+                files[entry.name[:-3]] = (entry.path, entry.stat())
+        return files
+
+    def rescan(self):
         """
-        1.1写入插件 的json配置.
+        1.1 对比目录和清单 , 只处理新增 , 删除和修改过的插件.
         """
+        self.__rescanTimer.stop()
+        pluginFolder = self.pluginDirs["pluginFolder"]
+        files = self.scanFolder(pluginFolder)
+        registered = self.pluginsInfo["StartModule"]
+
+        removed = [mod for mod in registered if mod not in files]
+        added   = [mod for mod in files if mod not in registered]
+        changed = []
+        for mod, (fullPath, stat) in files.items():
+            data = self.jsonPlugin.get(mod)
+            if data is None or mod not in registered:
+                continue
+            if data.get("Size") != stat.st_size or \
+                    data.get("MTimeNs") != stat.st_mtime_ns:
+                changed.append(mod)
+
+        for mod in removed:
+            self.unload(mod)
+            registered.pop(mod)
+            self.delJson(mod)
+        for mod in added:
+            self.register(mod, files[mod][0])
+            self.addJson(files[mod][0], mod, files[mod][1])
+            if self.started and self.jsonPlugin[mod]["Allow"]:
+                self.__pending.append(mod)
+        for mod in changed:
+            self.addJson(files[mod][0], mod, files[mod][1])
+            # 只重载已经导入的 , 没导入的下次使用时自然是新的
+            if registered[mod].get("active"):
+                self.reload(mod)
+
+        # 替换保存的编辑器会让文件从监视中移除 , 重新添加
+        for mod, info in registered.items():
+            if info.get("active"):
+                self.watch(info["path"])
+
+        if self.__pending:
+            self.__loadTimer.start()
+        self.rescanned.emit(added, removed, changed)
+        return added, removed, changed
+
+    def addJson(self, fullPath, module, stat=None) -> "ToJson":
+        """
+        1.2写入插件 的json配置 , 保留原来的Allow.
+        """
+        stat = stat or os.stat(fullPath)
         # 插件创建时间
-        _ctime = time.localtime(os.stat(fullPath).st_ctime)
-        ctime = time.strftime("%Y-%m-%d-%H:%M:%S", _ctime)
+        ctime = time.strftime("%Y-%m-%d-%H:%M:%S", time.localtime(stat.st_ctime))
         # 插件修改时间
-        _mtime = time.localtime(os.stat(fullPath).st_mtime)
-        mtime = time.strftime("%Y-%m-%d-%H:%M:%S", _mtime)
+        mtime = time.strftime("%Y-%m-%d-%H:%M:%S", time.localtime(stat.st_mtime))
         # 写入配置
-        data =  {
-                    self.header[1]: True,   # allow
-                    self.header[2]: ctime,  # cteateTime
+        data = self.jsonPlugin.get(module, {})
+        self.store.update(module, **{
+                    self.header[1]: data.get(self.header[1], True),   # allow
+                    self.header[2]: data.get(self.header[2], ctime),  # cteateTime
                     self.header[3]: mtime,  # modifyTime
-                }
-        mfunc_AKrCVJson(module, data , self=self)
-        
-        return module, data
-        
-    def delJson(self, jsonPlugin, pluginInfo) -> "ToJson":
+                    "Size"        : stat.st_size,
+                    "MTimeNs"     : stat.st_mtime_ns,
+                })
+
+        return module, self.jsonPlugin[module]
+
+    def delJson(self, module) -> "ToJson":
         """
-        1.2删除插件 的json配置.
+        1.3删除插件 的json配置.
         """
-        # 添加完重新加载一遍看是否有插件删除
-        if jsonPlugin == {}:
-            jsonPlugin = mfunc_readJson(setting_flie)
+        self.store.remove(module)
+        return self.jsonPlugin
+
+    def setAllow(self, module, allow):
+        """
+        允许/禁止 插件的自启动.
+        """
+        self.store.update(module, **{self.header[1]: allow})
 
-        if len(jsonPlugin) - len(pluginInfo):
-            long, short = jsonPlugin, pluginInfo
-        else:
-            long, short = pluginInfo, jsonPlugin
-
-        with open(setting_flie, 'a+', encoding='utf-8') as f:
-            # 被删除的插件集合
-            delPlugin = set(long) - set(short)
-            for item in delPlugin:
-                jsonPlugin.pop(item)
-            # 写入配置
-            mfunc_reDumpJson(f, jsonPlugin)
-            
-        return jsonPlugin
-   
     # 加载所有插件
     def loadAll(self):
         """
-        2.加载所有模块.
+        2.分批加载所有自启动的插件 , 不阻塞界面.
         """
         for mod in self.jsonPlugin:
+            if mod not in self.pluginsInfo["StartModule"]:
+                continue
             if self.jsonPlugin[mod]["Allow"]:
-                try:
-                    self.load(mod)
-                except:
-                    continue
+                self.__pending.append(mod)
             else:
                 self.pluginsInfo["StartModule"][mod]["active"] = False
-                
+        self.__loadTimer.start()
+
+    def __loadBatch(self):
+        deadline = time.perf_counter() + self.LoadBudget / 1000
+        while self.__pending and time.perf_counter() < deadline:
+            mod = self.__pending.pop(0)
+            info = self.pluginsInfo["StartModule"].get(mod)
+            if info is None or info.get("active"):
+                continue
+            try:
+                self.load(mod)
+            except:
+                continue
+        if not self.__pending:
+            self.__loadTimer.stop()
+            self.allLoaded.emit()
+
+    def plugin(self, mod):
+        """
+        插件的实例 , 没有导入时先导入.
+        """
+        info = self.pluginsInfo["StartModule"][mod]
+        if not info.get("active"):
+            self.load(mod)
+        return info.get("old")
+
     # 加载插件
     def load(self, mod: "str"):
         """
@@ -236,27 +317,30 @@ class PluginManager(QObject):
         try:
             # 动态载入模块
             _pluginModule = importlib.import_module(mod)
-            
+
         except:
-            
+
             errmsg = traceback.format_exc()
-            
+
             QMessageBox.information(self.__mw,
                                     "模块导入异常",
                                     "%s,请在%s.py检查模块."%(errmsg,mod ))
 
             self.pluginsInfo["StartModule"][mod]["active"] = False
-            
+
             return False
-            
-        self.instantiation(mod, _pluginModule)
-            
+
+        if self.instantiation(mod, _pluginModule) is False:
+            return False
+        self.watch(self.pluginsInfo["StartModule"][mod]["path"])
+        self.pluginLoaded.emit(mod)
+
         return True
-            
+
     def instantiation(self , mod, moduleObj , NeedRplace = False):
         """
         2.1.1    实例化类.
-        2.2.1.1  
+        2.2.1.1
         3.1.1
         实例化新对象来替换旧对象.
         """
@@ -265,29 +349,30 @@ class PluginManager(QObject):
             pluginClass = getattr(moduleObj,  className )
         except:
             self.pluginsInfo["StartModule"][mod]["active"]  = False
-            errmsg = traceback.format_exc()  
+            errmsg = traceback.format_exc()
             QMessageBox.information(self.__mw,
                                     "插件加载错误",
                                     "%s ,请在%s.py全局指定className值." % (errmsg, mod))
-            return False            
+            return False
         # 如果是替换对象需求 ,和初始化
-            
-        # 实例化类 
+
+        # 实例化类
         try:
             pluginObject = pluginClass(self.__mw)
             pluginObject.setObjectName(mod)
-    
+
             self.pluginsInfo["StartModule"][mod]["active"]      = True
             self.pluginsInfo["StartModule"][mod]["pluginClass"] = pluginClass
             self.pluginsInfo["StartModule"][mod]["parent"]      = pluginObject.parent()
         except:
 
             self.pluginsInfo["StartModule"][mod]["active"]  = False
-            errmsg = traceback.format_exc()  
+            errmsg = traceback.format_exc()
             QMessageBox.information(self.__mw,
                                     "插件加载错误",
                                     "%s ,请在%s.py全局指定className值." % (errmsg, mod))
-        
+            return False
+
         if  not NeedRplace:
             #TODO:其他接口
             layout = pluginObject.getParentLayout()
@@ -297,38 +382,50 @@ class PluginManager(QObject):
         else:
             self.pluginsInfo["StartModule"][mod]["new"] = pluginObject
             return pluginObject
-            
+
     # 重载插件
     def reload(self, mod):
         """
-        2.2 重载插件.
+        2.2 重载插件 , 用新对象替换旧对象.
         """
-        if mod in sys.modules:
-            #TODO: 旧对象替换
-            print("reload")
-            importlib.reload(sys.modules[mod])
+        info = self.pluginsInfo["StartModule"][mod]
+        if mod in sys.modules and info.get("old") is not None:
             moduleObj = sys.modules[mod]
+            # 重载失败时恢复 , 继续使用旧模块和旧对象
+            oldDict = dict(moduleObj.__dict__)
+            oldInfo = dict(info)
             try:
+                importlib.reload(moduleObj)
                 objInfo = self.findOldObj(mod, moduleObj , True)
             except:
                 errmsg = traceback.format_exc()
-                
+
                 QMessageBox.information(self.__mw,
                                         "模块导入异常",
                                         "%s,请在%s.py检查模块."%(errmsg,mod ))
-                
+                objInfo = None
+
+            if objInfo is None or objInfo["newObj"] in (None, False):
+                moduleObj.__dict__.clear()
+                moduleObj.__dict__.update(oldDict)
+                sys.modules[mod] = moduleObj
+                info.clear()
+                info.update(oldInfo)
+                return False
+
             oldObj, newObj, layout = objInfo["oldObj"],\
                                      objInfo["newObj"],\
                                      objInfo["layout"]
-                                     
+
             # 新对象替换旧对象 ， 并把地址赋值给旧对象
             layout.replaceWidget(oldObj, newObj )
-            self.pluginsInfo["StartModule"][mod]["old"] = newObj
+            info["old"] = newObj
             oldObj.flag="reload"
             sip.delete(oldObj)
+            return True
         else:
-            self.load(mod)
-    
+            return self.load(mod)
+
     def findOldObj(self, mod, moduleObj=None,  needRplace = False):
         """
         3.1
@@ -344,40 +441,44 @@ class PluginManager(QObject):
                 QMessageBox.information(self.__mw,
                         "错误",
                         "请传入moduleObj值.")
+                newObj = None
             else:
                 newObj = self.instantiation(mod, moduleObj, needRplace)
         else:
             newObj = None
-            
+
         return {
-                "oldObj"      :oldObj , 
-                "newObj"      :newObj ,  
-                "parentWidget":parentWidget, 
-                "layout"      :layout, 
-                "pluginClass" :pluginClass, 
+                "oldObj"      :oldObj ,
+                "newObj"      :newObj ,
+                "parentWidget":parentWidget,
+                "layout"      :layout,
+                "pluginClass" :pluginClass,
                 }
-            
+
     # 卸载插件
     def unload(self, mod: "str"):
         """
         3. 卸载插件 , 移除模块.
         """
-        if mod in sys.modules:
-            self.pluginsInfo["StartModule"][mod]["active"] = False
+        info = self.pluginsInfo["StartModule"].get(mod, {})
+        if mod in sys.modules and info.get("old") is not None:
+            info["active"] = False
             #删除对象
             objInfo = self.findOldObj(mod)
-            oldObj  = objInfo["oldObj"] 
+            oldObj  = objInfo["oldObj"]
             oldObj.flag="unload"
             sip.delete(oldObj)
 
-            self.pluginsInfo["StartModule"][mod]["old"] = None
+            info["old"] = None
             sys.modules.pop(mod)
-        
+            self.watch(info["path"], False)
+
         return True
-        
+
     # 卸载所有插件
     def unloadAll(self):
-        pass
-        
+        for mod in list(self.pluginsInfo["StartModule"]):
+            self.unload(mod)
+
     def PluginToInterFace(self):
         pass
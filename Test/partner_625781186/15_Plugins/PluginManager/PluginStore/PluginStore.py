@@ -145,11 +145,9 @@ class PluginStore(QDialog, Ui_Dialog):
 
             # 取消打勾 , 即取消自启插件
             if msg==QMessageBox.Yes:
-                mfunc_AKrCVJson([mod, "Allow"], False)
-                self.manager.jsonPlugin[mod]["Allow"] = False
+                self.manager.setAllow(mod, False)
         else:
             # 转变为打勾 , 即自启插件
             QMessageBox.information(self, "允许", "已允许插件自启.")
-            mfunc_AKrCVJson([mod, "Allow"], True)
-            self.manager.jsonPlugin[mod]["Allow"] = True
+            self.manager.setAllow(mod, True)
 
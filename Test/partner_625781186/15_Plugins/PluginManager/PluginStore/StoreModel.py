@@ -83,8 +83,9 @@ class FileModel(QFileSystemModel):
 
             if column == PluginFileCol:
                 mod = index.data()[:-3]
+                # 文件刚出现 , 还没有扫描到时不打勾
                 return (Qt.Checked 
-                    if self.manager.pluginsInfo["StartModule"][mod]["active"]
+                    if self.manager.pluginsInfo["StartModule"].get(mod, {}).get("active")
                     else Qt.Unchecked)
             elif column == AutoStartCol:
                 
@@ -92,18 +93,18 @@ class FileModel(QFileSystemModel):
                                 self.manager.index).data()[:-3]
              
                 return (Qt.Checked 
-                    if self.manager.jsonPlugin[mod]["Allow"]
+                    if self.manager.jsonPlugin.get(mod, {}).get("Allow")
                     else Qt.Unchecked)
         # 文本角色
         if role == Qt.DisplayRole:
             if  column == CTime:
                 mod = self.index(index.row(), PluginFileCol,
                                 self.manager.index).data()[:-3]    
-                return self.manager.jsonPlugin[mod]["CreateTime"]
+                return self.manager.jsonPlugin.get(mod, {}).get("CreateTime")
             elif column == AutoStartCol:
                 mod = self.index(index.row(), PluginFileCol,
                                 self.manager.index).data()[:-3]    
-                return str(self.manager.jsonPlugin[mod]["Allow"] )
+                return str(self.manager.jsonPlugin.get(mod, {}).get("Allow"))
         return super(FileModel,self).data(index , role)
         
     def setData(self, index, value, role = Qt.DisplayRole):
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+json配置的内存缓存.
+"""
+
+"""
+Created on 2026-10-18 <br>
+description: 所有修改只改内存中的字典, 合并后在线程中写入文件 <br>
+author: 625781186@qq.com <br>
+site: https://github.com/625781186 <br>
+更多经典例子:https://github.com/892768447/PyQt <br>
+课件: https://github.com/625781186/WoHowLearn_PyQt5 <br>
+视频教程: https://space.bilibili.com/1863103/#/ <br>
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json, os
+
+from PyQt5.QtCore import QObject, QTimer, QCoreApplication
+
+
+class JsonStore(QObject):
+    """
+    json配置的内存缓存.
+    set/update/remove 之后 delay 毫秒内的修改合并为一次写入,
+    序列化在主线程, 写文件在后台线程(临时文件再替换, 不会写出半个文件).
+    """
+    def __init__(self, path, parent=None, delay=500):
+        super(JsonStore, self).__init__(parent)
+        self.path = path
+        self.data = self.read()
+        # 写入文件的次数
+        self.writes = 0
+        self._dirty = False
+        self._future = None
+        self._executor = ThreadPoolExecutor(1)
+        self._timer = QTimer(self, singleShot=True, interval=delay,
+                             timeout=self.flush)
+        app = QCoreApplication.instance()
+        if app is not None:
+            # 退出前写完
+            app.aboutToQuit.connect(lambda: self.flush(wait=True))
+
+    def read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.changed()
+
+    def update(self, key, **values):
+        """
+        修改 data[key] 中的几个值, 没有时创建.
+        """
+        self.data.setdefault(key, {}).update(values)
+        self.changed()
+
+    def remove(self, key):
+        if self.data.pop(key, None) is not None:
+            self.changed()
+
+    def changed(self):
+        self._dirty = True
+        self._timer.start()
+
+    def flush(self, wait=False):
+        """
+        把修改写入文件, wait为True时等待写完.
+        """
+        self._timer.stop()
+        if self._dirty:
+            self._dirty = False
+            text = json.dumps(self.data, ensure_ascii=False, indent=1)
+            self._future = self._executor.submit(self._write, text)
+        if wait and self._future is not None:
+            self._future.result()
+
+    def _write(self, text):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        temp = self.path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp, self.path)
+        self.writes += 1
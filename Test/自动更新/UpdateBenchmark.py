@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: 自动更新.UpdateBenchmark
+@description: 在本地HTTP服务器上比较 下载完整zip并解压(原来的做法) 和 增量更新
+    版本二修改了几个.py, 在dll中改了几处并插入了一段数据, 新增和删除了一个文件
+    python UpdateBenchmark.py [模块数] [dll大小(MB)] [带宽(Mbit/s), 0为不限制]
+'''
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import os
+import random
+import shutil
+import sys
+import tempfile
+from threading import Thread
+import time
+from urllib.request import urlopen
+from zipfile import ZipFile, ZIP_DEFLATED
+
+import Updater  # @UnresolvedImport
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2017 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+MODULE = '''# -*- coding: utf-8 -*-
+
+
+def version():
+    return "{version}"
+
+
+def function{index}(values):
+    """module {index}"""
+    return [value * {index} for value in values if value % {mod}]
+'''
+
+
+class CountingHandler(SimpleHTTPRequestHandler):
+    """统计发送的字节数, 支持保持连接"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头和内容分两次发送, 不关闭Nagle时每个请求要等客户端延迟的ACK
+    disable_nagle_algorithm = True
+    sent = 0
+    requests = 0
+    # 限制带宽(字节/秒)
+    rate = 0
+
+    def copyfile(self, source, outputfile):
+        for chunk in iter(lambda: source.read(64 * 1024), b""):
+            outputfile.write(chunk)
+            CountingHandler.sent += len(chunk)
+            if self.rate:
+                time.sleep(len(chunk) / self.rate)
+        CountingHandler.requests += 1
+
+    def log_message(self, *args):
+        pass
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fp:
+        fp.write(data)
+
+
+def makeReleases(root, modules, dllSize):
+    """返回版本一和版本二的目录"""
+    rand = random.Random(1)
+    release1 = os.path.join(root, "release1")
+    release2 = os.path.join(root, "release2")
+    dll = bytes(rand.getrandbits(8) for _ in range(dllSize))
+    for index in range(modules):
+        write(os.path.join(release1, "mylibs", "m%03d.py" % index), MODULE.format(
+            version="0.0.1", index=index, mod=index % 7 + 2).encode())
+    write(os.path.join(release1, "mylibs", "__init__.py"), b"")
+    write(os.path.join(release1, "library.dll"), dll)
+    write(os.path.join(release1, "old.txt"), b"removed in 0.0.2\n" * 100)
+    shutil.copytree(release1, release2)
+    for index in range(0, modules, modules // 5 or 1):
+        write(os.path.join(release2, "mylibs", "m%03d.py" % index), MODULE.format(
+            version="0.0.2", index=index, mod=index % 7 + 2).encode())
+    # 修改几处并在中间插入4KB
+    patched = bytearray(dll)
+    for position in (dllSize // 5, dllSize // 2, dllSize * 4 // 5):
+        patched[position:position + 100] = bytes(100)
+    patched[dllSize // 3:dllSize // 3] = os.urandom(4096)
+    write(os.path.join(release2, "library.dll"), bytes(patched))
+    write(os.path.join(release2, "mylibs", "new.py"), b"VALUE = 2\n")
+    os.remove(os.path.join(release2, "old.txt"))
+    return release1, release2
+
+
+def same(a, b):
+    filesA, filesB = Updater.scan(a), Updater.scan(b)
+    if filesA.keys() != filesB.keys():
+        return False
+    return all(Updater.sha256File(filesA[path]) == Updater.sha256File(filesB[path])
+               for path in filesA)
+
+
+def fullZip(url, install):
+    with urlopen(url + "mylibs2.zip") as response:
+        data = response.read()
+    temp = os.path.join(install, "mylibs2.zip")
+    with open(temp, "wb") as fp:
+        fp.write(data)
+    with ZipFile(temp, "r") as zf:
+        zf.extractall(install)
+    os.remove(temp)
+
+
+def incremental(url, install):
+    updater = Updater.Updater(install, url)
+    updater.start().join()
+    updater.applyPending()
+
+
+def longestPause(url, install):
+    """后台下载时主线程两次循环之间最长的间隔(毫秒)"""
+    updater = Updater.Updater(install, url)
+    thread = updater.start()
+    pause = 0
+    last = time.perf_counter()
+    while thread.is_alive():
+        now = time.perf_counter()
+        pause = max(pause, now - last)
+        last = now
+    return pause * 1000
+
+
+def measure(name, function, url, release1, release2, root):
+    install = os.path.join(root, "install")
+    shutil.rmtree(install, ignore_errors=True)
+    shutil.copytree(release1, install)
+    CountingHandler.sent = CountingHandler.requests = 0
+    begin = time.perf_counter()
+    function(url, install)
+    elapsed = time.perf_counter() - begin
+    sent, requests = CountingHandler.sent, CountingHandler.requests
+    if function is fullZip:
+        # zip不会删除旧文件
+        os.remove(os.path.join(install, "old.txt"))
+    assert same(install, release2), name
+    print("%-22s %10.1fKB %9d %9.0fms" % (
+        name, sent / 1024, requests, elapsed * 1000))
+    return install
+
+
+if __name__ == "__main__":
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    dllSize = int(float(sys.argv[2]) * 1024 * 1024) if len(sys.argv) > 2 \
+        else 8 * 1024 * 1024
+    CountingHandler.rate = float(sys.argv[3]) * 1e6 / 8 if len(sys.argv) > 3 else 0
+    root = tempfile.mkdtemp()
+    server = None
+    try:
+        release1, release2 = makeReleases(root, modules, dllSize)
+        served = os.path.join(root, "server")
+        begin = time.perf_counter()
+        Updater.publish(release2, served, "0.0.2", [release1])
+        print("publish: %.1fs" % (time.perf_counter() - begin))
+        noDelta = os.path.join(root, "server", "nodelta")
+        Updater.publish(release2, noDelta, "0.0.2", [release1], deltas=False)
+        with ZipFile(os.path.join(served, "mylibs2.zip"), "w", ZIP_DEFLATED) as zf:
+            for path, full in Updater.scan(release2).items():
+                zf.write(full, path)
+
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(CountingHandler, directory=served))
+        Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://127.0.0.1:%d/" % server.server_address[1]
+
+        print("%d modules, %.1fMB dll, %s" % (
+            modules, dllSize / 1024 / 1024, "%gMbit/s" % (
+                CountingHandler.rate * 8 / 1e6) if CountingHandler.rate else "loopback"))
+        print("%-22s %12s %9s %11s" % ("", "transferred", "requests", "time"))
+        measure("full zip", fullZip, url, release1, release2, root)
+        measure("changed files", incremental, url + "nodelta/",
+                release1, release2, root)
+        install = measure("changed files+deltas", incremental, url,
+                          release1, release2, root)
+        # 已经是最新版本: 只下载清单, 文件的sha256来自state.json
+        CountingHandler.sent = 0
+        begin = time.perf_counter()
+        incremental(url, install)
+        print("%-22s %10.1fKB %9s %9.0fms" % (
+            "up to date", CountingHandler.sent / 1024, "",
+            (time.perf_counter() - begin) * 1000))
+        shutil.rmtree(install)
+        shutil.copytree(release1, install)
+        print("longest main thread pause while staging: %.1fms" % longestPause(
+            url, install))
+    finally:
+        if server:
+            server.shutdown()
+        shutil.rmtree(root)
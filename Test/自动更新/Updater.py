@@ -0,0 +1,489 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: 自动更新.Updater
+@description: 根据清单(manifest.json)增量更新
+    发布端(publish):
+      - manifest.json 记录版本、每个文件的sha256和大小、旧版本中有但是删除了的文件
+      - objects/<sha256>.z 为zlib压缩的完整文件
+      - deltas/<旧sha256>_<新sha256>.delta 为相对旧版本文件的二进制差异
+    客户端(Updater):
+      - 只下载sha256不同的文件, 本地有对应的旧版本时优先下载差异
+      - 在后台线程中下载到 .update/staging 并校验sha256, 程序继续运行
+      - 下次启动(导入模块之前)调用 applyPending 替换文件,
+        通过 .update/journal.json 保证中断后能恢复到替换前的状态
+    python Updater.py publish 新版本目录 输出目录 版本号 [旧版本目录 ...]
+'''
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+from threading import Thread
+from urllib.parse import urlsplit, quote
+import zlib
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2017 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+MANIFEST = "manifest.json"
+STATE_DIR = ".update"
+# 不参与更新的目录
+IGNORES = {STATE_DIR, "__pycache__"}
+
+CHUNK = 64 * 1024
+# 差异: 比较的块大小, 差异比压缩后的完整文件小这个比例才使用
+BLOCK = 64
+DELTA_RATIO = 0.8
+DELTA_MAGIC = b"UPDELTA1"
+# 从旧文件复制(偏移, 长度) / 插入新数据(长度)
+COPY = struct.Struct("<cQI")
+INSERT = struct.Struct("<cI")
+
+
+class UpdateError(Exception):
+    pass
+
+
+def sha256File(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def scan(root):
+    """{相对路径(用/分隔): 完整路径}"""
+    files = {}
+    for path, dirs, names in os.walk(root):
+        dirs[:] = sorted(name for name in dirs if name not in IGNORES)
+        for name in sorted(names):
+            full = os.path.join(path, name)
+            files[os.path.relpath(full, root).replace(os.sep, "/")] = full
+    return files
+
+
+def writeJson(path, data, indent=1):
+    """先写临时文件再替换"""
+    temp = path + ".tmp"
+    with open(temp, "w", encoding="utf-8") as fp:
+        json.dump(data, fp, ensure_ascii=False, indent=indent,
+                  separators=None if indent else (",", ":"))
+        fp.flush()
+        os.fsync(fp.fileno())
+    os.replace(temp, path)
+
+
+def readJson(path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return default
+
+
+def objectName(digest):
+    return "objects/{}.z".format(digest)
+
+
+def deltaName(old, new):
+    return "deltas/{}_{}.delta".format(old, new)
+
+
+def _common(a, ai, b, bi):
+    """a[ai:] 和 b[bi:] 相同的前缀长度, 先按大块比较"""
+    limit = min(len(a) - ai, len(b) - bi)
+    length = 0
+    for step in (65536, 4096, 256, 16, 1):
+        while length + step <= limit and \
+                a[ai + length:ai + length + step] == b[bi + length:bi + length + step]:
+            length += step
+    return length
+
+
+def makeDelta(old, new, block=BLOCK):
+    """new相对old的差异(zlib压缩)
+    旧文件按block对齐分块建索引, 在新文件中逐字节查找相同的块, 找到后向前后扩展
+    """
+    index = {}
+    for offset in range(0, len(old) - block + 1, block):
+        index.setdefault(old[offset:offset + block], offset)
+    out = [DELTA_MAGIC]
+    start = i = 0
+    while i + block <= len(new):
+        offset = index.get(new[i:i + block])
+        if offset is None:
+            i += 1
+            continue
+        # 向前扩展到上一次结束的位置
+        back = 0
+        while back < i - start and back < offset and \
+                old[offset - back - 1] == new[i - back - 1]:
+            back += 1
+        i, offset = i - back, offset - back
+        length = _common(old, offset, new, i)
+        if i > start:
+            out.append(INSERT.pack(b"i", i - start))
+            out.append(new[start:i])
+        out.append(COPY.pack(b"c", offset, length))
+        i = start = i + length
+    if start < len(new):
+        out.append(INSERT.pack(b"i", len(new) - start))
+        out.append(new[start:])
+    return zlib.compress(b"".join(out), 9)
+
+
+def applyDelta(delta, oldPath, fp):
+    """把旧文件加上差异写入fp, 返回sha256"""
+    data = zlib.decompress(delta)
+    if not data.startswith(DELTA_MAGIC):
+        raise UpdateError("invalid delta")
+    sha = hashlib.sha256()
+    pos = len(DELTA_MAGIC)
+    with open(oldPath, "rb") as old:
+        while pos < len(data):
+            if data[pos:pos + 1] == b"c":
+                _, offset, length = COPY.unpack_from(data, pos)
+                pos += COPY.size
+                old.seek(offset)
+                chunk = old.read(length)
+                if len(chunk) != length:
+                    raise UpdateError("delta out of range")
+            else:
+                _, length = INSERT.unpack_from(data, pos)
+                pos += INSERT.size
+                chunk = data[pos:pos + length]
+                pos += length
+            sha.update(chunk)
+            fp.write(chunk)
+    return sha.hexdigest()
+
+
+def publish(release, out, version, previous=(), deltas=True):
+    """发布release目录中的文件到out, previous为旧版本的目录(用来生成差异和找出删除的文件)"""
+    os.makedirs(os.path.join(out, "objects"), exist_ok=True)
+    os.makedirs(os.path.join(out, "deltas"), exist_ok=True)
+    files = {}
+    removed = set()
+    for path, full in scan(release).items():
+        with open(full, "rb") as fp:
+            data = fp.read()
+        digest = hashlib.sha256(data).hexdigest()
+        target = os.path.join(out, objectName(digest))
+        if not os.path.isfile(target):
+            with open(target, "wb") as fp:
+                fp.write(zlib.compress(data, 9))
+        files[path] = {"sha256": digest, "size": len(data),
+                       "zsize": os.path.getsize(target), "deltas": {}}
+    for old in previous:
+        for path, full in scan(old).items():
+            info = files.get(path)
+            if info is None:
+                # 旧版本有, 新版本删除了
+                removed.add(path)
+                continue
+            if not deltas:
+                continue
+            oldDigest = sha256File(full)
+            if oldDigest == info["sha256"] or oldDigest in info["deltas"]:
+                continue
+            target = os.path.join(out, deltaName(oldDigest, info["sha256"]))
+            if not os.path.isfile(target):
+                with open(full, "rb") as fp:
+                    oldData = fp.read()
+                with open(os.path.join(release, path), "rb") as fp:
+                    delta = makeDelta(oldData, fp.read())
+                if len(delta) >= info["zsize"] * DELTA_RATIO:
+                    continue
+                with open(target, "wb") as fp:
+                    fp.write(delta)
+            info["deltas"][oldDigest] = os.path.getsize(target)
+    writeJson(os.path.join(out, MANIFEST), {
+        "version": version, "files": files, "removed": sorted(removed)},
+        indent=None)
+    return files
+
+
+class Connection:
+    """保持连接的HTTP下载, 统计下载的字节数"""
+
+    def __init__(self, url, timeout=30):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.netloc = parts.netloc
+        self.base = parts.path.rstrip("/") + "/"
+        self.timeout = timeout
+        self.transferred = 0
+        self.requests = 0
+        self._conn = None
+
+    def _connect(self):
+        cls = HTTPSConnection if self.https else HTTPConnection
+        self._conn = cls(self.netloc, timeout=self.timeout)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get(self, name, write):
+        """下载name, 每一块数据调用write"""
+        for retry in (True, False):
+            if self._conn is None:
+                self._connect()
+            received = False
+            try:
+                self._conn.request("GET", self.base + quote(name))
+                response = self._conn.getresponse()
+                self.requests += 1
+                if response.status != 200:
+                    response.read()
+                    raise UpdateError("{} {}: {}".format(
+                        response.status, response.reason, name))
+                for chunk in iter(lambda: response.read(CHUNK), b""):
+                    received = True
+                    self.transferred += len(chunk)
+                    write(chunk)
+                return
+            except (HTTPException, OSError):
+                # 服务器关闭了保持的连接, 还没有收到数据时重新连接一次
+                self.close()
+                if not retry or received:
+                    raise
+
+    def read(self, name):
+        chunks = []
+        self.get(name, chunks.append)
+        return b"".join(chunks)
+
+
+class Updater:
+    """root为安装目录, url为发布目录的地址"""
+
+    def __init__(self, root, url):
+        self.root = os.path.abspath(root)
+        self.url = url
+        self.stateDir = os.path.join(self.root, STATE_DIR)
+        self.stagingDir = os.path.join(self.stateDir, "staging")
+        self.backupDir = os.path.join(self.stateDir, "backup")
+        self.statePath = os.path.join(self.stateDir, "state.json")
+        self.stagedPath = os.path.join(self.stagingDir, "staged.json")
+        self.journalPath = os.path.join(self.stateDir, "journal.json")
+        self.connection = None
+        self._thread = None
+
+    def _path(self, base, path):
+        full = os.path.normpath(os.path.join(base, path))
+        if not full.startswith(base + os.sep):
+            raise UpdateError("invalid path: {}".format(path))
+        return full
+
+    def installed(self, paths):
+        """本地文件的sha256, 大小和修改时间没变的文件使用state.json中记录的值"""
+        state = readJson(self.statePath, {"version": None, "files": {}})
+        known = state["files"]
+        digests = {}
+        hashed = False
+        for path in paths:
+            full = self._path(self.root, path)
+            try:
+                stat = os.stat(full)
+            except OSError:
+                continue
+            entry = known.get(path)
+            if entry and entry[1:] == [stat.st_size, stat.st_mtime_ns]:
+                digests[path] = entry[0]
+            else:
+                digests[path] = sha256File(full)
+                known[path] = [digests[path], stat.st_size, stat.st_mtime_ns]
+                hashed = True
+        if hashed:
+            # 下次启动不需要再计算
+            os.makedirs(self.stateDir, exist_ok=True)
+            writeJson(self.statePath, state)
+        return state, digests
+
+    def check(self):
+        """返回新的清单, 没有更新时返回None"""
+        self.connection = self.connection or Connection(self.url)
+        manifest = json.loads(self.connection.read(MANIFEST).decode("utf-8"))
+        state, digests = self.installed(manifest["files"])
+        changed = [path for path, info in manifest["files"].items()
+                   if digests.get(path) != info["sha256"]]
+        # 上次安装的和旧版本中有, 新版本中没有的文件
+        removed = [path for path in state["files"] if path not in manifest["files"]]
+        removed += [path for path in manifest.get("removed", ())
+                    if path not in state["files"] and
+                    os.path.isfile(self._path(self.root, path))]
+        if not changed and not removed:
+            return None
+        manifest["changed"] = changed
+        manifest["removed"] = removed
+        manifest["installed"] = digests
+        return manifest
+
+    def stage(self, progress=None):
+        """下载并校验更新到staging目录, 返回新版本号, 没有更新时返回None
+        progress(已完成文件数, 总数)
+        """
+        manifest = self.check()
+        if manifest is None:
+            shutil.rmtree(self.stagingDir, ignore_errors=True)
+            return None
+        staged = readJson(self.stagedPath)
+        if staged and staged["files"] == manifest["files"]:
+            # 已经下载好了
+            return staged["version"]
+        shutil.rmtree(self.stagingDir, ignore_errors=True)
+        os.makedirs(self.stagingDir)
+        changed = manifest["changed"]
+        for number, path in enumerate(changed):
+            self._download(path, manifest["files"][path],
+                           manifest["installed"].get(path))
+            if progress:
+                progress(number + 1, len(changed))
+        # 最后写入staged.json, 有这个文件表示全部下载并校验完成
+        writeJson(self.stagedPath, {
+            "version": manifest["version"], "files": manifest["files"],
+            "changed": changed, "removed": manifest["removed"]})
+        return manifest["version"]
+
+    def _download(self, path, info, oldDigest):
+        target = self._path(self.stagingDir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if oldDigest in info.get("deltas", {}):
+            delta = self.connection.read(deltaName(oldDigest, info["sha256"]))
+            try:
+                with open(target, "wb") as fp:
+                    digest = applyDelta(delta, self._path(self.root, path), fp)
+            except (zlib.error, struct.error, UpdateError, OSError):
+                # 增量文件损坏或本地文件被删除, 下载完整文件
+                digest = None
+            if digest == info["sha256"]:
+                return
+            # 本地文件在检查后被修改了, 下载完整文件
+        sha = hashlib.sha256()
+        decompress = zlib.decompressobj()
+        with open(target, "wb") as fp:
+            def write(chunk):
+                data = decompress.decompress(chunk)
+                sha.update(data)
+                fp.write(data)
+            self.connection.get(objectName(info["sha256"]), write)
+            data = decompress.flush()
+            sha.update(data)
+            fp.write(data)
+        if sha.hexdigest() != info["sha256"]:
+            raise UpdateError("sha256 mismatch: {}".format(path))
+
+    def start(self, callback=None, progress=None):
+        """在后台线程中stage, 结束后在线程中调用callback(版本号, 异常)"""
+        def run():
+            version, error = None, None
+            try:
+                version = self.stage(progress)
+            except Exception as e:
+                error = e
+            finally:
+                if self.connection:
+                    self.connection.close()
+            if callback:
+                callback(version, error)
+        self._thread = Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self):
+        if self._thread:
+            self._thread.join()
+
+    def pending(self):
+        return os.path.isfile(self.stagedPath)
+
+    def recover(self):
+        """上次替换被中断时, 用备份恢复到替换前的状态"""
+        journal = readJson(self.journalPath)
+        if journal is None:
+            return False
+        if not os.path.isfile(self.stagedPath):
+            # staged.json在替换完成后才删除, 只差清理
+            os.remove(self.journalPath)
+            shutil.rmtree(self.stagingDir, ignore_errors=True)
+            shutil.rmtree(self.backupDir, ignore_errors=True)
+            return False
+        for path in journal["changed"] + journal["removed"]:
+            target = self._path(self.root, path)
+            backup = self._path(self.backupDir, path)
+            if os.path.exists(backup):
+                os.replace(backup, target)
+            elif path in journal["changed"] and \
+                    not os.path.exists(self._path(self.stagingDir, path)) and \
+                    os.path.exists(target):
+                # 新增的文件已经移动过去了
+                os.remove(target)
+        os.remove(self.journalPath)
+        # 已经移动了一部分, 需要重新下载
+        shutil.rmtree(self.stagingDir, ignore_errors=True)
+        shutil.rmtree(self.backupDir, ignore_errors=True)
+        return True
+
+    def applyPending(self):
+        """替换已经下载好的更新, 要在导入被更新的模块之前调用, 返回新版本号"""
+        self.recover()
+        staged = readJson(self.stagedPath)
+        if staged is None:
+            return None
+        for path in staged["changed"]:
+            staging = self._path(self.stagingDir, path)
+            if not os.path.isfile(staging):
+                # 上次替换后在清理时中断, 已经替换过了
+                shutil.rmtree(self.stagingDir, ignore_errors=True)
+                return None
+            if sha256File(staging) != staged["files"][path]["sha256"]:
+                shutil.rmtree(self.stagingDir, ignore_errors=True)
+                raise UpdateError("staged file corrupted: {}".format(path))
+        shutil.rmtree(self.backupDir, ignore_errors=True)
+        writeJson(self.journalPath, {
+            "version": staged["version"], "changed": staged["changed"],
+            "removed": staged["removed"]})
+        # 每个文件的os.replace是原子的, 整体通过journal恢复
+        for path in staged["changed"] + staged["removed"]:
+            target = self._path(self.root, path)
+            if os.path.exists(target):
+                backup = self._path(self.backupDir, path)
+                os.makedirs(os.path.dirname(backup), exist_ok=True)
+                os.replace(target, backup)
+        for path in staged["changed"]:
+            target = self._path(self.root, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(self._path(self.stagingDir, path), target)
+        files = {}
+        for path, info in staged["files"].items():
+            stat = os.stat(self._path(self.root, path))
+            files[path] = [info["sha256"], stat.st_size, stat.st_mtime_ns]
+        writeJson(self.statePath, {"version": staged["version"], "files": files})
+        # 先删除staged.json, 中断后不会再替换一次
+        os.remove(self.stagedPath)
+        os.remove(self.journalPath)
+        shutil.rmtree(self.stagingDir, ignore_errors=True)
+        shutil.rmtree(self.backupDir, ignore_errors=True)
+        return staged["version"]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 5 or sys.argv[1] != "publish":
+        print(__doc__)
+        sys.exit(1)
+    files = publish(sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[5:])
+    print("published {} files, {} deltas".format(
+        len(files), sum(len(info["deltas"]) for info in files.values())))
@@ -12,43 +12,78 @@ Created on 2017年5月7日
 import sys
 sys.path.append("mylibs")
 import os
+from threading import Event
 from time import sleep
-from zipfile import ZipFile
+
+from Updater import Updater, UpdateError  # @UnresolvedImport
 
 
 __Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
 __Copyright__ = "Copyright (c) 2017 Irony.\"[讽刺]"
 __Version__ = "Version 1.0"
 
+# 安装目录(py2exe打包后为exe所在目录)
+ROOT = os.path.dirname(sys.executable) if getattr(sys, "frozen", False) \
+    else os.path.dirname(os.path.abspath(__file__))
+# 发布目录的地址, 用 python Updater.py publish 生成
+URL = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000/"
 
-def update():
-    # 更新
-    from mylibs import testlibs  # @UnresolvedImport
-    v1 = testlibs.version()  # 获取本地模块版本
-    v2 = "0.0.2"  # 模拟新版本（也可以从网络中检测）
-    if v1 != v2:  # 需要更新
-        print("发现新版本：0.0.2")
-        # 模拟从网络中下载更新包并解压（也可以包含图片等其它文件）
-        with ZipFile("mylibs2.zip", "r") as zf:
-            zf.extractall(os.path.dirname(sys.executable))  # 解压到当前目录
-        return 1
-    return 0
+
+def update(updater):
+    """后台下载更新, 程序继续运行, 下载并校验完成后返回新版本号"""
+    done = Event()
+    result = {}
+
+    def finished(version, error):
+        result["version"], result["error"] = version, error
+        done.set()
+
+    def progress(number, total):
+        print("下载更新：{}/{}".format(number, total))
+
+    updater.start(finished, progress)
+    # 模拟程序继续运行
+    while not done.wait(0.2):
+        pass
+    if result["error"] is not None:
+        print("检查更新失败：", result["error"])
+        return None
+    if result["version"]:
+        connection = updater.connection
+        print("发现新版本：{}，下载了{}字节".format(
+            result["version"], connection.transferred))
+    return result["version"]
+
+
+def restart():
+    import platform
+    if platform.system() == "Windows":
+        import ctypes
+        ctypes.windll.user32.MessageBoxW(
+            0, "更新完毕，关闭对话框即将重启", "提示", 0x0000030)
+    sleep(0.5)
+    if getattr(sys, "frozen", False) and hasattr(os, "startfile"):
+        os.startfile(sys.executable)  # 重启
+        sys.exit()  # 退出本身
+    os.execv(sys.executable, [sys.executable] + sys.argv)
 
 
 def main():
+    updater = Updater(ROOT, URL)
+    try:
+        # 上次下载好的更新, 在导入mylibs之前替换
+        version = updater.applyPending()
+        if version:
+            print("已更新到：", version)
+    except UpdateError as e:
+        print(e)
     from mylibs import testlibs  # @UnresolvedImport
     testlibs.test()
     print("当前版本：", testlibs.version())
-    if update():
+    if update(updater):
         print("更新完毕，即将重启")
-        import platform
-        if platform.system() == "Windows":
-            import ctypes
-            ctypes.windll.user32.MessageBoxW(
-                0, "更新完毕，关闭对话框即将重启", "提示", 0x0000030)
-        sleep(0.5)
-        os.startfile(sys.executable)  # 重启
-        sys.exit()  # 退出本身
+        restart()
+
 
 if __name__ == "__main__":
     main()
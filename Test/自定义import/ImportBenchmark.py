@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''
+Created on 2026年10月18日
+@author: Irony."[讽刺]
+@site: https://pyqt5.com , https://github.com/892768447
+@email: 892768447@qq.com
+@file: ImportBenchmark
+@description: 生成一个有200个模块的加密包, 在新的进程中导入全部模块, 比较
+    source: 每次解密并编译源码(原来的做法)
+    cold:   第一次导入, 编译并写入__ironycache__
+    warm:   从__ironycache__读取代码对象
+    lazy:   warm + 延迟执行, 分别统计导入和访问全部模块的时间
+    pyc:    未加密的.py, 使用__pycache__(参考)
+    python ImportBenchmark.py [模块数] [重复次数]
+'''
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import IronyImporter  # @UnresolvedImport
+from build import build  # @UnresolvedImport
+
+
+__Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
+__Copyright__ = "Copyright (c) 2018 Irony.\"[讽刺]"
+__Version__ = "Version 1.0"
+
+PACKAGE = "ironybench"
+
+MODULE = '''
+# -*- coding: utf-8 -*-
+"""generated module {index}"""
+import math
+
+VALUE = {index}
+TABLE = {table!r}
+
+
+class Shape{index}:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def area(self):
+        return self.width * self.height
+
+    def scaled(self, factor):
+        return Shape{index}(self.width * factor, self.height * factor)
+
+    def __repr__(self):
+        return "Shape{index}(%r, %r)" % (self.width, self.height)
+
+'''
+
+FUNCTION = '''
+def function{index}_{number}(values, offset={number}):
+    total = 0
+    for i, value in enumerate(values):
+        if value % 3 == 0:
+            total += math.sqrt(abs(value)) * i
+        elif value % 3 == 1:
+            total -= value * offset
+        else:
+            total += TABLE.get(str(value), 0)
+    return {{"total": total, "count": len(values), "name": "function{number}"}}
+
+'''
+
+# 在新进程中运行, 输出导入时间和访问全部模块后的时间
+SCRIPT = '''
+import importlib, sys, time
+begin = time.perf_counter()
+mode, count = sys.argv[1], int(sys.argv[2])
+if mode != "pyc":
+    import IronyImporter
+    IronyImporter.install(lazy=mode == "lazy", cache=mode != "source")
+modules = [importlib.import_module("{package}.m%03d" % i) for i in range(count)]
+imported = time.perf_counter()
+total = sum(module.VALUE for module in modules)
+print(imported - begin, time.perf_counter() - begin)
+'''.format(package=PACKAGE)
+
+
+def generate(src, count, functions=20):
+    package = os.path.join(src, PACKAGE)
+    os.makedirs(package)
+    with open(os.path.join(package, "__init__.py"), "w") as fp:
+        fp.write('"""{} generated modules"""\n'.format(count))
+    for index in range(count):
+        table = {str(i): i * index for i in range(50)}
+        code = MODULE.format(index=index, table=table) + "".join(
+            FUNCTION.format(index=index, number=number)
+            for number in range(functions))
+        with open(os.path.join(package, "m%03d.py" % index), "w") as fp:
+            fp.write(code)
+
+
+def clearCache(root):
+    for path, dirs, _ in os.walk(root):
+        for name in dirs:
+            if name in (IronyImporter.CACHE_DIR, "__pycache__"):
+                shutil.rmtree(os.path.join(path, name))
+
+
+def run(mode, cwd, count):
+    env = dict(os.environ)
+    # 要测试缓存, 需要允许写入
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    # 能导入IronyImporter和xxtea
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.abspath(__file__))] + sys.path[1:])
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT, mode, str(count)], cwd=cwd, env=env)
+    return [float(value) * 1000 for value in output.split()]
+
+
+def measure(name, mode, cwd, count, repeat, before=None):
+    imports, touches = [], []
+    for _ in range(repeat):
+        if before:
+            before()
+        imported, touched = run(mode, cwd, count)
+        imports.append(imported)
+        touches.append(touched)
+    print("%-8s %10.1fms %12.1fms" % (
+        name, statistics.median(imports), statistics.median(touches)))
+
+
+def findSpecCost(directory, times=20000):
+    """其它模块导入时的查找开销: 原来每次isfile, 现在查缓存的目录列表"""
+    finder = IronyImporter.IronyImporter()
+    names = ["module%d" % (i % 500) for i in range(times)]
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        begin = time.perf_counter()
+        for name in names:
+            os.path.isfile(name + IronyImporter.SUFFIX)
+        old = time.perf_counter() - begin
+        begin = time.perf_counter()
+        for name in names:
+            finder.find_spec(name, [directory])
+        new = time.perf_counter() - begin
+    finally:
+        os.chdir(cwd)
+    print("miss lookup: isfile %.2fus, find_spec %.2fus" % (
+        old * 1e6 / times, new * 1e6 / times))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    root = tempfile.mkdtemp()
+    try:
+        src = os.path.join(root, "src")
+        encrypted = os.path.join(root, "irony")
+        generate(src, count)
+        build(src, encrypted)
+        size = sum(os.path.getsize(os.path.join(src, PACKAGE, name))
+                   for name in os.listdir(os.path.join(src, PACKAGE)))
+        print("%d modules, %.1fMB source" % (count, size / 1024 / 1024))
+        print("%-8s %12s %14s" % ("mode", "import", "import+use"))
+        measure("source", "source", encrypted, count, repeat,
+                lambda: clearCache(encrypted))
+        measure("cold", "cold", encrypted, count, repeat,
+                lambda: clearCache(encrypted))
+        run("warm", encrypted, count)
+        measure("warm", "warm", encrypted, count, repeat)
+        measure("lazy", "lazy", encrypted, count, repeat)
+        run("pyc", src, count)
+        measure("pyc", "pyc", src, count, repeat)
+        findSpecCost(encrypted)
+    finally:
+        shutil.rmtree(root)
@@ -7,12 +7,20 @@ Created on 2018年1月28日
 @site: https://pyqt5.com , https://github.com/892768447
 @email: 892768447@qq.com
 @file: IronyImporter
-@description: 
+@description: 导入xxtea加密的 .irony 模块
+    - 实现 MetaPathFinder/Loader (find_spec, exec_module), 支持包(目录中的__init__.irony)
+    - 目录内容只列一次并缓存, 新建了.irony文件后调用 importlib.invalidate_caches()
+    - 编译后的代码对象marshal后仍然用xxtea加密, 保存在 __ironycache__ 中,
+      以.irony文件的sha256校验, 内容变了才重新解密编译
+    - install(lazy=True) 时模块在第一次访问属性时才执行
 '''
 import base64
+import hashlib
+import importlib.abc
+import importlib.util
+import marshal
 import os
 import sys
-from types import ModuleType
 
 import xxtea  # @UnresolvedImport
 
@@ -23,35 +31,160 @@ __Version__ = "Version 1.0"
 
 KEY = base64.b85decode("HF5^hbNbOVOKM=(SB`7h")
 
+SUFFIX = ".irony"
+CACHE_DIR = "__ironycache__"
+# 缓存文件: MAGIC + .irony文件的sha256 + 加密的marshal数据
+# MAGIC中包含Python的字节码版本, 换了Python版本缓存自动失效
+MAGIC = b"IRNY" + importlib.util.MAGIC_NUMBER
 
-class IronyImporter:
 
-    @classmethod
-    def find_module(cls, name, path=None):
-        name = name + ".irony"
-        if not os.path.isfile(name):
-            return None
-        return cls
+def cachePath(path):
+    """xxx/name.irony 的缓存为 xxx/__ironycache__/name.cpython-311.ironyc"""
+    head, tail = os.path.split(path)
+    name = os.path.splitext(tail)[0]
+    return os.path.join(head, CACHE_DIR, "{}.{}.ironyc".format(
+        name, sys.implementation.cache_tag))
 
-    @classmethod
-    def load_module(cls, name):
-        if name in sys.modules:
-            return sys.modules[name]
-        mod = ModuleType(name)
-        mod.__loader__ = cls
-        mod.__name__ = name
-        mod.__file__ = name + ".irony"
+
+def compileSource(data, path):
+    """解密并编译.irony文件的内容"""
+    try:
+        source = xxtea.decrypt(data, KEY)
+    except ValueError as e:
+        raise ImportError("can not decrypt {!r}: {}".format(path, e), path=path)
+    return compile(source, path, "exec", dont_inherit=True)
+
+
+def readCache(cache, header):
+    try:
+        with open(cache, "rb") as fp:
+            data = fp.read()
+    except OSError:
+        return None
+    if not data.startswith(header):
+        return None
+    try:
+        return marshal.loads(xxtea.decrypt(data[len(header):], KEY))
+    except (ValueError, EOFError, TypeError):
+        # 缓存损坏, 重新编译
+        return None
+
+
+def writeCache(cache, data):
+    """先写临时文件再替换, 目录不可写时忽略"""
+    temp = "{}.{}".format(cache, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(temp, "wb") as fp:
+            fp.write(data)
+        os.replace(temp, cache)
+    except OSError:
         try:
-            exec(xxtea.decrypt(open(mod.__file__, "rb").read(), KEY), mod.__dict__)
-        except Exception as e:
-            print(e)
-            return None
-        sys.modules[name] = mod
-        return mod
+            os.unlink(temp)
+        except OSError:
+            pass
+
+
+def loadCode(path, cache=True):
+    """读取.irony文件的代码对象, 有缓存并且sha256一致时不需要编译"""
+    with open(path, "rb") as fp:
+        data = fp.read()
+    header = MAGIC + hashlib.sha256(data).digest()
+    cached = cachePath(path)
+    code = readCache(cached, header) if cache else None
+    if code is None:
+        code = compileSource(data, path)
+        if cache and not sys.dont_write_bytecode:
+            writeCache(cached, header + xxtea.encrypt(marshal.dumps(code), KEY))
+    return code
+
+
+class IronyLoader(importlib.abc.Loader):
+
+    def __init__(self, fullname, path, cache=True):
+        self.name = fullname
+        self.path = path
+        self.cache = cache
+
+    def create_module(self, spec):
+        # 使用默认的模块创建
+        return None
+
+    def exec_module(self, module):
+        exec(self.get_code(module.__name__), module.__dict__)
+
+    def get_code(self, fullname):
+        return loadCode(self.path, self.cache)
+
+    def get_filename(self, fullname):
+        return self.path
+
+    def is_package(self, fullname):
+        return os.path.basename(self.path) == "__init__" + SUFFIX
+
+
+class IronyImporter(importlib.abc.MetaPathFinder):
+    """在sys.path(子模块在包的__path__)中查找 name.irony 或者 name/__init__.irony"""
+
+    def __init__(self, lazy=False, cache=True):
+        self.lazy = lazy
+        self.cache = cache
+        # {目录: 目录中的文件名}
+        self._listings = {}
+
+    def _listing(self, directory):
+        names = self._listings.get(directory)
+        if names is None:
+            try:
+                names = frozenset(os.listdir(directory))
+            except OSError:
+                names = frozenset()
+            self._listings[directory] = names
+        return names
+
+    def invalidate_caches(self):
+        self._listings.clear()
+
+    def find_spec(self, fullname, path=None, target=None):
+        name = fullname.rpartition(".")[2]
+        filename = name + SUFFIX
+        for directory in (sys.path if path is None else path):
+            if not isinstance(directory, str):
+                continue
+            directory = directory or os.getcwd()
+            names = self._listing(directory)
+            if name in names:
+                package = os.path.join(directory, name)
+                if "__init__" + SUFFIX in self._listing(package):
+                    return self._spec(fullname, os.path.join(
+                        package, "__init__" + SUFFIX), [package])
+            if filename in names:
+                return self._spec(fullname, os.path.join(directory, filename))
+        return None
+
+    def _spec(self, fullname, path, locations=None):
+        loader = IronyLoader(fullname, path, self.cache)
+        if self.lazy:
+            loader = importlib.util.LazyLoader(loader)
+        spec = importlib.util.spec_from_file_location(
+            fullname, path, loader=loader,
+            submodule_search_locations=locations)
+        if self.cache:
+            spec.cached = cachePath(path)
+        return spec
+
+
+def install(lazy=False, cache=True):
+    """替换sys.meta_path中已有的IronyImporter"""
+    uninstall()
+    finder = IronyImporter(lazy, cache)
+    sys.meta_path.insert(0, finder)
+    return finder
+
 
-    @classmethod
-    def module_repr(cls, module):
-        return "<module {!r} from ({!r})>".format(module.__name__, module.__file__)
+def uninstall():
+    sys.meta_path[:] = [finder for finder in sys.meta_path
+                        if not isinstance(finder, IronyImporter)]
 
 
-sys.meta_path.insert(0, IronyImporter)
+install()
@@ -7,19 +7,41 @@ Created on 2018年1月28日
 @site: https://pyqt5.com , https://github.com/892768447
 @email: 892768447@qq.com
 @file: build
-@description: 
+@description: 加密src目录(包括子目录中的包)中的.py文件到当前目录
+    python build.py [源目录] [输出目录]
 '''
 
 __Author__ = "By: Irony.\"[讽刺]\nQQ: 892768447\nEmail: 892768447@qq.com"
 __Copyright__ = "Copyright (c) 2018 Irony.\"[讽刺]"
 __Version__ = "Version 1.0"
 import base64
+import os
+import sys
 
 import xxtea  # @UnresolvedImport
 
 
 KEY = base64.b85decode("HF5^hbNbOVOKM=(SB`7h")
 
-with open("src/test.py", "rb") as fi:
-    open("test.irony", "wb").write(xxtea.encrypt(fi.read(), KEY))
-print("ok")
+
+def build(src="src", dst="."):
+    """src/a/b.py 加密为 dst/a/b.irony, 返回文件个数"""
+    count = 0
+    for root, dirs, files in os.walk(src):
+        dirs[:] = [name for name in dirs if name != "__pycache__"]
+        out = os.path.join(dst, os.path.relpath(root, src))
+        for name in files:
+            if not name.endswith(".py"):
+                continue
+            os.makedirs(out, exist_ok=True)
+            with open(os.path.join(root, name), "rb") as fi:
+                data = xxtea.encrypt(fi.read(), KEY)
+            with open(os.path.join(out, name[:-3] + ".irony"), "wb") as fo:
+                fo.write(data)
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    build(*sys.argv[1:3])
+    print("ok")